@@ -0,0 +1,134 @@
+# agent/checkpointer.py
+
+from threading import Lock
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+
+
+class BufferedCheckpointer(BaseCheckpointSaver):
+    """
+    Write-behind proxy around a real checkpointer.
+
+    LangGraph checkpoints after every super-step; with a remote saver that is
+    dozens of round-trips per scan. This proxy queues `put`/`put_writes` in
+    memory and replays them, in order, on `flush()`.
+
+    Reads flush first so `get_state`/`update_state` never see stale data.
+    Trade-off: a hard crash loses everything since the last flush, so callers
+    must flush in their `finally` block (pause/resume relies on it).
+
+    The async API (`app.astream`/`ainvoke`) shares the same queue and is
+    replayed through the wrapped saver's async methods by `aflush()`.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self._pending = []  # [(method_name, args)]
+        self._lock = Lock()  # Specialist phases checkpoint concurrently
+
+    # --- WRITES (buffered) ---
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            self._pending.append(("put", (config, checkpoint, metadata, new_versions)))
+
+        # Same shape every saver returns; the next step chains off it
+        return {
+            "configurable": {
+                "thread_id": config["configurable"]["thread_id"],
+                "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config, writes: Sequence[tuple], task_id: str, task_path: str = ""):
+        with self._lock:
+            self._pending.append(("put_writes", (config, writes, task_id, task_path)))
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes: Sequence[tuple], task_id: str, task_path: str = ""):
+        self.put_writes(config, writes, task_id, task_path)
+
+    def flush(self) -> int:
+        """Persists every queued write to the wrapped saver. Returns the count."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for method, args in pending:
+            getattr(self.saver, method)(*args)
+        return len(pending)
+
+    async def aflush(self) -> int:
+        """Async `flush()`, for savers that only work from the event loop."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for method, args in pending:
+            await getattr(self.saver, "a" + method)(*args)
+        return len(pending)
+
+    # --- READS (flush, then delegate) ---
+
+    def get_tuple(self, config) -> Optional[CheckpointTuple]:
+        self.flush()
+        return self.saver.get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None) -> Iterator[CheckpointTuple]:
+        self.flush()
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.flush()
+        self.saver.delete_thread(thread_id)
+
+    async def aget_tuple(self, config) -> Optional[CheckpointTuple]:
+        await self.aflush()
+        return await self.saver.aget_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[CheckpointTuple]:
+        await self.aflush()
+        async for item in self.saver.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.aflush()
+        await self.saver.adelete_thread(thread_id)
+
+    def get_next_version(self, current: Any, channel: Any) -> Any:
+        # Version scheme belongs to the wrapped saver
+        return self.saver.get_next_version(current, channel)
+
+
+def flush_checkpoints(app) -> None:
+    """
+    Persists buffered checkpoints of a compiled graph (no-op for write-through
+    savers or when the graph was never built). Safe to call from `finally`.
+    """
+    saver = getattr(app, "checkpointer", None)
+    if not isinstance(saver, BufferedCheckpointer):
+        return
+
+    try:
+        count = saver.flush()
+        if count:
+            print(f"💾 [Checkpoint] Flushed {count} buffered writes")
+    except Exception as e:
+        print(f"⚠️ [Checkpoint] Flush failed: {e}")
+
+
+async def aflush_checkpoints(app) -> None:
+    """Async `flush_checkpoints`, for graphs run with `astream`/`ainvoke`."""
+    saver = getattr(app, "checkpointer", None)
+    if not isinstance(saver, BufferedCheckpointer):
+        return
+
+    try:
+        count = await saver.aflush()
+        if count:
+            print(f"💾 [Checkpoint] Flushed {count} buffered writes")
+    except Exception as e:
+        print(f"⚠️ [Checkpoint] Flush failed: {e}")
@@ -1,221 +1,150 @@
 # agent/graph.py
+from functools import lru_cache
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langgraph.checkpoint.memory import MemorySaver
-from agent.state import AgentState
+from langgraph.types import Send
+from langchain_core.runnables import RunnableLambda
+from agent.state import AgentState, PhaseOutput
+from agent.checkpointer import BufferedCheckpointer
 
 # Import Nodes
-from agent.nodes.recon import recon_node
+from agent.nodes.recon import recon_node, arecon_node
 from agent.nodes.specialists import architect_node, intelligence_node, integrator_node
-from agent.nodes.validator import validator_node 
+from agent.nodes.validator import validator_node
 from agent.nodes.reporter import reporter_node
 
 # Import Tool Set
 from agent.tools.specialist_tools import SPECIALIST_TOOLS
 
-def route_specialist(state: AgentState):
+# Specialists investigate independent cost-driver families (infra, AI, SaaS),
+# so they run side by side and all hand over to the validator.
+SPECIALISTS = ("architect", "intelligence", "integrator")
+
+def route_tools(state: AgentState):
     """
-    Router Logic with infinite loop protection and better edge case handling.
+    Routes back from the top-level tools node to the validator, its only caller.
+    Specialists run their tools inside their own phase subgraph, so anything
+    else here is a stray result; raising beats handing it to another branch.
     """
-    messages = state.messages
-    
-    if not messages:
-        print("⚠️ [Router] No messages in state - defaulting to recon")
-        return "recon"
-        
-    last_msg = messages[-1]
-    
-    # Infinite Loop Protection: Check for consecutive non-tool messages
-    non_tool_count = 0
-    for msg in reversed(messages[-10:]):  # Check last 10 messages
-        if not hasattr(msg, "tool_calls") or not msg.tool_calls:
-            non_tool_count += 1
-        else:
-            break
-    
-    if non_tool_count >= 5:
-        print(f"⚠️ [Router] Potential infinite loop detected in {state.active_specialist}")
-        print(f"   Last {non_tool_count} messages had no tool calls - forcing phase transition")
-        
-        # Force phase completion to break the loop
-        if state.active_specialist == "architect":
-            print("   🔄 Force transitioning: architect → intelligence")
-            return "intelligence"
-        elif state.active_specialist == "intelligence":
-            print("   🔄 Force transitioning: intelligence → integrator")
-            return "integrator"
-        elif state.active_specialist == "integrator":
-            print("   🔄 Force transitioning: integrator → validator")
-            return "validator"
-        elif state.active_specialist == "validator":
-            print("   🔄 Force transitioning: validator → reporter")
-            return "reporter"
-        else:
-            print(f"   ⚠️ Unknown specialist: {state.active_specialist}, ending")
-            return "reporter"
-    
-    # Normal routing: Check if any tool was called
-    if not hasattr(last_msg, "tool_calls") or not last_msg.tool_calls:
-        # No tool called - stay in current specialist
-        return state.active_specialist
-    
-    # Check tool calls for phase completion signals
-    for tc in last_msg.tool_calls:
-        tool_name = tc.get("name", "")
-        
-        # Standard Phase Completion Signal
-        if tool_name == "complete_phase":
-            # Phase Transitions
-            if state.active_specialist == "architect":
-                print("✅ [Router] Architect complete → Intelligence")
-                return "intelligence"
-            elif state.active_specialist == "intelligence":
-                print("✅ [Router] Intelligence complete → Integrator")
-                return "integrator"
-            elif state.active_specialist == "integrator":
-                print("✅ [Router] Integrator complete → Validator")
-                return "validator"
-            elif state.active_specialist == "validator":
-                print("✅ [Router] Validator complete → Reporter")
-                return "reporter"
-            else:
-                print(f"⚠️ [Router] Unknown specialist '{state.active_specialist}' called complete_phase")
-                return "reporter"
-        
-        # Specific Validator Completion (Fallback if validator uses a custom tool)
-        elif tool_name == "complete_validation":
-            print("✅ [Router] Validation complete → Reporter")
-            return "reporter"
-        
-        # Emergency Exit Signal (if specialists need to abort)
-        elif tool_name == "emergency_exit":
-            print("🚨 [Router] Emergency exit triggered → Reporter")
-            return "reporter"
-    
-    # Default: Tools were called, route to tool node for execution
-    return "tools"
+    if state.active_specialist != "validator":
+        raise ValueError(f"Tool results from '{state.active_specialist}' reached the top-level tools node")
 
-def route_tools(state: AgentState):
+    return "validator"
+
+def dispatch_specialists(state: AgentState):
     """
-    Routes back from tools to the active specialist.
-    Includes safety check to prevent routing to invalid specialist.
+    Fans the recon hand-off out to every specialist phase in parallel.
     """
-    valid_specialists = ["architect", "intelligence", "integrator", "validator"]
-    
-    if state.active_specialist not in valid_specialists:
-        print(f"⚠️ [Router] Invalid specialist '{state.active_specialist}', defaulting to architect")
-        return "architect"
-    
-    return state.active_specialist
-
-def build_graph(checkpointer=None):
+    return [Send(role, state) for role in SPECIALISTS]
+
+def build_phase_graph(role: str, node):
+    """
+    Builds the self-contained `specialist ⇄ tools` loop for one phase.
+    The specialist routes itself via `Command` (loop back, tools, or END to
+    hand back to the parent). Only `messages` is returned to the parent,
+    where `add_messages` merges the concurrent phase outputs.
+    """
+    phase = StateGraph(AgentState, output_schema=PhaseOutput)
+
+    phase.add_node(role, node, destinations=(role, "tools", END))
+    phase.add_node("tools", ToolNode(SPECIALIST_TOOLS))
+
+    phase.set_entry_point(role)
+    phase.add_edge("tools", role)
+
+    return phase.compile()
+
+@lru_cache(maxsize=1)
+def _compile_workflow():
     """
-    Builds the LangGraph workflow with improved error handling and routing.
+    Builds and compiles the static topology once per process.
+    Compilation (incl. graph validation) doesn't depend on the checkpointer,
+    so build_graph only attaches a saver to a copy of this graph.
     """
     workflow = StateGraph(AgentState)
-    
+
     # 1. Add Nodes
-    workflow.add_node("recon", recon_node)
-    workflow.add_node("architect", architect_node)
-    workflow.add_node("intelligence", intelligence_node)
-    workflow.add_node("integrator", integrator_node)
-    workflow.add_node("validator", validator_node)
+    # Sync runs (app.stream) use recon_node, async runs (app.astream) arecon_node
+    workflow.add_node("recon", RunnableLambda(recon_node, afunc=arecon_node, name="recon"))
+    workflow.add_node("architect", build_phase_graph("architect", architect_node))
+    workflow.add_node("intelligence", build_phase_graph("intelligence", intelligence_node))
+    workflow.add_node("integrator", build_phase_graph("integrator", integrator_node))
+    workflow.add_node("validator", validator_node, destinations=("validator", "tools", "reporter"))
     workflow.add_node("reporter", reporter_node)
     workflow.add_node("tools", ToolNode(SPECIALIST_TOOLS))
-    
+
     # 2. Define Edges
-    
-    # Entry Point
+
+    # Entry Point: Recon fans out to all specialists at once
     workflow.set_entry_point("recon")
-    workflow.add_edge("recon", "architect")
-    
-    # Architect Phase Loop
-    workflow.add_conditional_edges(
-        "architect",
-        route_specialist,
-        {
-            "architect": "architect",      # Loop back for more investigation
-            "tools": "tools",               # Execute tools
-            "intelligence": "intelligence"  # Phase complete, advance
-        }
-    )
-    
-    # Intelligence Phase Loop
-    workflow.add_conditional_edges(
-        "intelligence",
-        route_specialist,
-        {
-            "intelligence": "intelligence",  # Loop back for more investigation
-            "tools": "tools",                 # Execute tools
-            "integrator": "integrator"        # Phase complete, advance
-        }
-    )
-    
-    # Integrator Phase Loop
-    workflow.add_conditional_edges(
-        "integrator",
-        route_specialist,
-        {
-            "integrator": "integrator",  # Loop back for more investigation
-            "tools": "tools",             # Execute tools
-            "validator": "validator"      # Phase complete, advance
-        }
-    )
-    
-    # Validator Phase Loop
-    workflow.add_conditional_edges(
-        "validator",
-        route_specialist,
-        {
-            "validator": "validator",  # Loop back for more validation
-            "tools": "tools",           # Execute tools
-            "reporter": "reporter"      # Validation complete, generate report
-        }
-    )
-    
-    # Tools Return Logic (with validation)
-    workflow.add_conditional_edges("tools", route_tools)
-    
+    workflow.add_conditional_edges("recon", dispatch_specialists, list(SPECIALISTS))
+
+    # Fan-in: Validator waits for every specialist phase to finish
+    workflow.add_edge(list(SPECIALISTS), "validator")
+
+    # Validator Phase Loop: validator_node returns Command(goto=validator|tools|reporter)
+
+    # Tools Return Logic: only the validator uses the top-level tools node
+    workflow.add_conditional_edges("tools", route_tools, ["validator"])
+
     # End: Reporter is final node
     workflow.add_edge("reporter", END)
-    
-    # Compile with checkpointer
-    saver = checkpointer if checkpointer else MemorySaver()
-    
+
     try:
         compiled_graph = workflow.compile(
-            checkpointer=saver,
             interrupt_before=[],  # Can add nodes to pause before execution
             interrupt_after=[]    # Can add nodes to pause after execution
         )
-        
+
         print("✅ [Graph] Workflow compiled successfully")
         return compiled_graph
-        
+
     except Exception as e:
         print(f"❌ [Graph] Failed to compile workflow: {e}")
         raise
 
+def build_graph(checkpointer=None, checkpoint_mode: str = "end_of_workflow"):
+    """
+    Returns the compiled LangGraph workflow bound to `checkpointer`.
+    The topology is compiled once and reused; call `build_graph.cache_clear()`
+    if SPECIALIST_TOOLS is swapped after the first build.
+
+    checkpoint_mode:
+        "end_of_workflow" - a persistent checkpointer is wrapped in a
+            BufferedCheckpointer; the caller must `flush_checkpoints(app)`
+            (`aflush_checkpoints(app)` for async runs, both in
+            agent/checkpointer.py) when the run stops (completed, paused or
+            failed). They are no-ops for an unwrapped MemorySaver.
+        "per_step" - every super-step is written through immediately.
+    """
+    saver = checkpointer if checkpointer else MemorySaver()
+    if checkpoint_mode == "end_of_workflow" and not isinstance(saver, (MemorySaver, BufferedCheckpointer)):
+        saver = BufferedCheckpointer(saver)
+
+    return _compile_workflow().copy(update={"checkpointer": saver})
+
+build_graph.cache_clear = _compile_workflow.cache_clear
+
 def get_graph_visualization():
     """
     Returns a visual representation of the graph flow (for debugging).
     """
     return """
     Graph Flow:
-    
+
     recon
-      ↓
-    architect ⇄ tools
-      ↓
-    intelligence ⇄ tools
-      ↓
-    integrator ⇄ tools
+      ├──────────────────┬──────────────────┐   (Send fan-out)
+      ↓                  ↓                  ↓
+    architect ⇄ tools  intelligence ⇄ tools  integrator ⇄ tools
+      ↓                  ↓                  ↓
+      └──────────────────┴──────────────────┘   (fan-in barrier)
       ↓
     validator ⇄ tools
       ↓
     reporter
       ↓
     END
-    
+
     Loop Protection: Auto-advance after 5 consecutive non-tool messages
-    """
\ No newline at end of file
+    """
@@ -2,8 +2,9 @@ from typing import List, Union, Optional
 from langchain_core.tools import tool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import SystemMessage, HumanMessage
-from agent.tools.search import execute_safe_grep, execute_list_files
+from agent.tools.search import execute_safe_grep, execute_list_files, format_grep_results
 from agent.tools.interactive import ask_human, read_external_cost_context
+from agent.tools.scratchpad import budget_output, fetch_scratch, GREP_BUDGET_BYTES, FILE_BUDGET_BYTES
 from core.file_viewer import read_file_safe
 from agent.state import AgentState
 from core.llm import get_llm
@@ -17,12 +18,12 @@ def complete_investigation():
 @tool
 def grep_codebase(patterns: List[str]):
     """Search for regex patterns in the project codebase. Returns matches with file:line format."""
-    return execute_safe_grep(patterns, root_path=".")
+    return budget_output(format_grep_results(execute_safe_grep(patterns, root_path=".")), GREP_BUDGET_BYTES)
 
 @tool
 def read_file(file_path: str, start_line: int = 1, end_line: Optional[int] = None):
     """Read a specific file from the project. Supports pagination."""
-    return read_file_safe(file_path, root_path=".", start_line=start_line, end_line=end_line)
+    return budget_output(read_file_safe(file_path, root_path=".", start_line=start_line, end_line=end_line), FILE_BUDGET_BYTES)
 
 @tool
 def list_directories(directory: str):
@@ -30,179 +31,100 @@ def list_directories(directory: str):
     return execute_list_files(directory, root_path=".")
 
 # --- ENHANCED PROMPT WITH COST DRIVER CHAIN TRACING + INTERACTIVE TOOLS ---
+# Static instructions go first and the per-run <CONTEXT> last, so the long
+# prefix is identical on every call and hits provider-side prompt caching.
 # We use r""" (raw string) to handle regex backslashes correctly
-INVESTIGATOR_SYSTEM_PROMPT = r"""
+INVESTIGATOR_CORE = r"""
 You are the Cost Discovery Investigator - Expert in Tracing Cost Driver Chains.
 
 Your Goal: Find the COMPLETE COST DRIVER FLOW (Entry → Prompt Builder → API), and QUANTIFY the hidden costs (Pricing, Traffic, Infra).
 
 <CRITICAL_INSTRUCTION>
 **DO NOT LOOP.**
-If you call `grep` and find a line number (e.g., 387), but `read_file` truncates before that line, **YOU MUST USE PAGINATION**.
-❌ Bad: Call `read_file("agent.py")` again.
-✅ Good: Call `read_file("agent.py", start_line=350, end_line=450)`.
-
-If you have searched for a pattern twice and found nothing, **STOP SEARCHING FOR IT**. Move to the next step.
+- If grep finds a line (e.g., 387) beyond where `read_file` truncated, paginate: `read_file("agent.py", start_line=350, end_line=450)`.
+- If a pattern found nothing twice, **STOP SEARCHING FOR IT** and move on.
 </CRITICAL_INSTRUCTION>
 
-<CONTEXT>
-Project Summary: {project_summary}
-Structure Map: {structure_map}
-Pricing/User Context: {pricing_context}
-File List:
-{file_list}
-</CONTEXT>
-
 <CRITICAL_CONCEPT>
-**The Wrapper Trap:**
-Finding `client.chat.completions.create()` is NOT enough. That's just the execution point.
-You must trace BACKWARDS to find:
-1. WHO calls the wrapper
-2. WHERE the prompt is CONSTRUCTED
-3. WHAT data sources are used to build the prompt
-
-**Example:**
-❌ INCOMPLETE: "ModelManager.generate_analysis at line 93"
-✅ COMPLETE: "UserForm → AIService.analyze_lead → AnalysisAgent.analyze → AnalysisAgent._build_enhanced_prompt (adds KB context + history) → ModelManager.generate_analysis"
+**The Wrapper Trap:** `client.chat.completions.create()` is only the execution point.
+Trace BACKWARDS to find WHO calls the wrapper, WHERE the prompt is CONSTRUCTED, and WHAT data feeds it.
 </CRITICAL_CONCEPT>
 
 <INVESTIGATION_PROTOCOL>
+**PHASE 1: DETECT API CALLS** - grep for "\.create\(", "\.chat\.completions", "\.generate\(", "anthropic\.", "ChatCompletion". Record EXACT file:line.
 
-**PHASE 1: DETECT API CALLS (Code Audit)**
-1. Use grep to find actual API patterns:
-   - "\.create\("
-   - "\.chat\.completions"
-   - "\.generate\("
-   - "anthropic\."
-   - "ChatCompletion"
-2. Record EXACT file:line from grep output
-
-**PHASE 2: TRACE UPSTREAM (THE CRITICAL STEP)**
-For EACH API call found:
-
-A. **Find the wrapper function**
-   - Example: If you found `client.create()` in `model_manager.py:93` inside function `generate_analysis`
-   - Search for: `generate_analysis` to find callers
-
-B. **Find who calls the wrapper**
-   - Example: Found `model_manager.generate_analysis(` in `analysis_agent.py:78`
-   - This is inside `AnalysisAgent.analyze_report()`
-   - Search for: `AnalysisAgent.analyze_report` or `.analyze_report` to find callers
-
-C. **Find the prompt builder** (THE REAL COST DRIVER)
-   - Look for functions with names like:
-     * `_build_prompt`
-     * `_build_enhanced_prompt`
-     * `_construct_prompt`
-     * `_get_context`
-     * `_add_history`
-   - These functions ADD THE COST by combining:
-     * Static prompts from config
-     * Dynamic data (user input, database queries)
-     * Chat history
-     * Retrieved context (RAG, knowledge base)
-
-D. **Find the entry point**
-   - Keep tracing until you find:
-     * A web route handler (Flask/FastAPI)
-     * A Streamlit form handler
-     * A CLI command
-     * A scheduled job
-
-**PHASE 3: ANALYZE TOKEN SOURCES**
-For each prompt builder found:
-1. Check if it loads static prompts from config files
-2. Check if it adds database/vector store results
-3. Check if it includes chat history
-4. Estimate total tokens = static + dynamic + history
+**PHASE 2: TRACE UPSTREAM (THE CRITICAL STEP)** - for EACH API call:
+A. Find the enclosing wrapper function, then grep its name to find callers.
+B. Repeat for each caller until you reach the entry point (web route, Streamlit form, CLI command, scheduled job).
+C. Find the prompt builder (`_build_prompt`, `_build_enhanced_prompt`, `_construct_prompt`, `_get_context`, `_add_history`) - THE REAL COST DRIVER: it combines static config prompts, dynamic data, chat history and retrieved context.
 
-**PHASE 4: INTERACTIVE VERIFICATION (NEW & CRITICAL)**
-You cannot see Traffic, Real Pricing, or Production Specs in the code. You MUST ask the user.
+**PHASE 3: ANALYZE TOKEN SOURCES** - per prompt builder: static prompts, database/vector store results, chat history. Estimate total tokens = static + dynamic + history.
 
-A. **Validate Traffic Volume**
-   - When you find an Entry Point (e.g., `app.py` route), call `ask_human`:
-     "I found an entry point at {{file}}. What is the estimated daily traffic (calls/day) for this endpoint?"
+**PHASE 4: INTERACTIVE VERIFICATION** - Traffic, Real Pricing and Production Specs are not in the code; use `ask_human`:
+A. Entry point found: "I found an entry point at {{file}}. What is the estimated daily traffic (calls/day) for this endpoint?"
+B. External API without a cost in code: "I see usage of {{Service}}. What is your pricing tier? Or provide a path to a cost sheet."
+C. docker-compose/k8s/terraform: "I see container orchestration. What are the average CPU/RAM specs per node/container?"
+D. If the user provides a file path, IMMEDIATELY call `read_external_cost_context(<path>)`; it appears under `Pricing/User Context`.
 
-B. **Validate Pricing Tiers**
-   - If you see External APIs (SendGrid, Twilio, etc.) and cannot find a cost in code:
-     "I see usage of {{Service}}. What is your pricing tier? Or provide a path to a cost sheet."
-
-C. **Validate Infrastructure**
-   - If you see `docker-compose.yml`, `k8s`, or `terraform`:
-     "I see container orchestration. What are the average CPU/RAM specs per node/container?"
-
-D. **Ingest Context**
-   - If the user provides a file path (e.g., "C:/docs/prices.txt"), IMMEDIATELY call `read_external_cost_context("C:/docs/prices.txt")`.
-   - The content will appear in your `<CONTEXT>` under `Pricing/User Context`. Use it to refine estimates.
+**PHASE 5: RECORD THE COMPLETE CHAIN** - cost_driver_chain (entry → API), api_call_location, prompt_builder_location, token_drivers, traffic_context (from `ask_human`).
+</INVESTIGATION_PROTOCOL>
 
-**PHASE 5: RECORD THE COMPLETE CHAIN**
-You must record:
-- **cost_driver_chain**: Full flow from entry point to API call
-  Example: "analysis_form.py:129 → ai_service.py:27 → analysis_agent.py:58 (_build_enhanced_prompt) → model_manager.py:93"
-- **api_call_location**: Exact file:line of the .create() call
-- **prompt_builder_location**: Where the prompt is constructed
-- **token_drivers**: What adds tokens (static prompt, KB context, history)
-- **traffic_context**: User-provided frequency (from `ask_human`)
+<CRITICAL_RULES>
+1. NEVER stop at the wrapper function - always trace backwards
+2. ALWAYS use exact line numbers from grep output
+3. If you find a prompt builder function, READ THAT FILE to understand token sources
+4. The location with the highest token impact is the COST DRIVER, not the API call
+5. Record the COMPLETE chain (Form → Service → Agent → Manager), not just one step
+6. **DO NOT GUESS COSTS.** If unknown, use `ask_human`.
+</CRITICAL_RULES>
 
-</INVESTIGATION_PROTOCOL>
+<STOP_CONDITION>
+Call `complete_investigation` only when ALL API calls are traced to entry points, prompt builders and token sources are identified, and **you have asked the user about missing traffic/pricing data**.
+</STOP_CONDITION>
+"""
 
+INVESTIGATOR_EXAMPLES = r"""
 <SEARCH_STRATEGY>
-
-**Step 1: Find API Call**
-grep_codebase([".create(", ".completions"])
-**Step 2: Find Function Name** (from the line above the API call)
-read_file("model_manager.py") # Look for function definition
-**Step 3: Find Callers**
-grep_codebase(["generate_analysis"]) # Search for the function name
-**Step 4: Find Prompt Builder**
-grep_codebase(["_build.*prompt", "_get.*context", "_add.*history"])
-**Step 5: Find Entry Point**
-grep_codebase(["@app.route", "st.", "def main", "if name"])
-**Step 6: Ask the Human**
-ask_human("I found the main loop in main.py. How many times does this run per day?")
+1. grep_codebase([".create(", ".completions"])
+2. read_file("model_manager.py")  # function enclosing the call
+3. grep_codebase(["generate_analysis"])  # its callers
+4. grep_codebase(["_build.*prompt", "_get.*context", "_add.*history"])
+5. grep_codebase(["@app.route", "st.", "def main", "if name"])
+6. ask_human("I found the main loop in main.py. How many times does this run per day?")
 </SEARCH_STRATEGY>
 
 <OUTPUT_FORMAT>
-For each cost driver chain discovered, record:
 COST DRIVER CHAIN FOUND:
-
     Entry Point: analysis_form.py:129 (Streamlit form submit)
-
     Flow: AIService.analyze_lead() → AnalysisAgent.analyze_report()
-
     Prompt Builder: analysis_agent.py:58 (AnalysisAgent._build_enhanced_prompt)
-
         Adds: Base prompt (450 tokens) + KB context (800 tokens) + History (variable)
-
     API Call: model_manager.py:93 (client.chat.completions.create)
-
     Model: meta-llama/llama-4-maverick-17b-128e-instruct
-
     Estimated Tokens: 1200-2000 per call
-
     Traffic/Pricing: User confirmed 500 calls/day, API cost $0.02/1k tokens.
-    </OUTPUT_FORMAT>
-
-<CRITICAL_RULES>
-1. NEVER stop at the wrapper function - always trace backwards
-2. ALWAYS use exact line numbers from grep output
-3. If you find a prompt builder function, READ THAT FILE to understand token sources
-4. The location with the highest token impact is the COST DRIVER, not the API call
-5. Record the COMPLETE chain, not just one step
-6. When you find multiple layers (Form → Service → Agent → Manager), record ALL of them
-7. **DO NOT GUESS COSTS.** If unknown, use `ask_human`.
-</CRITICAL_RULES>
+</OUTPUT_FORMAT>
+"""
 
-<STOP_CONDITION>
-Call `complete_investigation` only when:
-1. You have traced ALL API calls back to their entry points
-2. You have identified WHERE prompts are built
-3. You have estimated token sources for each driver
-4. **You have asked the user about missing traffic/pricing data**
-</STOP_CONDITION>
+INVESTIGATOR_CONTEXT = r"""
+<CONTEXT>
+Project Summary: {project_summary}
+Structure Map: {structure_map}
+Pricing/User Context: {pricing_context}
+File List:
+{file_list}
+</CONTEXT>
 """
 
-def investigator_node(state: AgentState):
+INVESTIGATOR_SYSTEM_PROMPT = INVESTIGATOR_CORE + INVESTIGATOR_EXAMPLES + INVESTIGATOR_CONTEXT
+
+INVESTIGATOR_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", INVESTIGATOR_SYSTEM_PROMPT),
+    MessagesPlaceholder(variable_name="messages"),
+])
+
+def _build_investigation(state: AgentState):
+    """Builds the tool-bound chain and its inputs (shared by the sync and async nodes)."""
     llm = get_llm(temperature=0)
     
     # Register ALL tools: Core Search + Interactive
@@ -212,16 +134,12 @@ def investigator_node(state: AgentState):
         list_directories, 
         complete_investigation,
         ask_human,
-        read_external_cost_context
+        read_external_cost_context,
+        fetch_scratch
     ]
     
     llm_with_tools = llm.bind_tools(tools)
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", INVESTIGATOR_SYSTEM_PROMPT),
-        MessagesPlaceholder(variable_name="messages"),
-    ])
-
     manifest = state.get("manifest", [])
     file_paths = [m.get("path") for m in manifest[:200]]
     file_list_str = "\n".join(file_paths)
@@ -237,16 +155,18 @@ def investigator_node(state: AgentState):
     if len(messages) > 30:
         messages.append(HumanMessage(content="⚠️ SYSTEM NOTICE: Investigation is long. Please verify findings. If waiting for user input, clarify what is needed. If done, call complete_investigation()."))
 
-    chain = prompt | llm_with_tools
-    response = chain.invoke({
+    chain = INVESTIGATOR_PROMPT | llm_with_tools
+    inputs = {
         "messages": state["messages"],
         "project_summary": state.get("project_summary", "N/A"),
         "search_plan": "\n- ".join(state.get("search_plan", [])),
         "file_list": file_list_str,
         "structure_map": structure_map,
         "pricing_context": pricing_context
-    })
+    }
+    return chain, inputs
 
+def _investigation_update(state: AgentState, response):
     if state.get("verbose"):
         if response.content:
             print(f"🤖 [Investigator] Thought: {response.content[:100]}...")
@@ -254,4 +174,15 @@ def investigator_node(state: AgentState):
             tools_called = [tc['name'] for tc in response.tool_calls]
             print(f"🛠️ [Investigator] Calling Tools: {tools_called}")
 
-    return {"messages": [response]}
\ No newline at end of file
+    return {"messages": [response]}
+
+def investigator_node(state: AgentState):
+    chain, inputs = _build_investigation(state)
+    response = chain.invoke(inputs)
+    return _investigation_update(state, response)
+
+async def ainvestigator_node(state: AgentState):
+    """Async variant: awaits the LLM so the event loop can progress parallel branches."""
+    chain, inputs = _build_investigation(state)
+    response = await chain.ainvoke(inputs)
+    return _investigation_update(state, response)
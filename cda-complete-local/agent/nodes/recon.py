@@ -1,15 +1,97 @@
 # agent/nodes/recon.py
 import os
 import re
+import time
+import asyncio
+from functools import lru_cache
+from operator import itemgetter
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.messages import HumanMessage
 from agent.state import AgentState
 from agent.tools.search import execute_safe_grep
 from core.seed_knowledge import DEFAULT_PATTERNS  # Fallback
-from core.infrastructure import infra
+from core.infrastructure import get_infra
 
 TABLE_NAME = os.environ.get("TABLE_KNOWLEDGE_BASE", "ScroogeKnowledgeBase")
 AWS_REGION = os.environ.get("AWS_REGION", "ap-south-1")
+SCAN_SEGMENTS = int(os.environ.get("PATTERN_SCAN_SEGMENTS", "8"))
+PATTERN_CACHE_TTL = int(os.environ.get("PATTERN_CACHE_TTL", "600"))  # Seconds
+# Worker processes for the sweep; opt-in, as each one pays a fresh interpreter start
+GREP_WORKERS = int(os.environ.get("GREP_WORKERS", "1"))
 
+# Sort categories by priority (ai, cloud, storage, etc.)
+CATEGORY_PRIORITY = {
+    'ai': 1, 'ai_framework': 2, 'ai_storage': 3,
+    'cloud': 4, 'storage': 5, 'saas': 6,
+    'infra': 7, 'ci_cd': 8, 'unknown': 99
+}
+
+# Sort findings by confidence (high > medium > low)
+CONFIDENCE_ORDER = {'high': 1, 'medium': 2, 'low': 3}
+
+# --- PROMPTS ---
+
+MISSION_PROMPT = """
+INITIATING COST DISCOVERY PROTOCOL.
+
+**Repository Context:**
+- Path: {repo_path}
+- Total Files: {file_count}
+- Structure Overview:
+{structure_summary}
+
+**High-Priority Files for Investigation:**
+{files_context}
+
+**Pattern Sweep Results:**
+{regex_report}
+
+---
+
+**MISSION BRIEFING:**
+Execute the 3-Phase Discovery Protocol to identify ALL 8 Cost Drivers.
+The three specialists run in parallel; each one owns a single phase below.
+
+**Phase 1: ARCHITECT** (Infrastructure & Compute)
+- Cloud services (AWS Lambda, EC2, Azure Functions, GCP)
+- Databases (DynamoDB, PostgreSQL, MongoDB)
+- Storage (S3, Blob Storage, GCS)
+- CI/CD pipelines (GitHub Actions, CircleCI, Jenkins)
+
+**Phase 2: INTELLIGENCE** (AI/ML Systems)
+- LLM API usage (OpenAI, Anthropic, Cohere, Google)
+- AI frameworks (LangChain, LlamaIndex, Haystack)
+- Vector databases (Pinecone, Weaviate, ChromaDB)
+- Model hosting (HuggingFace, Replicate, Together AI)
+
+**Phase 3: INTEGRATOR** (SaaS & Human Labor)
+- Third-party SaaS APIs (Stripe, Twilio, SendGrid)
+- Data providers (Snowflake, Databricks, Fivetran)
+- Human-in-the-loop processes (Mechanical Turk, Scale AI, manual reviews)
+
+---
+
+**🎯 ALL PHASES START NOW**
+
+Your task: Map ONLY the cost drivers owned by your phase.
+
+**Instructions:**
+1. Use the Pattern Sweep findings as initial leads
+2. Verify each finding by inspecting actual files (don't trust regex blindly)
+3. Use `read_file` to examine config files and code
+4. Use `search_files` to find additional references
+5. Document findings in the Investigation Ledger
+6. When your phase's mapping is complete, call `complete_phase()`
+
+Begin investigation now.
+"""
+
+# Process-level pattern cache (survives across graph runs in a warm container)
+_PATTERN_CACHE = {"ts": 0.0, "data": None}
+_PATTERN_CACHE_LOCK = Lock()
+
+@lru_cache(maxsize=4096)
 def validate_regex(pattern: str) -> bool:
     """Test if regex pattern is valid."""
     try:
@@ -19,25 +101,60 @@ def validate_regex(pattern: str) -> bool:
         print(f"⚠️ Invalid regex pattern: {pattern[:50]}... Error: {e}")
         return False
 
+def _scan_segment(table, segment: int, total_segments: int) -> list:
+    """Scans one DynamoDB segment, following its own pagination."""
+    items = []
+    response = table.scan(Segment=segment, TotalSegments=total_segments)
+    items.extend(response.get('Items', []))
+    
+    while 'LastEvaluatedKey' in response:
+        print(f"   📄 Fetching next page of patterns (segment {segment})...")
+        response = table.scan(
+            Segment=segment,
+            TotalSegments=total_segments,
+            ExclusiveStartKey=response['LastEvaluatedKey']
+        )
+        items.extend(response.get('Items', []))
+    
+    return items
+
 def fetch_patterns():
     """
-    Fetches regex patterns from DynamoDB ScroogeKnowledgeBase with pagination.
+    Returns the knowledge base patterns, served from a process-level cache for
+    PATTERN_CACHE_TTL seconds before hitting DynamoDB again.
+    """
+    with _PATTERN_CACHE_LOCK:
+        if _PATTERN_CACHE["data"] is not None and time.time() - _PATTERN_CACHE["ts"] < PATTERN_CACHE_TTL:
+            return _PATTERN_CACHE["data"]
+        
+        items = _fetch_patterns_from_kb()
+        
+        # Only cache real KB data so a transient failure is retried next run
+        if items is not DEFAULT_PATTERNS:
+            _PATTERN_CACHE["data"] = items
+            _PATTERN_CACHE["ts"] = time.time()
+        
+        return items
+
+def _fetch_patterns_from_kb():
+    """
+    Fetches regex patterns from DynamoDB ScroogeKnowledgeBase using a parallel segmented scan.
     Falls back to local DEFAULT_PATTERNS ONLY if DynamoDB fails.
     """
     try:
-        table = infra.get_table(TABLE_NAME)
+        # One shared Table handle; boto3 resources are safe to read from across threads
+        table = get_infra().get_table(TABLE_NAME)
         
-        print(f"🔍 [Recon] Fetching patterns from DynamoDB: {TABLE_NAME}")
+        print(f"🔍 [Recon] Fetching patterns from DynamoDB: {TABLE_NAME} ({SCAN_SEGMENTS} segments)")
         
         items = []
-        response = table.scan()
-        items.extend(response.get('Items', []))
-        
-        # Handle pagination (critical for large knowledge bases)
-        while 'LastEvaluatedKey' in response:
-            print(f"   📄 Fetching next page of patterns...")
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
+        with ThreadPoolExecutor(max_workers=SCAN_SEGMENTS) as executor:
+            futures = [
+                executor.submit(_scan_segment, table, i, SCAN_SEGMENTS)
+                for i in range(SCAN_SEGMENTS)
+            ]
+            for future in futures:
+                items.extend(future.result())
         
         if not items:
             print(f"⚠️ [Recon] DynamoDB table '{TABLE_NAME}' is empty. Using {len(DEFAULT_PATTERNS)} fallback patterns.")
@@ -51,11 +168,32 @@ def fetch_patterns():
         print(f"   Falling back to {len(DEFAULT_PATTERNS)} local patterns")
         return DEFAULT_PATTERNS
 
+def dedupe_patterns(patterns: list) -> list:
+    """
+    Collapses KB entries that share a regex, keeping the highest-confidence
+    metadata (first entry wins on ties). Entries without a regex are dropped.
+    """
+    best = {}
+    for p in patterns:
+        regex = p.get('regex')
+        if regex is None:
+            continue
+        kept = best.get(regex)
+        if kept is None or CONFIDENCE_ORDER.get(p.get('confidence'), 4) < CONFIDENCE_ORDER.get(kept.get('confidence'), 4):
+            best[regex] = p
+    return list(best.values())
+
 def run_pattern_sweep(repo_path: str, patterns: list) -> str:
     """Runs a fast grep for all knowledge base patterns with validation."""
     if not patterns:
         return "No patterns available for sweep."
     
+    # Same regex under several KB entries would be compiled and matched twice
+    unique_patterns = dedupe_patterns(patterns)
+    if len(unique_patterns) < len(patterns):
+        print(f"   🧹 Deduplicated {len(patterns) - len(unique_patterns)} repeated patterns")
+    patterns = unique_patterns
+    
     # Extract and validate regex strings
     regex_list = []
     invalid_patterns = []
@@ -79,7 +217,7 @@ def run_pattern_sweep(repo_path: str, patterns: list) -> str:
     
     # Execute Bulk Grep
     try:
-        result = execute_safe_grep(regex_list, repo_path)
+        result = execute_safe_grep(regex_list, repo_path, workers=GREP_WORKERS)
     except Exception as e:
         print(f"❌ [Recon] Grep execution failed: {e}")
         return f"Pattern sweep failed: {str(e)[:100]}"
@@ -88,16 +226,16 @@ def run_pattern_sweep(repo_path: str, patterns: list) -> str:
     summary_map = {}  # category -> list of findings
     total_matches = 0
     
+    # regex -> pattern lookup (regexes are unique after dedupe)
+    by_regex = {p['regex']: p for p in patterns}
+    
     for res in result.get("results", []):
         matches = res.get("matches", [])
         if matches:
             total_matches += len(matches)
             
             # Find which pattern this belongs to
-            original_ptrn = next(
-                (p for p in patterns if p.get('regex') == res['pattern']), 
-                None
-            )
+            original_ptrn = by_regex.get(res['pattern'])
             if original_ptrn:
                 cat = original_ptrn.get('category', 'unknown')
                 desc = original_ptrn.get('description', 'Pattern')
@@ -111,7 +249,10 @@ def run_pattern_sweep(repo_path: str, patterns: list) -> str:
                     'description': desc,
                     'keyword': keyword,
                     'match_count': len(matches),
-                    'confidence': confidence
+                    'confidence': confidence,
+                    # Sort keys computed once instead of inside the sort lambda
+                    '_conf_key': CONFIDENCE_ORDER.get(confidence, 4),
+                    '_neg_count': -len(matches)
                 })
     
     if not summary_map:
@@ -121,29 +262,18 @@ def run_pattern_sweep(repo_path: str, patterns: list) -> str:
     output = [f"**🔍 RECON SWEEP FINDINGS:** ({total_matches} total matches across {len(summary_map)} categories)"]
     output.append("")
     
-    # Sort categories by priority (ai, cloud, storage, etc.)
-    category_priority = {
-        'ai': 1, 'ai_framework': 2, 'ai_storage': 3,
-        'cloud': 4, 'storage': 5, 'saas': 6,
-        'infra': 7, 'ci_cd': 8, 'unknown': 99
-    }
-    
+    # Stable sort on the priority alone keeps ties in discovery order
     sorted_categories = sorted(
-        summary_map.items(),
-        key=lambda x: category_priority.get(x[0], 50)
+        ((CATEGORY_PRIORITY.get(cat, 50), cat, findings) for cat, findings in summary_map.items()),
+        key=itemgetter(0)
     )
     
-    for cat, findings in sorted_categories:
+    for _, cat, findings in sorted_categories:
         output.append(f"**{cat.upper().replace('_', ' ')}:**")
         
-        # Sort findings by confidence (high > medium > low)
-        confidence_order = {'high': 1, 'medium': 2, 'low': 3}
-        sorted_findings = sorted(
-            findings,
-            key=lambda x: (confidence_order.get(x['confidence'], 4), -x['match_count'])
-        )
+        findings.sort(key=itemgetter('_conf_key', '_neg_count'))
         
-        for finding in sorted_findings[:5]:  # Limit to top 5 per category
+        for finding in findings[:5]:  # Limit to top 5 per category
             output.append(
                 f"  • {finding['description']} "
                 f"({finding['match_count']} hits, {finding['confidence']} confidence)"
@@ -157,12 +287,12 @@ def run_pattern_sweep(repo_path: str, patterns: list) -> str:
 
 def recon_node(state: AgentState):
     """
-    Initializes the pipeline, runs Pattern Sweep from DynamoDB, and hands off to Architect.
+    Initializes the pipeline, runs Pattern Sweep from DynamoDB, and hands off to the specialists.
     """
     file_count = len(state.manifest)
     
     if state.verbose:
-        print(f"\n🧠 [Recon] Initializing Sequential Pipeline...")
+        print(f"\n🧠 [Recon] Initializing Parallel Specialist Pipeline...")
         print(f"   Files Detected: {file_count}")
     
     # 1. Fetch patterns (DynamoDB primary, local fallback)
@@ -171,6 +301,30 @@ def recon_node(state: AgentState):
     # 2. Run Regex Sweep with validation
     regex_report = run_pattern_sweep(state.repo_path, patterns)
     
+    return _recon_handoff(state, regex_report)
+
+async def arecon_node(state: AgentState):
+    """
+    Async variant of recon_node: the DynamoDB fetch and the sweep run in
+    worker threads so the event loop stays free. With GREP_WORKERS > 1 the
+    sweep's pool is started from that thread; its workers come from a
+    forkserver, so they don't inherit the event loop or its locks.
+    """
+    file_count = len(state.manifest)
+    
+    if state.verbose:
+        print(f"\n🧠 [Recon] Initializing Parallel Specialist Pipeline...")
+        print(f"   Files Detected: {file_count}")
+    
+    patterns = await asyncio.to_thread(fetch_patterns)
+    regex_report = await asyncio.to_thread(run_pattern_sweep, state.repo_path, patterns)
+    
+    return _recon_handoff(state, regex_report)
+
+def _recon_handoff(state: AgentState, regex_report: str) -> dict:
+    """Builds the mission briefing that hands the sweep results to the specialists."""
+    file_count = len(state.manifest)
+    
     if state.verbose:
         print(f"   📝 Sweep Report Preview:")
         print(f"   {regex_report[:200]}...")
@@ -181,60 +335,13 @@ def recon_node(state: AgentState):
     # Create concise structure summary
     structure_summary = state.structure_map[:1000] if state.structure_map else "No structure map available"
     
-    msg = HumanMessage(content=f"""
-INITIATING COST DISCOVERY PROTOCOL.
-
-**Repository Context:**
-- Path: {state.repo_path}
-- Total Files: {file_count}
-- Structure Overview:
-{structure_summary}
-
-**High-Priority Files for Investigation:**
-{files_context}
-
-**Pattern Sweep Results:**
-{regex_report}
-
----
-
-**MISSION BRIEFING:**
-Execute the 3-Phase Sequential Discovery Protocol to identify ALL 8 Cost Drivers:
-
-**Phase 1: ARCHITECT** (Infrastructure & Compute)
-- Cloud services (AWS Lambda, EC2, Azure Functions, GCP)
-- Databases (DynamoDB, PostgreSQL, MongoDB)
-- Storage (S3, Blob Storage, GCS)
-- CI/CD pipelines (GitHub Actions, CircleCI, Jenkins)
-
-**Phase 2: INTELLIGENCE** (AI/ML Systems)
-- LLM API usage (OpenAI, Anthropic, Cohere, Google)
-- AI frameworks (LangChain, LlamaIndex, Haystack)
-- Vector databases (Pinecone, Weaviate, ChromaDB)
-- Model hosting (HuggingFace, Replicate, Together AI)
-
-**Phase 3: INTEGRATOR** (SaaS & Human Labor)
-- Third-party SaaS APIs (Stripe, Twilio, SendGrid)
-- Data providers (Snowflake, Databricks, Fivetran)
-- Human-in-the-loop processes (Mechanical Turk, Scale AI, manual reviews)
-
----
-
-**🎯 PHASE 1 START: ARCHITECT**
-
-Your task: Map the infrastructure layer and identify compute/storage costs.
-
-**Instructions:**
-1. Use the Pattern Sweep findings as initial leads
-2. Verify each finding by inspecting actual files (don't trust regex blindly)
-3. Use `read_file` to examine config files and code
-4. Use `search_files` to find additional references
-5. Document findings in the Investigation Ledger
-6. When infrastructure mapping is complete, call `complete_phase()`
-
-Begin investigation now.
-"""
-    )
+    msg = HumanMessage(content=MISSION_PROMPT.format_map({
+        "repo_path": state.repo_path,
+        "file_count": file_count,
+        "structure_summary": structure_summary,
+        "files_context": files_context,
+        "regex_report": regex_report,
+    }))
     
     return {
         "messages": [msg], 
@@ -3,13 +3,43 @@
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from datetime import datetime, timezone
 from typing import Any, Dict
 from langchain_core.messages import SystemMessage
 from core.llm import get_llm
 from schemas.output_models import CostElements
 from agent.state import AgentState
-from core.pricing import calculate_line_item_cost, fuzzy_match_metric
+from core.pricing import resolve_unit_rate, fuzzy_match_metric
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many line items the array setup costs more than the plain loop
+VECTORIZE_MIN_ITEMS = int(os.environ.get("VECTORIZE_MIN_ITEMS", "64"))
+
+# Breakdown buckets; any other category is billed as "other".
+# Totals are accumulated in a list indexed by bucket, written to est once.
+COST_CATEGORIES = ("compute", "storage", "saas", "other")
+_COST_CATEGORY_INDEX = {c: i for i, c in enumerate(COST_CATEGORIES)}
+_COST_OTHER = _COST_CATEGORY_INDEX["other"]
+_COST_KEYS = tuple(f"{c}_cost" for c in COST_CATEGORIES)
+
+# Compiled once at import; reporter_node reuses them on every run
+# "$0.05 per 1M" / "$0.05 / 1M" -> groups: 1=price, 2=quantity, 3=suffix (M/k)
+_PRICE_RE = re.compile(r'\$([\d\.]+)\s*(?:per|/)\s*([\d\.,]+)\s*([kKmMbB]?)(?:\s*tokens?)?', re.IGNORECASE)
+# Outermost JSON object in the LLM response
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
 
 REPORTER_SYSTEM_PROMPT = """
 You are the **Final Reporter**.
@@ -121,32 +151,112 @@ Generate a JSON report covering ALL 8 COST CATEGORIES and perform **FEATURE MAPP
 **REMEMBER:** Your job is to accurately capture what the user told us. Be smart about units, conversions, and categorization. When in doubt, favor the user's explicit statements over assumptions.
 """
 
+# --- CATEGORY NORMALISATION ---
+VALID_CATS = {
+    "compute", "storage", "saas", "cicd",
+    "vector_db", "scraping", "human", "other"
+}
+
+MAPPING = {
+    "database": "storage", "db": "storage", "ci_cd": "cicd",
+    "deployment": "cicd", "identity": "saas", "auth": "saas",
+    "security": "saas", "networking": "compute", "network": "compute",
+    "serverless": "compute", "ml": "compute"
+}
+
+# Valid categories map to themselves, so one lookup resolves any raw value
+_CATEGORY_LUT = {**{c: c for c in VALID_CATS}, **MAPPING}
+
+# --- REPORT I/O ---
+# Report files are written off the graph's critical path. Anything that reads
+# them back (S3 upload, copy to results/) must call wait_for_report_writes().
+_IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="report-io")
+_PENDING_WRITES = []
+_PENDING_LOCK = Lock()
+
+def _submit_write(fn, *args) -> None:
+    future = _IO_POOL.submit(fn, *args)
+    with _PENDING_LOCK:
+        _PENDING_WRITES.append(future)
+
+def wait_for_report_writes(timeout: float = None) -> int:
+    """Blocks until queued report files are on disk. Returns how many were waited on."""
+    with _PENDING_LOCK:
+        pending = _PENDING_WRITES[:]
+        _PENDING_WRITES.clear()
+
+    for future in pending:
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            print(f"⚠️ [Reporter] Report write failed: {e}")
+    return len(pending)
+
+def _write_json_report(report: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_dumps_pretty(report))
+
+def _loads(json_str: str) -> Any:
+    """orjson when installed; stdlib for anything it rejects (NaN, huge ints)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(json_str)
+
+def _dumps_pretty(obj: Any) -> str:
+    """Indented JSON for the report file."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
 def sanitize_categories(data: Dict[str, Any]) -> Dict[str, Any]:
     """Maps invalid LLM-generated categories to the strict schema."""
-    VALID_CATS = {
-        "compute", "storage", "saas", "cicd",
-        "vector_db", "scraping", "human", "other"
-    }
-
-    MAPPING = {
-        "database": "storage", "db": "storage", "ci_cd": "cicd",
-        "deployment": "cicd", "identity": "saas", "auth": "saas",
-        "security": "saas", "networking": "compute", "network": "compute",
-        "serverless": "compute", "ml": "compute"
-    }
-
     for section in ["infrastructure", "integrations", "data_components"]:
         if section in data and isinstance(data[section], list):
             for item in data[section]:
-                raw_cat = item.get("category", "other").lower()
-                if raw_cat in MAPPING:
-                    item["category"] = MAPPING[raw_cat]
-                elif raw_cat in VALID_CATS:
-                    item["category"] = raw_cat
-                else:
-                    item["category"] = "other"
+                item["category"] = _CATEGORY_LUT.get(item.get("category", "other").lower(), "other")
     return data
 
+def _safe_float(value):
+    """
+    Coerces LLM-provided numbers (" 12.5 ", "7", 7) to float, as float() does.
+    A missing value (None) counts as 0.0; anything float() rejects returns None.
+    Clean numbers skip the try block.
+    """
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+def _line_item_costs(items, rates):
+    """Plain loop: per-item costs and per-category sums, in item order."""
+    costs = []
+    totals = [0.0] * len(COST_CATEGORIES)
+    for item, rate in zip(items, rates):
+        cost = item["estimated_volume"] * rate if rate else 0.0
+        costs.append(cost)
+        totals[_COST_CATEGORY_INDEX.get(item.get("category", "other"), _COST_OTHER)] += cost
+    return costs, totals
+
+def _line_item_costs_numpy(items, rates):
+    """Same result as `_line_item_costs`, as array ops for large reports."""
+    count = len(items)
+    vols = np.fromiter((item["estimated_volume"] for item in items), dtype=np.float64, count=count)
+    costs = vols * np.fromiter(rates, dtype=np.float64, count=count)
+
+    cat_idx = np.fromiter(
+        (_COST_CATEGORY_INDEX.get(item.get("category", "other"), _COST_OTHER) for item in items),
+        dtype=np.intp, count=count
+    )
+    totals = np.bincount(cat_idx, weights=costs, minlength=len(COST_CATEGORIES))
+    return costs.tolist(), totals.tolist()
+
 def calculate_totals_with_engine(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Uses core/pricing.py to calculate actual costs.
@@ -158,43 +268,46 @@ def calculate_totals_with_engine(data: Dict[str, Any]) -> Dict[str, Any]:
     total_usd = 0.0
 
     # Reset category breakdowns
-    est["compute_cost"] = 0.0
-    est["storage_cost"] = 0.0
-    est["saas_cost"] = 0.0
-    est["other_cost"] = 0.0
     est["llm_cost"] = 0.0 
 
     # 1. Calculate Infra/SaaS Costs
-    for section in ["infrastructure", "integrations", "data_components"]:
-        if section in data and isinstance(data[section], list):
-            for item in data[section]:
-                # Safety fixes
-                try:
-                    vol = item.get("estimated_volume")
-                    item["estimated_volume"] = float(vol) if vol is not None else 0.0
-                    
-                    rate = item.get("user_rate")
-                    item["user_rate"] = float(rate) if rate is not None else 0.0
-                except (ValueError, TypeError):
-                    item["estimated_volume"] = 0.0
-                    item["user_rate"] = 0.0
-
-                cost = calculate_line_item_cost(item)
-                item["monthly_cost"] = round(cost, 4)
-                total_usd += cost
-
-                # Add to category breakdown
-                cat = item.get("category", "other")
-                if cat == "compute": est["compute_cost"] += cost
-                elif cat == "storage": est["storage_cost"] += cost
-                elif cat == "saas": est["saas_cost"] += cost
-                else: est["other_cost"] += cost
+    items = [
+        item
+        for section in ["infrastructure", "integrations", "data_components"]
+        if section in data and isinstance(data[section], list)
+        for item in data[section]
+    ]
+
+    for item in items:
+        # Safety fixes: unparseable volume or rate zeroes both
+        vol = _safe_float(item.get("estimated_volume"))
+        rate = _safe_float(item.get("user_rate"))
+        if vol is None or rate is None:
+            vol = rate = 0.0
+        item["estimated_volume"] = vol
+        item["user_rate"] = rate
+
+    # Pricing lookups stay per item; only the arithmetic is batched
+    rates = [resolve_unit_rate(item) for item in items]
+    if NUMPY_AVAILABLE and len(items) >= VECTORIZE_MIN_ITEMS:
+        costs, totals = _line_item_costs_numpy(items, rates)
+    else:
+        costs, totals = _line_item_costs(items, rates)
+
+    for item, cost in zip(items, costs):
+        item["monthly_cost"] = round(cost, 4)
+    total_usd += sum(costs)
+
+    # Category breakdown
+    est.update(zip(_COST_KEYS, totals))
 
     # 2. Calculate LLM Costs (SIMPLIFIED - no more division)
     total_tokens = 0
     calculated_llm_cost = 0.0
 
     if "llm_calls" in data and isinstance(data["llm_calls"], list):
+        # Reports repeat the same model many times; resolve each name once
+        model_lookup = {}
         for call in data["llm_calls"]:
             try:
                 vol_base = int(call.get("base_tokens") or 0)
@@ -207,9 +320,9 @@ def calculate_totals_with_engine(data: Dict[str, Any]) -> Dict[str, Any]:
             total_tokens += vol
 
             model_name = call.get("model", "unknown")
-            result = fuzzy_match_metric(model_name)
-            if not result:
-                result = fuzzy_match_metric("tokens")
+            if model_name not in model_lookup:
+                model_lookup[model_name] = fuzzy_match_metric(model_name) or fuzzy_match_metric("tokens")
+            result = model_lookup[model_name]
 
             # SIMPLIFIED: All prices are now per single unit (per token, not per 1K)
             if result:
@@ -248,9 +361,9 @@ def reporter_node(state: AgentState):
         if isinstance(content, list):
             content = "".join([b["text"] for b in content if "text" in b])
 
-        match = re.search(r'\{.*\}', content.strip(), re.DOTALL)
+        match = _JSON_RE.search(content.strip())
         json_str = match.group(0) if match else content
-        data = json.loads(json_str)
+        data = _loads(json_str)
 
         # --- NUCLEAR OPTION: FORCE REGEX EXTRACTION ---
         # The LLM is inconsistent at writing 'user_rate' even if it knows the math.
@@ -260,7 +373,8 @@ def reporter_node(state: AgentState):
         # Pattern 1: "$0.05 per 1M" or "$0.05 / 1M" or "$0.05 per million"
         # Regex groups: 1=price, 2=quantity, 3=suffix (M/k)
         # Example: "$0.05 per 1M" -> Price=0.05, Qty=1, Suffix=M
-        price_pattern = re.search(r'\$([\d\.]+)\s*(?:per|/)\s*([\d\.,]+)\s*([kKmMbB]?)(?:\s*tokens?)?', pricing_text, re.IGNORECASE)
+        # No '$' means no rate to extract; skip the regex scan entirely
+        price_pattern = _PRICE_RE.search(pricing_text) if "$" in pricing_text else None
         
         if price_pattern:
             try:
@@ -308,64 +422,66 @@ def reporter_node(state: AgentState):
             estimates={"monthly_cost_usd": 0.0}
         )
 
-    out_dir = os.path.join(state.repo_path, "cost_analysis")
+    # Absolute: runners chdir before the background writes may have run
+    out_dir = os.path.abspath(os.path.join(state.repo_path, "cost_analysis"))
     os.makedirs(out_dir, exist_ok=True)
 
-    with open(os.path.join(out_dir, "cost_elements.json"), "w", encoding="utf-8") as f:
-        f.write(cost_data.model_dump_json(indent=2))
-
-    _write_markdown(cost_data, os.path.join(out_dir, "cost_report.md"))
+    # One dump feeds both the file and the graph state
+    report = cost_data.model_dump()
+    _submit_write(_write_json_report, report, os.path.join(out_dir, "cost_elements.json"))
+    _submit_write(_write_markdown, cost_data, os.path.join(out_dir, "cost_report.md"))
 
     if state.verbose:
-        print(f"✅ Report saved to {out_dir}")
+        print(f"✅ Report queued for {out_dir}")
 
-    return {"final_report": cost_data.model_dump()}
+    return {"final_report": report}
 
 def _write_markdown(data: CostElements, path: str):
-    md = f"# Cost Discovery Report\n"
-    md += f"**Repo:** {data.repo} | **Generated:** {data.timestamp}\n\n"
-
-    md += f"## 💰 Est. Monthly Cost: ${data.estimates.monthly_cost_usd:,.2f}\n"
-    md += f"*(Calculated using User Volumes + Custom Rates)*\n\n"
-
-    md += "### 🧠 1. LLM & AI Logic\n"
+    # Fragments are collected and joined once at the end
+    md = [
+        "# Cost Discovery Report\n",
+        f"**Repo:** {data.repo} | **Generated:** {data.timestamp}\n\n",
+        f"## 💰 Est. Monthly Cost: ${data.estimates.monthly_cost_usd:,.2f}\n",
+        "*(Calculated using User Volumes + Custom Rates)*\n\n",
+        "### 🧠 1. LLM & AI Logic\n",
+    ]
     if data.estimates.llm_cost > 0:
-        md += f"- **Total LLM Cost**: ${data.estimates.llm_cost:,.2f} (approx {data.estimates.monthly_token_estimate:,.0f} tokens)\n"
+        md.append(f"- **Total LLM Cost**: ${data.estimates.llm_cost:,.2f} (approx {data.estimates.monthly_token_estimate:,.0f} tokens)\n")
     
     if data.llm_calls:
         for item in data.llm_calls:
             vol = item.base_tokens + item.max_tokens
             if vol == 0 and item.base_tokens > 0: vol = item.base_tokens
             
-            md += f"- **{item.model}**: ~{vol:,.0f} tokens/mo. Loc: `{item.entry_point}`\n"
+            md.append(f"- **{item.model}**: ~{vol:,.0f} tokens/mo. Loc: `{item.entry_point}`\n")
     else:
-        md += "No LLM calls detected.\n"
+        md.append("No LLM calls detected.\n")
 
     def write_section(title, items):
-        res = f"\n### {title}\n"
+        res = [f"\n### {title}\n"]
         if items:
             for item in items:
                 cost_str = f"${item.monthly_cost:,.2f}"
                 rate_info = f"@ ${item.user_rate}/unit" if item.user_rate > 0 else "(Standard Rate)"
-                res += f"- **{item.name}**: {item.estimated_volume:,.0f} {item.metric} {rate_info} -> **{cost_str}**\n"
+                res.append(f"- **{item.name}**: {item.estimated_volume:,.0f} {item.metric} {rate_info} -> **{cost_str}**\n")
                 if item.description:
-                    res += f"  - *Context:* {item.description}\n"
+                    res.append(f"  - *Context:* {item.description}\n")
         else:
-            res += "None detected.\n"
+            res.append("None detected.\n")
         return res
 
-    md += write_section("🏗️ 2. Infrastructure", data.infrastructure)
-    md += write_section("🔌 3. Integrations", data.integrations)
-    md += write_section("💾 4. Data & Compute", data.data_components)
+    md.extend(write_section("🏗️ 2. Infrastructure", data.infrastructure))
+    md.extend(write_section("🔌 3. Integrations", data.integrations))
+    md.extend(write_section("💾 4. Data & Compute", data.data_components))
 
     # Features section
-    md += "\n### 🚀 5. Business Features (Mapped)\n"
+    md.append("\n### 🚀 5. Business Features (Mapped)\n")
     if data.features:
         for feat in data.features:
-            md += f"- **{feat.name}**: {feat.description}\n"
-            md += f"  - *Linked Drivers:* `{', '.join(feat.cost_driver_ids)}`\n"
+            md.append(f"- **{feat.name}**: {feat.description}\n")
+            md.append(f"  - *Linked Drivers:* `{', '.join(feat.cost_driver_ids)}`\n")
     else:
-        md += "No features mapped.\n"
+        md.append("No features mapped.\n")
 
     with open(path, "w", encoding="utf-8") as f:
-        f.write(md)
+        f.write("".join(md))
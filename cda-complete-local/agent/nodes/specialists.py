@@ -3,28 +3,105 @@
 import uuid
 import re
 import json
+import hashlib
+from collections import OrderedDict
+from threading import Lock
 from typing import List, Union
 from langchain_core.messages import SystemMessage, AIMessage, ToolMessage, BaseMessage, HumanMessage
-from pydantic import ValidationError
+from pydantic import ValidationError, TypeAdapter
+from langgraph.graph import END
+from langgraph.types import Command
 from agent.state import AgentState
 from core.llm import get_llm
 from agent.tools.specialist_tools import SPECIALIST_TOOLS
 from agent.schemas.action_schema import AgentAction
 
+# --- ACTION CONSTRUCTION ---
+# Fallback paths build actions from plain dicts; validate through one adapter
+# built at import instead of going through the model constructor each time.
+_ACTION_ADAPTER = TypeAdapter(AgentAction)
+
+def _make_action(**fields) -> AgentAction:
+    return _ACTION_ADAPTER.validate_python(fields)
+
+# --- BOUND CLIENTS ---
+# with_structured_output() and bind_tools() convert schemas to the provider format
+# on every call. get_llm() hands back the same client for the same settings, so
+# each binding is built once per client.
+BOUND_LLM_CACHE_SIZE = 8
+_BOUND_LLMS = OrderedDict()
+_BOUND_LLMS_LOCK = Lock()
+
+def bind_once(llm_instance, binding: tuple, build):
+    """
+    Returns build(llm_instance), cached per (client, binding). `binding`
+    identifies what is bound (e.g. the tool objects), so a swapped tool
+    list gets a fresh binding.
+    """
+    key = (id(llm_instance), binding)
+    with _BOUND_LLMS_LOCK:
+        entry = _BOUND_LLMS.get(key)
+        # Keep the client in the entry so its id cannot be reused while cached
+        if entry is None or entry[0] is not llm_instance:
+            entry = (llm_instance, build(llm_instance))
+            _BOUND_LLMS[key] = entry
+            while len(_BOUND_LLMS) > BOUND_LLM_CACHE_SIZE:
+                _BOUND_LLMS.popitem(last=False)
+        else:
+            _BOUND_LLMS.move_to_end(key)
+        return entry[1]
+
+def _structured_llm(llm_instance):
+    return bind_once(llm_instance, ("structured_output", AgentAction),
+                     lambda llm: llm.with_structured_output(AgentAction))
+
+# --- ACTION CACHE ---
+# Identical (role, prompt, history) means the graph looped without progress;
+# replay the last good action instead of paying for the LLM round-trip again.
+ACTION_CACHE_SIZE = 64
+_ACTION_CACHE = OrderedDict()
+_ACTION_CACHE_LOCK = Lock()  # Specialist phases run concurrently
+
+def _action_cache_key(role: str, messages: List[BaseMessage]) -> bytes:
+    """blake2b over the role, message types, contents and tool calls (ids excluded)."""
+    h = hashlib.blake2b(role.encode("utf-8"), digest_size=16)
+    for m in messages:
+        calls = [(tc["name"], tc["args"]) for tc in getattr(m, "tool_calls", None) or []]
+        h.update(repr((m.type, m.content, calls)).encode("utf-8"))
+    return h.digest()
+
+def _cached_action(key: bytes):
+    with _ACTION_CACHE_LOCK:
+        action = _ACTION_CACHE.get(key)
+        if action is not None:
+            _ACTION_CACHE.move_to_end(key)
+        return action
+
+def _cache_action(key: bytes, action: AgentAction) -> None:
+    with _ACTION_CACHE_LOCK:
+        _ACTION_CACHE[key] = action
+        while len(_ACTION_CACHE) > ACTION_CACHE_SIZE:
+            _ACTION_CACHE.popitem(last=False)
+
 # --- PROMPTS ---
 
+# Sent first, ahead of the role prompt: identical for all three phases and
+# every turn until the ledger changes, so the provider can reuse the prefix.
+SHARED_CONTEXT_PROMPT = """
+<LEDGER_CONTEXT>
+{ledger_dump}
+</LEDGER_CONTEXT>
+"""
+
 ARCHITECT_PROMPT = """
-You are the **Infrastructure Architect**. Phase 1 of 3.
+You are the **Infrastructure Architect**, one of three specialists working in parallel.
 **GOAL:** Identify the Compute, Storage, and CI/CD assets.
+AI/ML and SaaS are covered by the other specialists at the same time; stay on infrastructure.
 
 <CONTEXT>
 {structure_map}
 </CONTEXT>
 
-<LEDGER_CONTEXT>
-{ledger_dump}
-</LEDGER_CONTEXT>
-
 <INSTRUCTIONS>
 1. **DETECT:** Frameworks (CDK, Serverless, Docker).
 2. **SEARCH:** `grep_codebase` for "docker", "s3", "dynamodb", "lambda", "ec2".
@@ -51,16 +128,9 @@ You are the **Infrastructure Architect**. Phase 1 of 3.
 """
 
 INTELLIGENCE_PROMPT = """
-You are the **AI Intelligence Officer**. Phase 2 of 3.
+You are the **AI Intelligence Officer**, one of three specialists working in parallel.
 **GOAL:** Trace Cost Driver Chains (LLMs, Data).
-
-<PREVIOUS_FINDINGS>
-{last_summary}
-</PREVIOUS_FINDINGS>
-
-<LEDGER_CONTEXT>
-{ledger_dump}
-</LEDGER_CONTEXT>
+Infrastructure and SaaS are covered by the other specialists at the same time; stay on AI/ML.
 
 <INSTRUCTIONS>
 1. **FIND API CALLS:** `grep_codebase` for "ChatOpenAI", "bedrock", "anthropic".
@@ -86,16 +156,9 @@ You are the **AI Intelligence Officer**. Phase 2 of 3.
 """
 
 INTEGRATOR_PROMPT = """
-You are the **Systems Integrator**. Phase 3 of 3.
+You are the **Systems Integrator**, one of three specialists working in parallel.
 **GOAL:** Find SaaS & Human-in-the-Loop.
-
-<PREVIOUS_FINDINGS>
-{last_summary}
-</PREVIOUS_FINDINGS>
-
-<LEDGER_CONTEXT>
-{ledger_dump}
-</LEDGER_CONTEXT>
+Infrastructure and AI/ML are covered by the other specialists at the same time; stay on SaaS and human processes.
 
 <INSTRUCTIONS>
 1. **SCAN:** requirements.txt for SaaS (Stripe, Twilio).
@@ -122,18 +185,20 @@ You are the **Systems Integrator**. Phase 3 of 3.
 
 def sanitize_history(messages: List[BaseMessage]) -> List[BaseMessage]:
     """Ensures history is valid for Gemini strict alternation."""
-    if not messages:
-        return [HumanMessage(content="Resume analysis.")]
-
-    clean_messages = list(messages)
+    # History must start at the first human turn; one scan, one slice
+    for i, message in enumerate(messages or ()):
+        if isinstance(message, HumanMessage):
+            return messages[i:]
 
-    while clean_messages and not isinstance(clean_messages[0], HumanMessage):
-        clean_messages.pop(0)
+    return [HumanMessage(content="Resume analysis.")]
 
-    if not clean_messages:
-        return [HumanMessage(content="Resume analysis.")]
-
-    return clean_messages
+# Keywords the fuzzy parser turns into a grep. None is a substring of another,
+# so one alternation pass finds the same set as a per-keyword `in` check.
+INFRASTRUCTURE_KEYWORDS = (
+    "docker", "kubernetes", "lambda", "ec2", "s3", "dynamodb",
+    "openai", "anthropic", "bedrock", "stripe", "twilio", "sendgrid"
+)
+_INFRA_KEYWORD_RE = re.compile("|".join(map(re.escape, INFRASTRUCTURE_KEYWORDS)))
 
 def smart_fuzzy_parse(response_text: str, role: str) -> AgentAction:
     """
@@ -142,7 +207,7 @@ def smart_fuzzy_parse(response_text: str, role: str) -> AgentAction:
     """
     
     if not response_text or len(response_text.strip()) < 5:
-        return AgentAction(
+        return _make_action(
             thought=f"Empty response from {role}",
             action_type="finish_phase",
             phase_summary=f"{role.capitalize()} completed with limited findings"
@@ -164,7 +229,7 @@ def smart_fuzzy_parse(response_text: str, role: str) -> AgentAction:
         
         # If it's valid AgentAction-like JSON, reconstruct it
         if isinstance(data, dict) and "thought" in data:
-            return AgentAction(
+            return _make_action(
                 thought=data.get("thought", "Continuing analysis")[:500],
                 action_type=data.get("action_type", "finish_phase"),
                 tool_name=data.get("tool_name"),
@@ -182,18 +247,14 @@ def smart_fuzzy_parse(response_text: str, role: str) -> AgentAction:
     # Pattern 1: Grep detection (but smarter - avoid false positives)
     if ("grep" in text_lower or "search for" in text_lower) and "pattern" in text_lower:
         # Extract only infrastructure keywords, not JSON keys
-        infrastructure_keywords = [
-            "docker", "kubernetes", "lambda", "ec2", "s3", "dynamodb", 
-            "openai", "anthropic", "bedrock", "stripe", "twilio", "sendgrid"
-        ]
-        
-        found_patterns = [kw for kw in infrastructure_keywords if kw in text_lower]
+        found = set(_INFRA_KEYWORD_RE.findall(text_lower))
+        found_patterns = [kw for kw in INFRASTRUCTURE_KEYWORDS if kw in found]
         
         if found_patterns:
             # Clean tool name immediately
             tool_name = "grep_codebase"  # Don't trust extracted name
 
-            return AgentAction(
+            return _make_action(
                 thought=thought,
                 action_type="call_tool",
                 tool_name="grep_codebase",
@@ -204,7 +265,7 @@ def smart_fuzzy_parse(response_text: str, role: str) -> AgentAction:
     if "read" in text_lower and (".py" in response_text or ".txt" in response_text or ".yml" in response_text):
         file_match = re.search(r'([a-zA-Z0-9_/\-\.]+\.(?:py|js|ts|yml|yaml|json|txt))', response_text)
         if file_match:
-            return AgentAction(
+            return _make_action(
                 thought=thought,
                 action_type="call_tool",
                 tool_name="read_file",  # Hardcode clean name
@@ -214,14 +275,14 @@ def smart_fuzzy_parse(response_text: str, role: str) -> AgentAction:
     # Pattern 3: Finish phase detection
     if any(kw in text_lower for kw in ["complete", "finish", "done", "phase 1", "phase 2", "phase 3"]):
         summary = response_text[:500] if len(response_text) > 100 else f"{role.capitalize()} analysis complete"
-        return AgentAction(
+        return _make_action(
             thought=thought,
             action_type="finish_phase",
             phase_summary=summary
         )
     
     # Default: Force finish to prevent loops
-    return AgentAction(
+    return _make_action(
         thought=f"Unable to parse {role} output clearly",
         action_type="finish_phase",
         phase_summary=f"{role.capitalize()} completed. Output: {response_text[:200]}"
@@ -273,28 +334,31 @@ def run_specialist(state: AgentState, prompt_template: str, role: str):
         }
     
     # Prepare context
-    ledger_dump = state.ledger.model_dump_json(indent=2)
-    structure_map = state.structure_map if state.structure_map else "No structure map available."
-    tree_context = structure_map[:20000]
+    ledger_dump = state.ledger_json()
+    # Already capped at STRUCTURE_MAP_MAX_CHARS when the state was built
+    tree_context = state.structure_map if state.structure_map else "No structure map available."
 
     messages_list = state.messages if state.messages else []
-    last_msg = messages_list[-1] if messages_list else None
-    last_summary = last_msg.content if last_msg and "PHASE_COMPLETE" in str(last_msg.content) else "No previous summary."
 
-    formatted_system = prompt_template.format(
-        ledger_dump=ledger_dump,
-        last_summary=last_summary,
-        structure_map=tree_context
-    )
+    shared_system = SHARED_CONTEXT_PROMPT.format(ledger_dump=ledger_dump)
+    formatted_system = prompt_template.format(structure_map=tree_context)
 
     clean_history = sanitize_history(messages_list)
-    messages = [SystemMessage(content=formatted_system)] + clean_history
+    messages = [SystemMessage(content=shared_system), SystemMessage(content=formatted_system)] + clean_history
 
     verbose = state.verbose
     if verbose:
         # --- FIX: Closed the print statement string below ---
         print(f"\n🤖 \033[1m[{role.upper()}] Thinking...\033[0m")
 
+    # TIER 0: Same inputs as an earlier successful turn
+    cache_key = _action_cache_key(role, messages)
+    action = _cached_action(cache_key)
+    if action is not None:
+        if verbose:
+            print(f"\n   ♻️ Reusing cached action ({action.action_type})")
+        return _convert_action_to_message(action, role, state)
+
     # TIER 1: Constrained decoding
     try:
         llm_instance = get_llm(temperature=0)
@@ -303,6 +367,7 @@ def run_specialist(state: AgentState, prompt_template: str, role: str):
         action = try_constrained_decoding(model_name, messages)
         if verbose:
             print(f"\n   ✨ Constrained decoding success")
+        _cache_action(cache_key, action)
         return _convert_action_to_message(action, role, state)
     except ValueError as ve:
         # Critical config error (e.g. API key), re-raise immediately
@@ -312,7 +377,7 @@ def run_specialist(state: AgentState, prompt_template: str, role: str):
 
     # TIER 2: Structured output with retry
     # llm_instance is already retrieved above or we failed fast
-    llm_with_schema = llm_instance.with_structured_output(AgentAction)
+    llm_with_schema = _structured_llm(llm_instance)
     
     for attempt in range(3):
         try:
@@ -330,6 +395,7 @@ def run_specialist(state: AgentState, prompt_template: str, role: str):
             if verbose:
                 print(f"\n   ✅ Valid on attempt {attempt + 1}")
             
+            _cache_action(cache_key, action)
             return _convert_action_to_message(action, role, state)
             
         except ValueError as ve:
@@ -386,7 +452,7 @@ def run_specialist(state: AgentState, prompt_template: str, role: str):
     if verbose:
         print(f"\n   🚨 All tiers failed. Forcing finish.")
     
-    fallback_action = AgentAction(
+    fallback_action = _make_action(
         thought=f"Technical difficulties in {role}",
         action_type="finish_phase",
         phase_summary=f"{role.capitalize()} completed with partial findings."
@@ -428,13 +494,57 @@ def _convert_action_to_message(action: AgentAction, role: str, state: AgentState
 
     return {"messages": [ai_message], "active_specialist": role}
 
+# --- ROUTING ---
+
+PHASE_EXIT_TOOLS = ("complete_phase", "complete_validation", "emergency_exit")
+
+def route_command(state: AgentState, update: dict, role: str, done: str = END) -> Command:
+    """
+    Fuses the node's state update with its routing decision, so the graph
+    needs no conditional-edge callback after every step.
+    Routes to `done` on a completion signal (or a detected loop), to "tools"
+    for ordinary tool calls, and back to `role` when no tool was called.
+    """
+    last_msg = update["messages"][-1]
+    tool_calls = getattr(last_msg, "tool_calls", None)
+
+    # Fast path (the common case): a tool was called
+    if tool_calls:
+        update["consecutive_non_tool"] = 0
+
+        # Check tool calls for phase completion signals
+        for tc in tool_calls:
+            tool_name = tc.get("name", "")
+            if tool_name in PHASE_EXIT_TOOLS:
+                if tool_name == "emergency_exit":
+                    print("🚨 [Router] Emergency exit triggered → Reporter")
+                else:
+                    print(f"✅ [Router] {role.capitalize()} complete")
+                return Command(update=update, goto=done)
+
+        # Default: Tools were called, route to tool node for execution
+        return Command(update=update, goto="tools")
+
+    # Infinite Loop Protection: O(1) counter instead of re-scanning history
+    non_tool_count = state.consecutive_non_tool + 1
+
+    if non_tool_count >= 5:
+        print(f"⚠️ [Router] Potential infinite loop detected in {role}")
+        print(f"   Last {non_tool_count} messages had no tool calls - forcing phase transition")
+        update["consecutive_non_tool"] = 0
+        return Command(update=update, goto=done)
+
+    # No tool called - stay in current specialist
+    update["consecutive_non_tool"] = non_tool_count
+    return Command(update=update, goto=role)
+
 # --- EXPORTED NODES ---
 
 def architect_node(state: AgentState):
-    return run_specialist(state, ARCHITECT_PROMPT, "architect")
+    return route_command(state, run_specialist(state, ARCHITECT_PROMPT, "architect"), "architect")
 
 def intelligence_node(state: AgentState):
-    return run_specialist(state, INTELLIGENCE_PROMPT, "intelligence")
+    return route_command(state, run_specialist(state, INTELLIGENCE_PROMPT, "intelligence"), "intelligence")
 
 def integrator_node(state: AgentState):
-    return run_specialist(state, INTEGRATOR_PROMPT, "integrator")
\ No newline at end of file
+    return route_command(state, run_specialist(state, INTEGRATOR_PROMPT, "integrator"), "integrator")
\ No newline at end of file
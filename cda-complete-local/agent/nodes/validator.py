@@ -4,8 +4,12 @@ from langchain_core.messages import SystemMessage
 from agent.state import AgentState
 from core.llm import get_llm
 from agent.tools.specialist_tools import SPECIALIST_TOOLS
+from agent.nodes.specialists import route_command, bind_once
 
-VALIDATOR_PROMPT = """
+# Static instructions: identical on every validator turn, so the block is
+# marked for provider prompt caching. Anything that changes goes in
+# VALIDATOR_DYNAMIC, sent after it.
+VALIDATOR_STATIC = """
 You are the **Cost Validator**. 
 Your job is to review findings and **INTERVIEW THE USER** to fill in missing data.
 
@@ -15,23 +19,15 @@ To talk to the user, you **MUST** call the tool `ask_human(question="...")`.
 If you generate text without calling `ask_human`, the user will see NOTHING and the process will fail.
 
 **GOAL:** Ensure every found cost driver has a Volume AND a Price.
-**INPUT:** The Ledger of findings from previous agents.
-
-<LEDGER_CONTEXT>
-{ledger_dump}
-</LEDGER_CONTEXT>
-
-<PRICING_CONTEXT>
-{pricing_context}
-</PRICING_CONTEXT>
+**INPUT:** The Ledger of findings from previous agents (below).
 
 <INSTRUCTIONS>
 1. **Distinguish Capability vs Activity:**
    - Ignore services found only in `.md`/`.txt` unless confirmed in code/config.
 
 2. **Check Price Availability:**
-   - Call `check_price_knowledge(metric="...")` for items.
-   - If "Price UNKNOWN", add a question for the user: "What is your rate?"
+   - Call `check_prices_bulk(metrics=[...])` ONCE with the metrics of ALL items.
+   - For every metric with `"known": false`, add a question for the user: "What is your rate?"
 
 3. **Execute the Interview:**
    - Compile your questions into a single list.
@@ -39,7 +35,7 @@ If you generate text without calling `ask_human`, the user will see NOTHING and
    - Do NOT just "think" the questions.
 
 4. **Review User Answers:**
-   - If you've already asked the user and they responded, review the PRICING_CONTEXT above.
+   - If you've already asked the user and they responded, review the PRICING_CONTEXT below.
    - The user's answers contain volume and rate information.
    - Proceed to `complete_validation` once you have sufficient information.
 
@@ -48,43 +44,65 @@ If you generate text without calling `ask_human`, the user will see NOTHING and
 </INSTRUCTIONS>
 """
 
+VALIDATOR_DYNAMIC = """
+<LEDGER_CONTEXT>
+{ledger_dump}
+</LEDGER_CONTEXT>
+
+<PRICING_CONTEXT>
+{pricing_context}
+</PRICING_CONTEXT>
+"""
+
+# Built once; cache_control is honoured by Anthropic and ignored by Gemini
+_VALIDATOR_STATIC_MESSAGE = SystemMessage(content=[
+    {"type": "text", "text": VALIDATOR_STATIC, "cache_control": {"type": "ephemeral"}}
+])
+
 def validator_node(state: AgentState):
     """
     Validator that asks user for missing volumes/prices.
     The REPORTER will extract the actual values from pricing_context.
     """
-    llm = get_llm(temperature=0).bind_tools(SPECIALIST_TOOLS)
+    # Tool schemas are converted once per client (and tool list), not every turn
+    llm = bind_once(get_llm(temperature=0), ("tools",) + tuple(map(id, SPECIALIST_TOOLS)),
+                    lambda client: client.bind_tools(SPECIALIST_TOOLS))
 
-    ledger_dump = state.ledger.model_dump_json(indent=2)
+    ledger_dump = state.ledger_json()
     pricing_context = state.pricing_context if state.pricing_context else "No user input yet."
     
-    formatted_prompt = VALIDATOR_PROMPT.format(
+    formatted_context = VALIDATOR_DYNAMIC.format(
         ledger_dump=ledger_dump,
         pricing_context=pricing_context
     )
     
-    messages = [SystemMessage(content=formatted_prompt)] + state.messages
+    messages = [_VALIDATOR_STATIC_MESSAGE, SystemMessage(content=formatted_context)] + state.messages
 
     response = llm.invoke(messages)
 
     if state.verbose:
-        print(f"\n👮 \033[1m[VALIDATOR] Reasoning:\033[0m")
+        # Built up front and written with a single print (one stdout write/flush per turn)
+        lines = [f"\n👮 \033[1m[VALIDATOR] Reasoning:\033[0m"]
         content_to_print = ""
         if isinstance(response.content, list):
-            for block in response.content:
-                if isinstance(block, dict) and "text" in block:
-                    content_to_print += block["text"]
+            content_to_print = "".join(
+                block["text"] for block in response.content
+                if isinstance(block, dict) and "text" in block
+            )
         elif isinstance(response.content, str):
             content_to_print = response.content
             
         if content_to_print:
-             print(f"   \"{content_to_print[:200]}...\"")
+            lines.append(f"   \"{content_to_print[:200]}...\"")
 
         if response.tool_calls:
             tools = [t['name'] for t in response.tool_calls]
-            print(f"🛠️  \033[1m[VALIDATOR] Calling Tools:\033[0m {tools}")
+            lines.append(f"🛠️  \033[1m[VALIDATOR] Calling Tools:\033[0m {tools}")
+
+        print("\n".join(lines))
 
-    return {
+    update = {
         "messages": [response], 
         "active_specialist": "validator"
     }
+    return route_command(state, update, "validator", done="reporter")
@@ -1,10 +1,13 @@
 # agent/state.py
 
 from typing import Dict, Any, List, Optional, Annotated
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from langgraph.graph.message import add_messages
 from schemas.analysis_models import InvestigationLedger
 
+# Prompt budget for the directory tree; no node reads past this point
+STRUCTURE_MAP_MAX_CHARS = 20000
+
 
 class AgentState(BaseModel):
     """
@@ -35,7 +38,8 @@ class AgentState(BaseModel):
     ledger: InvestigationLedger = Field(default_factory=InvestigationLedger)
 
     # --- ROUTING CONTROL ---
-    # Options: "architect" | "intelligence" | "integrator"
+    # Options: "architect" | "intelligence" | "integrator" | "validator"
+    # Each specialist phase runs in its own subgraph, so this is phase-local there.
     active_specialist: str = Field("architect")
 
     # --- USER CONTEXT ---
@@ -50,5 +54,33 @@ class AgentState(BaseModel):
     # --- FUZZY PARSE GUARD (NEW) ---
     fuzzy_parse_count: int = Field(0, description="Counter to prevent infinite fuzzy parsing loops")
 
+    # --- LOOP GUARD ---
+    consecutive_non_tool: int = Field(0, description="Messages in a row without a tool call (reset on any tool call)")
+
     class Config:
         arbitrary_types_allowed = True
+
+    @field_validator("structure_map")
+    @classmethod
+    def _trim_structure_map(cls, value: str) -> str:
+        # Trimmed once on write; later nodes get the already-short string back
+        # (a full-length slice is a no-op), so no 20KB copy per turn
+        return value[:STRUCTURE_MAP_MAX_CHARS]
+
+    def ledger_json(self) -> str:
+        """
+        Ledger as compact JSON for prompts (indent=2 cost ~30% more tokens).
+        Serialized once and reused by every specialist/validator turn until
+        a ledger field is reassigned (see InvestigationLedger.__setattr__).
+        """
+        if self.ledger._json_cache is None:
+            self.ledger._json_cache = self.ledger.model_dump_json()
+        return self.ledger._json_cache
+
+
+class PhaseOutput(BaseModel):
+    """
+    What a specialist phase hands back to the parent graph.
+    Phases run concurrently, so only reducer-backed channels are returned.
+    """
+    messages: Annotated[List[Any], add_messages] = Field(default_factory=list)
@@ -1,6 +1,10 @@
 import os
 from langchain_core.tools import tool
 
+# Only the head of an external file is ever shown to the LLM (in characters)
+EXTERNAL_CONTEXT_MAX_CHARS = 30000
+EXTERNAL_CONTEXT_MAX_FILE_BYTES = 200 * 1024 * 1024
+
 @tool
 def ask_human(question: str, context: str = ""):
     """
@@ -25,13 +29,23 @@ def read_external_cost_context(file_path: str):
         return f"❌ Error: The file at '{clean_path}' does not exist. Please ask the user for the correct path."
 
     try:
+        size = os.path.getsize(clean_path)
+        if size > EXTERNAL_CONTEXT_MAX_FILE_BYTES:
+            return (
+                f"❌ Error: '{clean_path}' is {size // (1024 * 1024)} MB, above the "
+                f"{EXTERNAL_CONTEXT_MAX_FILE_BYTES // (1024 * 1024)} MB limit. Do not retry; "
+                "ask the user for a smaller export or a summary of the relevant costs."
+            )
+
         # Simple text reading. We rely on the LLM to parse CSV/JSON structure from the raw text.
+        # Only the head is read so memory stays bounded whatever the file size; text mode
+        # counts whole characters and normalizes newlines, so the cut never splits a character.
         with open(clean_path, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
+            content = f.read(EXTERNAL_CONTEXT_MAX_CHARS + 1)
         
         # Truncate if massive to prevent context window explosion
-        if len(content) > 30000:
-            return f"--- FILE: {os.path.basename(clean_path)} (Truncated) ---\n{content[:30000]}\n... [Truncated]"
+        if len(content) > EXTERNAL_CONTEXT_MAX_CHARS:
+            return f"--- FILE: {os.path.basename(clean_path)} (Truncated) ---\n{content[:EXTERNAL_CONTEXT_MAX_CHARS]}\n... [Truncated]"
         
         return f"--- FILE: {os.path.basename(clean_path)} ---\n{content}"
     except Exception as e:
@@ -0,0 +1,67 @@
+# agent/tools/scratchpad.py
+
+import os
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from langchain_core.tools import tool
+
+# --- CONFIGURABLE LIMITS ---
+# Tool output is replayed to the LLM on every later turn, so each call is capped
+GREP_BUDGET_BYTES = int(os.environ.get("GREP_BUDGET_BYTES", "4096"))
+FILE_BUDGET_BYTES = int(os.environ.get("FILE_BUDGET_BYTES", "8192"))
+SCRATCH_MAX_ENTRIES = 64
+
+# Full outputs of truncated calls, oldest evicted first
+_SCRATCH = OrderedDict()
+_SCRATCH_LOCK = Lock()
+
+def _store(text: str) -> str:
+    scratch_id = uuid.uuid4().hex[:12]
+    with _SCRATCH_LOCK:
+        _SCRATCH[scratch_id] = text
+        while len(_SCRATCH) > SCRATCH_MAX_ENTRIES:
+            _SCRATCH.popitem(last=False)
+    return scratch_id
+
+def _head(text: str, budget: int) -> str:
+    """First `budget` bytes of text, cut back to a line boundary when possible."""
+    head = text.encode("utf-8")[:budget].decode("utf-8", errors="ignore")
+    cut = head.rfind("\n")
+    return head[:cut] if cut > 0 else head
+
+def budget_output(text: str, budget: int) -> str:
+    """
+    Returns text unchanged if it fits in `budget` bytes. Otherwise keeps the
+    head, parks the full output in the scratchpad and tells the LLM how to page on.
+    """
+    if len(text.encode("utf-8")) <= budget:
+        return text
+
+    head = _head(text, budget)
+    scratch_id = _store(text)
+    return (
+        f"{head}\n... [Truncated: showing {len(head)} of {len(text)} chars. "
+        f"Call fetch_scratch('{scratch_id}', offset={len(head)}) only if you need the rest] ..."
+    )
+
+@tool
+def fetch_scratch(scratch_id: str, offset: int = 0) -> str:
+    """
+    Fetch more of a truncated tool output, starting at character `offset`.
+    Only use this when the visible part was not enough.
+    """
+    with _SCRATCH_LOCK:
+        text = _SCRATCH.get(scratch_id)
+        if text is not None:
+            _SCRATCH.move_to_end(scratch_id)
+
+    if text is None:
+        return f"Error: No stored output for '{scratch_id}' (it may have expired). Re-run the original tool call."
+
+    offset = max(0, offset)
+    chunk = _head(text[offset:], FILE_BUDGET_BYTES)
+    end = offset + len(chunk)
+    if end < len(text):
+        chunk += f"\n... [More: call fetch_scratch('{scratch_id}', offset={end})] ..."
+    return chunk
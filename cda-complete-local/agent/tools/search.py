@@ -1,9 +1,51 @@
 import os
 import re
-from typing import List, Union, Any, Dict
+import io
+import mmap
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Union, Any, Dict, Set, Tuple
 from langchain_core.tools import tool
-from core.ignore_handler import IgnoreHandler
-from core.file_viewer import detect_binary_file # NEW IMPORT for binary check
+from core.ignore_handler import IgnoreHandler, get_ignore_handler
+from core.file_viewer import is_within_root
+
+# Try to import hyperscan (multi-pattern DFA engine, much faster than re on large repos)
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Try to import numpy (vectorized offset -> line mapping for files with dense matches)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Binary check: a NUL byte in the head of the file (the git/grep heuristic).
+# Done on the buffer being scanned, so no second open per file.
+BINARY_SNIFF_BYTES = 8192
+
+# From this many Hyperscan hits in one file, line numbers come from a newline
+# index (np.searchsorted) instead of counting newlines between hits
+LINE_INDEX_MIN_HITS = 256
+
+# Below this many files a worker pool costs more to start than it saves
+PARALLEL_MIN_FILES = 64
+
+# safe_grep_tool only shows the LLM this many matches per pattern
+TOOL_MATCHES_PER_PATTERN = 20
+
+# Workers start from a clean forkserver (spawn where there is none), never a
+# fork of the caller: LangGraph's executor, the reporter's _IO_POOL and cached
+# boto/grpc clients may hold locks that a forked child would inherit locked.
+# Each worker re-imports this module, which is why the pool is opt-in.
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
 
 # --- GLOBAL BROKER STATE ---
 # This is injected by main.py at startup
@@ -24,43 +66,585 @@ def execute_list_files(directory: str, root_path: str) -> str:
     target_dir = os.path.abspath(os.path.join(abs_root, directory))
 
     # Security Check: Ensure target_dir is within project root
-    if not target_dir.startswith(abs_root):
+    if not is_within_root(target_dir, abs_root):
         return "Error: Access denied (outside project root)."
 
     if not os.path.exists(target_dir):
         return f"Error: Directory {directory} does not exist."
 
-    ignore_handler = IgnoreHandler(abs_root)
+    ignore_handler = get_ignore_handler(abs_root)
+    rel_dir = os.path.relpath(target_dir, abs_root)
+    rel_dir = "" if rel_dir == "." else rel_dir
     items = []
 
     try:
-        for item in os.listdir(target_dir):
-            full_path = os.path.join(target_dir, item)
-            # Use the aggressive ignore handler
-            if not ignore_handler.is_ignored(full_path):
-                if os.path.isdir(full_path):
-                    items.append(f"{item}/")
-                else:
+        with os.scandir(target_dir) as entries:
+            for entry in entries:
+                item = entry.name
+                # Use the aggressive ignore handler
+                if entry.is_dir():
+                    if not ignore_handler.is_ignored_rel(os.path.join(rel_dir, item) if rel_dir else item, True):
+                        items.append(f"{item}/")
+                elif not ignore_handler.is_ignored_file(target_dir, item, rel_dir):
                     items.append(item)
         return f"Contents of {directory}:\n" + "\n".join(sorted(items))
     except Exception as e:
         return f"Error listing directory: {e}"
 
+_LEADING_IGNORECASE = re.compile(r'^\(\?i\)')
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+# Escapes that match by character class or name a code point: on raw bytes
+# they see one byte of a multi-byte UTF-8 character, not the character
+_UNICODE_ESCAPES = frozenset("wWsSdDbBxuUN0123")
+
+# Non-ASCII characters re.IGNORECASE folds onto ASCII letters (İ ı -> i,
+# K -> k, ſ -> s), which a byte-level engine can't see
+_ASCII_CASE_FOLDS = ("\u0130", "\u0131", "\u212a", "\u017f")
+
+# Bytes a Unicode-sensitive pattern may read differently once decoded
+# (str \s also matches the \x1c-\x1f separators)
+_UNICODE_BYTES = rb"[\x1c-\x1f\x80-\xff]"
+_ASCII_CASE_FOLD_BYTES = b"|".join(re.escape(c.encode("utf-8")) for c in _ASCII_CASE_FOLDS)
+
+# The decoded path reads lines with universal newlines: \r\n reaches the
+# patterns as \n, and a lone \r ends a line (renumbering the rest of the file)
+_CR_BYTE = rb"\r"
+_LONE_CR = re.compile(rb"\r(?!\n)")
+
+def _is_unicode_sensitive(raw: str) -> bool:
+    """
+    True if the pattern can match differently on raw bytes than on decoded
+    text once a file holds non-ASCII bytes: `.`, negated classes and
+    \\w \\s \\d \\b (and friends) consume a byte rather than a character,
+    code point escapes name a character, not a byte, and non-ASCII literals.
+    Errs on the side of True.
+    """
+    if not raw.isascii():
+        return True
+    i, n = 0, len(raw)
+    while i < n:
+        c = raw[i]
+        if c == "\\":
+            if i + 1 < n and raw[i + 1] in _UNICODE_ESCAPES:
+                return True
+            i += 2
+            continue
+        if c == "." or raw.startswith("[^", i):
+            return True
+        i += 1
+    return False
+
+# The decoded path matches each line as its own string, trailing \n
+# included: \A and \Z anchor to the line, and `$` or a lookaround sees the
+# line's edge where a whole file has the neighbouring line. Patterns that can
+# tell the difference are never run over a whole file.
+_LINE_ANCHORS = re.compile(r"\\[AZ]|\(\?[a-zA-Z]*s")
+_NEWLINE_CAPABLE = re.compile(r"\\[sWDnx0]|\[\^|\n")
+_LINE_EDGE = re.compile(r"\$|\\B|\(\?<?[=!]")
+
+def _needs_line_scan(raw: str) -> bool:
+    """True if the pattern only matches like the decoded path on single lines."""
+    return bool(_LINE_ANCHORS.search(raw) or (_LINE_EDGE.search(raw) and _NEWLINE_CAPABLE.search(raw)))
+
+def _build_line_guard(valid_patterns: List[Dict[str, Any]]):
+    """
+    Bytes regex flagging the lines a byte-level engine may judge differently
+    from the decoded line-by-line path; see _recheck_lines.
+    - Unicode-sensitive patterns: any non-ASCII byte (or \\x1c-\\x1f)
+    - otherwise: the characters IGNORECASE folds onto ASCII letters
+    - patterns using `$` or \\r: also any \\r (CRLF lines end in \\n decoded)
+    """
+    raws = [vp["raw"] for vp in valid_patterns]
+    parts = [_UNICODE_BYTES if any(map(_is_unicode_sensitive, raws)) else _ASCII_CASE_FOLD_BYTES]
+    if any("$" in raw or "\\r" in raw for raw in raws):
+        parts.append(_CR_BYTE)
+    return re.compile(b"|".join(parts))
+
+def _build_literal_prefilter(valid_patterns: List[Dict[str, Any]]):
+    """
+    When every pattern is a plain string ('docker', 's3'), returns them as
+    one IGNORECASE alternation so a file can be ruled out with a single
+    search before the per-line regex work. Returns None as soon as one
+    pattern uses regex syntax.
+    """
+    literals = []
+    for vp in valid_patterns:
+        raw = _LEADING_IGNORECASE.sub('', vp["raw"])
+        if not raw or _REGEX_METACHARS.intersection(raw):
+            return None
+        literals.append(re.escape(raw))
+    return re.compile("|".join(literals), re.IGNORECASE)
+
+def _build_combined_regex(valid_patterns: List[Dict[str, Any]]):
+    """
+    Fuses all patterns into one alternation so each line is scanned once.
+    Returns None when the patterns can't be safely combined (backreferences
+    would be renumbered, or mid-pattern global flags), in which case every
+    pattern is tried on every line as before.
+    """
+    if len(valid_patterns) < 2:
+        return None
+
+    parts = []
+    for vp in valid_patterns:
+        raw = vp["raw"]
+        if _BACKREFERENCE.search(raw):
+            return None
+        # Patterns are already compiled IGNORECASE; a leading (?i) is only legal at the start
+        parts.append(f"(?:{_LEADING_IGNORECASE.sub('', raw)})")
+
+    try:
+        return re.compile("|".join(parts), re.IGNORECASE)
+    except re.error:
+        return None
+
+def _build_hyperscan_db(valid_patterns: List[Dict[str, Any]]):
+    """
+    Compiles every pattern into a single Hyperscan database.
+    Returns None when hyperscan isn't installed or rejects a pattern
+    (lookarounds, backreferences, ...), or a pattern needs single lines
+    (see _needs_line_scan), so the caller falls back to re.
+    A fresh database is built per call: its scratch space can't be shared
+    between specialists grepping concurrently.
+    """
+    if not HYPERSCAN_AVAILABLE or any(_needs_line_scan(vp["raw"]) for vp in valid_patterns):
+        return None
+
+    expressions = [_LEADING_IGNORECASE.sub('', vp["raw"]).encode('utf-8') for vp in valid_patterns]
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE] * len(expressions)
+        )
+        return db
+    except hyperscan.error:
+        return None
+
+def _build_bytes_regex(valid_patterns: List[Dict[str, Any]]):
+    """
+    One bytes alternation of all patterns, run directly over the mmapped file.
+    Returns None for non-ASCII patterns, backreferences, mid-pattern flags or
+    patterns that need single lines (see _needs_line_scan); those files are
+    decoded and scanned line by line instead. Like Hyperscan, it matches
+    bytes, so it comes with a _build_line_guard.
+    """
+    parts = []
+    for vp in valid_patterns:
+        raw = vp["raw"]
+        if not raw.isascii() or _BACKREFERENCE.search(raw) or _needs_line_scan(raw):
+            return None
+        parts.append(f"(?:{_LEADING_IGNORECASE.sub('', raw)})")
+
+    try:
+        return re.compile("|".join(parts).encode('ascii'), re.IGNORECASE | re.MULTILINE)
+    except re.error:
+        return None
+
+def _line_mask(line: str, valid_patterns: List[Dict[str, Any]]) -> int:
+    """Bitmask of the patterns (vp["bit"]) that match `line`."""
+    mask = 0
+    for vp in valid_patterns:
+        if vp["compiled"].search(line):
+            mask |= vp["bit"]
+    return mask
+
+def _scan_file_re(full_path: str, rel_path: str, valid_patterns: List[Dict[str, Any]],
+                  combined, matches: Dict[Tuple[str, int], tuple], bytes_re=None,
+                  literals=None, guard=None) -> bool:
+    """
+    Python re scan (fallback path). With `bytes_re` the file is mmapped and
+    only lines containing a match are decoded; otherwise every line is.
+    The lines `guard` flags are re-checked decoded (see _scan_mmapped).
+    Without `bytes_re`, files the `literals` regex can't find are skipped
+    up front (an mmapped file is already ruled out by one bytes_re search).
+    Returns False if the file was skipped as binary.
+    """
+    if bytes_re is not None:
+        if os.path.getsize(full_path) == 0:
+            return True
+        with open(full_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data.find(b"\0", 0, BINARY_SNIFF_BYTES) != -1:
+                return False
+            scan = lambda buf, found: _scan_mmap_re(buf, rel_path, valid_patterns, bytes_re, found)
+            _scan_mmapped(data, rel_path, valid_patterns, scan, guard, combined, matches)
+        return True
+
+    with open(full_path, 'rb') as raw:
+        if b"\0" in raw.read(BINARY_SNIFF_BYTES):
+            return False
+        raw.seek(0)
+        if literals is not None:
+            if literals.search(raw.read().decode('utf-8', errors='replace')) is None:
+                return True
+            raw.seek(0)
+        f = io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+        for line_idx, line in enumerate(f):
+            # One pass rules out the (common) lines that match nothing
+            if combined is not None and not combined.search(line):
+                continue
+            mask = _line_mask(line, valid_patterns)
+            if mask:
+                matches[(rel_path, line_idx + 1)] = (line.strip()[:150], mask)
+    return True
+
+def _scan_mmap_re(data, rel_path: str, valid_patterns: List[Dict[str, Any]],
+                  bytes_re, matches: Dict[Tuple[str, int], tuple]):
+    """
+    Jumps from match to match in the raw buffer. Each search resumes at the
+    next line start, so a match can't hide one on the following line.
+    """
+    size = len(data)
+    pos, lineno, cursor = 0, 1, 0
+    while pos < size:
+        m = bytes_re.search(data, pos)
+        if m is None:
+            break
+
+        line_start = data.rfind(b"\n", 0, m.start()) + 1
+        line_end = data.find(b"\n", m.start())
+        pos = size if line_end == -1 else line_end + 1
+
+        lineno += data[cursor:line_start].count(b"\n")
+        cursor = line_start
+
+        # Decode just this line and confirm per pattern
+        line = data[line_start:pos].decode('utf-8', errors='replace')
+        mask = _line_mask(line, valid_patterns)
+        if mask:
+            matches[(rel_path, lineno)] = (line.strip()[:150], mask)
+
+def _scan_decoded(data, rel_path: str, valid_patterns: List[Dict[str, Any]],
+                  combined, matches: Dict[Tuple[str, int], tuple]):
+    """
+    Line-by-line scan of an already mapped buffer, decoded with universal
+    newlines exactly as the io.TextIOWrapper path reads the file.
+    """
+    text = str(data, 'utf-8', errors='replace').replace("\r\n", "\n").replace("\r", "\n")
+    for lineno, line in enumerate(io.StringIO(text), 1):
+        if combined is not None and not combined.search(line):
+            continue
+        mask = _line_mask(line, valid_patterns)
+        if mask:
+            matches[(rel_path, lineno)] = (line.strip()[:150], mask)
+
+def _recheck_lines(data, rel_path: str, valid_patterns: List[Dict[str, Any]],
+                   guard, found: Dict[Tuple[str, int], tuple]) -> bool:
+    """
+    Re-checks every line `guard` flags (see _build_line_guard) decoded, as
+    the line-by-line path sees it, and overwrites the byte engine's verdict
+    on it in `found`. Returns True if any line was flagged.
+    """
+    size = len(data)
+    pos, lineno, cursor = 0, 1, 0
+    flagged = False
+    while pos < size:
+        m = guard.search(data, pos)
+        if m is None:
+            break
+        flagged = True
+
+        line_start = data.rfind(b"\n", 0, m.start()) + 1
+        line_end = data.find(b"\n", m.start())
+        pos = size if line_end == -1 else line_end + 1
+
+        lineno += data[cursor:line_start].count(b"\n")
+        cursor = line_start
+
+        line = data[line_start:pos].decode('utf-8', errors='replace').replace("\r\n", "\n")
+        mask = _line_mask(line, valid_patterns)
+        if mask:
+            found[(rel_path, lineno)] = (line.strip()[:150], mask)
+        else:
+            found.pop((rel_path, lineno), None)
+    return flagged
+
+def _scan_mmapped(data, rel_path: str, valid_patterns: List[Dict[str, Any]], scan_bytes,
+                  guard, combined, matches: Dict[Tuple[str, int], tuple]):
+    """
+    Runs a byte engine (`scan_bytes(data, found)`) over a mapped file and
+    keeps its results identical to the line-by-line path: lines `guard`
+    flags are re-checked decoded, and a file with lone \\r line breaks
+    (numbered differently once decoded) is scanned decoded instead.
+    """
+    if _LONE_CR.search(data) is not None:
+        _scan_decoded(data, rel_path, valid_patterns, combined, matches)
+        return
+
+    found = {}
+    scan_bytes(data, found)
+    if guard is not None and _recheck_lines(data, rel_path, valid_patterns, guard, found):
+        # Re-checked lines may be new; keep the file's entries in line order
+        for key in sorted(found, key=lambda key: key[1]):
+            matches[key] = found[key]
+    else:
+        matches.update(found)
+
+def _line_numbers(data, positions: List[int]):
+    """
+    1-based line number of each (sorted) byte offset. Few hits: count the
+    newlines between consecutive hits. Many hits: index every newline once
+    and binary-search all offsets in a single numpy call.
+    """
+    if NUMPY_AVAILABLE and len(positions) >= LINE_INDEX_MIN_HITS:
+        newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+        return (np.searchsorted(newlines, positions) + 1).tolist()
+
+    linenos = []
+    lineno, cursor = 1, 0
+    for pos in positions:
+        lineno += data[cursor:pos].count(b"\n")
+        cursor = pos
+        linenos.append(lineno)
+    return linenos
+
+def _scan_file_hyperscan(full_path: str, rel_path: str, valid_patterns: List[Dict[str, Any]],
+                         hs_db, matches: Dict[Tuple[str, int], tuple], guard=None,
+                         combined=None) -> bool:
+    """
+    Scans the whole (mmapped) file in one Hyperscan pass, then maps match
+    end offsets back to lines. Candidate lines are confirmed with the
+    compiled re so results are identical to the line-by-line path.
+    Hyperscan matches bytes, so the lines `guard` flags are re-checked
+    decoded (see _scan_mmapped).
+    Returns False if the file was skipped as binary.
+    """
+    if os.path.getsize(full_path) == 0:
+        return True
+
+    with open(full_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data.find(b"\0", 0, BINARY_SNIFF_BYTES) != -1:
+            return False
+        scan = lambda buf, found: _scan_mmap_hyperscan(buf, rel_path, valid_patterns, hs_db, found)
+        _scan_mmapped(data, rel_path, valid_patterns, scan, guard, combined, matches)
+    return True
+
+def _scan_mmap_hyperscan(data, rel_path: str, valid_patterns: List[Dict[str, Any]],
+                         hs_db, matches: Dict[Tuple[str, int], tuple]):
+    """One Hyperscan pass over the buffer; hits are confirmed per line with re."""
+    hits = []
+    hs_db.scan(data, match_event_handler=lambda pid, start, end, flags, ctx: hits.append((end, pid)))
+    if not hits:
+        return
+    hits.sort()
+
+    positions = [max(end - 1, 0) for end, _ in hits]
+    seen = set() # (pattern_id, lineno) - a match reports every end offset
+    for (_, pid), pos, lineno in zip(hits, positions, _line_numbers(data, positions)):
+        if (pid, lineno) in seen:
+            continue
+        seen.add((pid, lineno))
+
+        line_start = data.rfind(b"\n", 0, pos) + 1
+        line_end = data.find(b"\n", pos)
+        raw_line = data[line_start:] if line_end == -1 else data[line_start:line_end + 1]
+        line = raw_line.decode('utf-8', errors='replace')
+
+        vp = valid_patterns[pid]
+        if vp["compiled"].search(line):
+            key = (rel_path, lineno)
+            entry = matches.get(key)
+            if entry is None:
+                matches[key] = (line.strip()[:150], vp["bit"])
+            else:
+                matches[key] = (entry[0], entry[1] | vp["bit"])
+
+def _build_engines(valid_patterns: List[Dict[str, Any]]) -> tuple:
+    """
+    Picks the fastest engine the patterns allow: Hyperscan, then one bytes
+    regex over the mmapped file, then a str alternation as a line pre-filter.
+    The decoded re path also gets a literal file pre-filter when the patterns allow.
+    Returns (hs_db, bytes_re, combined, literals, guard); at most one of
+    hs_db / bytes_re is set, and a byte engine comes with the `guard` for
+    the lines it may judge differently from the decoded path.
+    """
+    combined = _build_combined_regex(valid_patterns)
+    hs_db = _build_hyperscan_db(valid_patterns)
+    if hs_db is not None:
+        return hs_db, None, combined, None, _build_line_guard(valid_patterns)
+
+    bytes_re = _build_bytes_regex(valid_patterns)
+    if bytes_re is not None:
+        return None, bytes_re, combined, None, _build_line_guard(valid_patterns)
+    return None, None, combined, _build_literal_prefilter(valid_patterns), None
+
+def _grep_files(files, valid_patterns: List[Dict[str, Any]], engines: tuple = None,
+                max_per_pattern: int = None) -> tuple:
+    """
+    Scans (full_path, rel_path) pairs with the fastest available engine.
+    With `max_per_pattern`, a pattern is dropped from the engines once it has
+    that many matches, and the scan stops when every pattern is full.
+    Returns (matches, files_scanned): one (snippet, pattern bitmask) entry per
+    matching (rel_path, lineno), in scan order. See _expand_matches.
+    """
+    active = valid_patterns
+    hs_db, bytes_re, combined, literals, guard = engines if engines is not None else _build_engines(active)
+
+    files_scanned = 0
+    matches = {}
+    counts = {vp["raw"]: 0 for vp in valid_patterns}
+
+    for full_path, rel_path in files:
+        before = len(matches)
+        # Each scanner skips binary files itself (NUL in the first 8KB)
+        try:
+            if hs_db is not None:
+                scanned = _scan_file_hyperscan(full_path, rel_path, active, hs_db, matches,
+                                               guard, combined)
+            else:
+                scanned = _scan_file_re(full_path, rel_path, active, combined, matches,
+                                        bytes_re, literals, guard)
+        except Exception: # Catch any other reading errors (e.g., permission); still counted
+            scanned = True
+
+        files_scanned += scanned
+
+        if max_per_pattern is not None and len(matches) > before:
+            # Entries added for this file are the newest ones
+            for _, mask in islice(reversed(matches.values()), len(matches) - before):
+                for vp in active:
+                    if mask & vp["bit"]:
+                        counts[vp["raw"]] += 1
+
+            remaining = [vp for vp in active if counts[vp["raw"]] < max_per_pattern]
+            if len(remaining) < len(active):
+                if not remaining:
+                    break
+                active = remaining
+                hs_db, bytes_re, combined, literals, guard = _build_engines(active)
+
+    return matches, files_scanned
+
+def _expand_matches(matches: Dict[Tuple[str, int], tuple], valid_patterns: List[Dict[str, Any]],
+                    max_per_pattern: int = None) -> Tuple[Dict[str, List[Dict[str, Any]]], Set[str]]:
+    """
+    Per-pattern match lists from the line entries of _grep_files. A line hit
+    by several patterns shares one snippet string across their lists.
+    Returns (matches_by_pattern, truncated): the patterns that had more than
+    `max_per_pattern` matches.
+    """
+    matches_by_pattern = {vp["raw"]: [] for vp in valid_patterns}
+    buckets = {vp["bit"]: matches_by_pattern[vp["raw"]] for vp in valid_patterns}
+    truncated = set()
+
+    for (rel_path, lineno), (snippet, mask) in matches.items():
+        # Visit only the set bits (usually just one)
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            bucket = buckets[bit]
+            if max_per_pattern is None or len(bucket) < max_per_pattern:
+                bucket.append({"file": rel_path, "lineno": lineno, "snippet": snippet})
+            else:
+                truncated.add(bit)
+    return matches_by_pattern, {vp["raw"] for vp in valid_patterns if vp["bit"] in truncated}
+
+# Worker processes only: every shard of a sweep carries the same patterns,
+# so each worker compiles them (and the Hyperscan database) once, not per shard.
+# Workers are single-threaded, so sharing the database's scratch is safe here.
+_WORKER_ENGINES = {}
+
+def _grep_shard(args) -> tuple:
+    """Worker-process entry point: scans one shard with this worker's compiled patterns."""
+    files, raw_patterns = args
+    key = tuple(raw_patterns)
+    cached = _WORKER_ENGINES.get(key)
+    if cached is None:
+        valid_patterns = [
+            {"raw": p, "compiled": re.compile(p, re.IGNORECASE), "bit": 1 << i}
+            for i, p in enumerate(raw_patterns)
+        ]
+        cached = (valid_patterns, _build_engines(valid_patterns))
+        _WORKER_ENGINES.clear()
+        _WORKER_ENGINES[key] = cached
+    return _grep_files(files, *cached)
+
+def _grep_files_parallel(files: List[tuple], valid_patterns: List[Dict[str, Any]], workers: int) -> tuple:
+    """
+    Shards the file list across worker processes (sidesteps the GIL for the
+    regex work) and merges the per-shard results in file order.
+    Falls back to an in-process scan if a pool can't be started
+    (e.g. AWS Lambda has no /dev/shm).
+    """
+    raw_patterns = [vp["raw"] for vp in valid_patterns]
+    # A few shards per worker so one slow shard doesn't idle the others
+    shard_size = max(1, -(-len(files) // (workers * 4)))
+    shards = [(files[i:i + shard_size], raw_patterns) for i in range(0, len(files), shard_size)]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as pool:
+            shard_results = list(pool.map(_grep_shard, shards))
+    except Exception as e:
+        print(f"⚠️ [Grep] Parallel scan unavailable ({e}), scanning in-process")
+        return _grep_files(files, valid_patterns)
+
+    # Shards hold disjoint files, so merging in shard order keeps scan order
+    files_scanned = 0
+    matches = {}
+    for shard_matches, shard_scanned in shard_results:
+        files_scanned += shard_scanned
+        matches.update(shard_matches)
+
+    return matches, files_scanned
+
+def _iter_files(dir_path: str, rel_dir: str, ignore_handler: IgnoreHandler):
+    """
+    Yields (full_path, rel_path) for every non-ignored file under `dir_path`,
+    in os.walk order (a directory's files, then its subdirectories). The
+    DirEntry type info comes with the listing, so there is no stat per entry.
+    Symlinked directories are listed but not followed, as with os.walk.
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+
+        rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+        if is_dir:
+            if not entry.is_symlink() and not ignore_handler.is_ignored_rel(rel_path, True):
+                subdirs.append((entry, rel_path))
+        # Skip ignored files (directory rules are evaluated once per directory)
+        elif not ignore_handler.is_ignored_file(dir_path, entry.name, rel_dir):
+            yield entry.path, rel_path
+
+    for entry, rel_path in subdirs:
+        yield from _iter_files(entry.path, rel_path, ignore_handler)
+
 def execute_safe_grep(
     patterns: Union[List[str], str],
     root_path: str,
-    verbose: bool = False
+    verbose: bool = False,
+    workers: int = 1,
+    max_per_pattern: int = None
 ) -> Dict[str, Any]: 
     """
     Searches the codebase for regex patterns, respecting ignore rules and skipping binary files.
     Returns a structured Dict used by TaskBroker.
+
+    workers > 1 scans in a process pool started from a forkserver (see
+    _POOL_CONTEXT), so threaded and async callers can use it too.
+
+    max_per_pattern keeps only the first N matches of each pattern (in walk
+    order) and stops walking once every pattern has them. Always in-process.
+    A pattern that had more is flagged `truncated` in its result.
     """
     # Ensure patterns is a list
     if isinstance(patterns, str):
         patterns = [patterns]
 
     abs_root = os.path.abspath(root_path)
-    ignore_handler = IgnoreHandler(abs_root)
+    ignore_handler = get_ignore_handler(abs_root)
 
     results = [] # List of {pattern, matches, error}
 
@@ -71,7 +655,8 @@ def execute_safe_grep(
             if len(p.strip()) > 0:
                 valid_patterns.append({
                     "raw": p,
-                    "compiled": re.compile(p, re.IGNORECASE)
+                    "compiled": re.compile(p, re.IGNORECASE),
+                    "bit": 1 << len(valid_patterns)
                 })
         except re.error as e:
              results.append({"pattern": p, "matches": [], "error": str(e)})
@@ -79,52 +664,44 @@ def execute_safe_grep(
     if not valid_patterns:
          return {"results": results, "error": "No valid patterns", "files_scanned": 0}
 
-    # 2. Scan Files
-    files_scanned = 0
-    matches_by_pattern = {vp["raw"]: [] for vp in valid_patterns}
-
-    # Pass ignore_handler to os.walk or filter dirs in place
-    for root, dirs, files in os.walk(abs_root, topdown=True):
-        # Filter directories in-place for os.walk to skip them
-        dirs[:] = [d for d in dirs if not ignore_handler.is_ignored(os.path.join(root, d))]
+    # 2. Collect candidate files (ignored directories are never entered)
+    files = _iter_files(abs_root, "", ignore_handler)
 
-        for file in files:
-            full_path = os.path.join(root, file)
-            # Skip ignored files
-            if ignore_handler.is_ignored(full_path):
-                continue
-            
-            # Skip binary files
-            if detect_binary_file(full_path):
-                continue
+    # 3. Scan Files
+    if max_per_pattern is not None:
+        # Consumes the walk lazily so an early stop skips the rest of the tree.
+        # One match past the cap tells a truncated pattern from one that has exactly N.
+        matches, files_scanned = _grep_files(files, valid_patterns, max_per_pattern=max_per_pattern + 1)
+    else:
+        files = list(files)
+        if workers > 1 and len(files) > PARALLEL_MIN_FILES:
+            matches, files_scanned = _grep_files_parallel(files, valid_patterns, workers)
+        else:
+            matches, files_scanned = _grep_files(files, valid_patterns)
 
-            files_scanned += 1
-            rel_path = os.path.relpath(full_path, abs_root)
-
-            try:
-                with open(full_path, 'r', encoding='utf-8', errors='replace') as f:
-                    for line_idx, line in enumerate(f):
-                        for vp in valid_patterns:
-                            if vp["compiled"].search(line):
-                                clean_line = line.strip()[:150]
-                                matches_by_pattern[vp["raw"]].append({
-                                    "file": rel_path,
-                                    "lineno": line_idx + 1,
-                                    "snippet": clean_line
-                                })
-            except Exception: # Catch any other reading errors (e.g., permission)
-                continue
+    matches_by_pattern, truncated = _expand_matches(matches, valid_patterns, max_per_pattern)
 
-    # 3. Format Results
+    # 4. Format Results
     for vp in valid_patterns:
         results.append({
             "pattern": vp["raw"],
             "matches": matches_by_pattern[vp["raw"]],
-            "error": None
+            "error": None,
+            "truncated": vp["raw"] in truncated
         })
 
     return {"results": results, "files_scanned": files_scanned}
 
+async def aexecute_safe_grep(
+    patterns: Union[List[str], str],
+    root_path: str,
+    verbose: bool = False,
+    workers: int = 1,
+    max_per_pattern: int = None
+) -> Dict[str, Any]:
+    """Async variant of execute_safe_grep; the scan runs in a worker thread."""
+    return await asyncio.to_thread(execute_safe_grep, patterns, root_path, verbose, workers, max_per_pattern)
+
 # --- TOOL WRAPPERS ---
 
 @tool
@@ -132,20 +709,56 @@ def list_files_tool(directory: str, root_path: str) -> str:
     """Tool wrapper for listing files."""
     return execute_list_files(directory, root_path)
 
-@tool
-def safe_grep_tool(patterns: Union[List[str], str], root_path: str) -> str:
-    """Tool wrapper for grepping codebase (returns string for LLM)."""
-    data = execute_safe_grep(patterns, root_path)
-    
+def format_grep_results(data: Dict[str, Any], max_lines: int = None) -> str:
+    """
+    Renders execute_safe_grep output as `file:line: snippet` lines for the LLM.
+    A line matched by several patterns is shown once, suffixed with
+    `(patterns: A|B)`, instead of once per pattern. Patterns cut off at
+    max_per_pattern get a note after the lines so the LLM can narrow them.
+    """
     output = []
     if "error" in data and data["error"]:
         return f"Error: {data['error']}"
 
-    for r in data.get("results", []):
+    results = data.get("results", [])
+    patterns_by_line = {}
+    for r in results:
+        if not r.get("error"):
+            for m in r.get("matches", []):
+                patterns_by_line.setdefault((m["file"], m["lineno"]), {})[r["pattern"]] = None
+
+    shown = set()
+    for r in results:
+        if max_lines is not None and len(output) >= max_lines:
+            break
         if r.get("error"):
             output.append(f"Error searching pattern '{r.get('pattern')}': {r['error']}")
             continue
         for m in r.get("matches", []):
-            output.append(f"{m['file']}:{m['lineno']}: {m['snippet']}")
+            key = (m["file"], m["lineno"])
+            if key in shown:
+                continue
+            shown.add(key)
+
+            line = f"{m['file']}:{m['lineno']}: {m['snippet']}"
+            if len(patterns_by_line[key]) > 1:
+                line += f"  (patterns: {'|'.join(patterns_by_line[key])})"
+            output.append(line)
+
+            # Only format the lines that will be shown
+            if max_lines is not None and len(output) >= max_lines:
+                break
             
-    return "\n".join(output[:100]) if output else "No matches found."
\ No newline at end of file
+    notes = [
+        f"Pattern '{r['pattern']}': showing the first {len(r['matches'])} matches (truncated, more exist)"
+        for r in results if r.get("truncated")
+    ]
+    if not output:
+        return "No matches found."
+    return "\n".join(output[:max_lines] + notes)
+
+@tool
+def safe_grep_tool(patterns: Union[List[str], str], root_path: str) -> str:
+    """Tool wrapper for grepping codebase (returns string for LLM)."""
+    data = execute_safe_grep(patterns, root_path, max_per_pattern=TOOL_MATCHES_PER_PATTERN)
+    return format_grep_results(data, max_lines=100)
@@ -3,6 +3,7 @@
 import os
 from langchain_core.tools import tool
 from typing import Optional
+from core.fast_json import dumps
 
 # Check environment
 IS_LOCAL = os.environ.get("SCROOGE_ENV") == "LOCAL"
@@ -46,8 +47,9 @@ def read_file(file_path: str, start_line: int = 1, end_line: Optional[int] = Non
 
 # --- ASK HUMAN IMPLEMENTATION ---
 if IS_LOCAL:
-    # In Local Mode, we need to raise an exception to pause the runner loop
-    # Define exception here to avoid circular imports
+    from langgraph.types import interrupt
+
+    # Deprecated: ask_human no longer raises this; kept so existing imports still work
     class HumanInputNeeded(Exception):
         def __init__(self, question: str):
             self.question = question
@@ -65,9 +67,11 @@ if IS_LOCAL:
         Returns:
             Human's answer as string
         """
-        # This Exception MUST be caught by local_runner.py
-        # Note: local_runner.py must import this exception class or catch the name
-        raise HumanInputNeeded(question)
+        # Checkpoints the graph at this tool call; local_runner.py resumes it with
+        # Command(resume={interrupt_id: answer}) and the answer becomes this tool's
+        # return value
+        answer = interrupt({"question": question})
+        return f"User Answer: {answer}"
 else:
     @tool
     def ask_human(question: str) -> str:
@@ -107,12 +111,42 @@ def check_price_knowledge(metric: str) -> str:
     else:
         return f"❌ Price UNKNOWN. You must ask the user for BOTH Volume AND Rate."
 
+@tool
+def check_prices_bulk(metrics: list[str]) -> str:
+    """
+    Check pricing knowledge for many metrics in ONE call.
+    Prefer this over calling check_price_knowledge once per item.
+    
+    Args:
+        metrics: All metrics to check (e.g., ['tokens', 'gb-month', 'stripe-transactions'])
+    
+    Returns:
+        JSON object keyed by metric: {"known": bool, "price": price per unit or None}.
+        Known -> ask the user for Volume only. Unknown -> ask for BOTH Volume AND Rate.
+    
+    Examples:
+        check_prices_bulk(['tokens', 'invocations', 'twilio-sms'])
+    """
+    from core.pricing import fuzzy_match_metric
+    
+    results = {}
+    for metric in dict.fromkeys(metrics):  # de-duplicated, order kept
+        match = fuzzy_match_metric(metric)
+        known = match is not None and match['price_per_unit'] > 0.0
+        results[metric] = {"known": known, "price": match['price_per_unit'] if known else None}
+    # Serialized here (compact) rather than by LangChain's json.dumps fallback
+    return dumps(results)
+
+def _format_rate(price: float) -> str:
+    """Plain decimal for small unit prices ($0.0000002, not $2e-07)."""
+    return f"{price:.12f}".rstrip("0").rstrip(".") or "0"
+
 @tool
 def calculate_cost(
     volume: float,
     metric: str,
     service_name: str = ""
-) -> dict:
+) -> str:
     """
     Calculate monthly cost for a given volume and metric using our pricing knowledge base.
     This tool handles all unit conversions and pricing lookups automatically.
@@ -123,7 +157,7 @@ def calculate_cost(
         service_name: Optional service name for specific pricing (e.g., "gpt-4", "s3")
     
     Returns:
-        Dictionary with:
+        JSON object with:
         - monthly_cost: Calculated cost in USD
         - volume: Input volume
         - metric: Input metric
@@ -149,23 +183,23 @@ def calculate_cost(
     try:
         # Validate inputs
         if volume < 0:
-            return {
+            return dumps({
                 "error": "Volume cannot be negative",
                 "monthly_cost": 0.0,
                 "needs_user_input": False
-            }
+            })
         
         # Find pricing
         search_key = f"{service_name}-{metric}" if service_name else metric
         result = fuzzy_match_metric(search_key)
         
         if not result:
-            return {
+            return dumps({
                 "error": f"No pricing found for {search_key}",
                 "monthly_cost": 0.0,
                 "needs_user_input": True,
                 "suggestion": f"Ask user: 'What is your rate for {metric}?'"
-            }
+            })
         
         price_per_unit = result['price_per_unit']
         unit_desc = result.get('unit_description', 'per unit')
@@ -174,23 +208,23 @@ def calculate_cost(
         # Simple multiplication - all prices are now per single unit
         monthly_cost = volume * price_per_unit
         
-        return {
+        return dumps({
             "monthly_cost": round(monthly_cost, 4),
             "volume": volume,
             "metric": metric,
             "price_per_unit": price_per_unit,
             "unit_description": unit_desc,
             "provider": provider,
-            "breakdown": f"{volume:,.0f} {metric} × ${price_per_unit}/{unit_desc.replace('per ', '')} = ${monthly_cost:.2f}",
+            "breakdown": f"{volume:,.0f} {metric} × ${_format_rate(price_per_unit)}/{unit_desc.replace('per ', '')} = ${monthly_cost:.2f}",
             "needs_user_input": False
-        }
+        })
     
     except Exception as e:
-        return {
+        return dumps({
             "error": f"Calculation failed: {str(e)}",
             "monthly_cost": 0.0,
             "needs_user_input": False
-        }
+        })
 
 @tool
 def complete_validation() -> str:
@@ -209,6 +243,7 @@ SPECIALIST_TOOLS = [
     read_file,
     ask_human,
     check_price_knowledge,
+    check_prices_bulk,
     calculate_cost,  # ← NEW TOOL ADDED
     complete_validation
 ]
\ No newline at end of file
@@ -16,14 +16,16 @@ Usage:
 Author: Scrooge Scanner Team
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from pathlib import Path
 import logging
 
 # Import base classes
 from core.parsers.base_parser import (
     BaseParser,
     ParsedConfig,
-    ParserRegistry
+    ParserRegistry,
+    build_parser_router
 )
 
 # Import all concrete parsers
@@ -40,6 +42,10 @@ logger = logging.getLogger(__name__)
 # Global parser registry instance
 _global_registry: Optional[ParserRegistry] = None
 
+# Shared non-verbose parser instances and the MATCHES router built from them
+_default_parsers: Optional[List[BaseParser]] = None
+_route_parsers = None
+
 
 def get_registry() -> ParserRegistry:
     """
@@ -54,12 +60,8 @@ def get_registry() -> ParserRegistry:
         _global_registry = ParserRegistry()
         
         # Register all parsers
-        _global_registry.register(DockerfileParser())
-        _global_registry.register(ServerlessParser())
-        _global_registry.register(DockerComposeParser())
-        _global_registry.register(TerraformParser())
-        _global_registry.register(RequirementsParser())
-        _global_registry.register(PackageJsonParser())
+        for parser in _get_default_parsers():
+            _global_registry.register(parser)
         
         logger.debug("Initialized global parser registry with 6 parsers")
     
@@ -76,6 +78,9 @@ def get_all_parsers(verbose: bool = False) -> List[BaseParser]:
     Returns:
         List of parser instances
     """
+    if not verbose:
+        return list(_get_default_parsers())
+
     return [
         DockerfileParser(verbose=verbose),
         ServerlessParser(verbose=verbose),
@@ -86,6 +91,31 @@ def get_all_parsers(verbose: bool = False) -> List[BaseParser]:
     ]
 
 
+def _get_default_parsers() -> List[BaseParser]:
+    """
+    Create the shared non-verbose parser instances once and route them by MATCHES.
+    
+    Returns:
+        Cached list of parser instances, in dispatch order
+    """
+    global _default_parsers, _route_parsers
+    
+    if _default_parsers is None:
+        parsers = [
+            DockerfileParser(),
+            ServerlessParser(),
+            DockerComposeParser(),
+            TerraformParser(),
+            RequirementsParser(),
+            PackageJsonParser(),
+        ]
+        
+        _route_parsers = build_parser_router(parsers)
+        _default_parsers = parsers
+    
+    return _default_parsers
+
+
 def parse_file(
     file_path: str,
     verbose: bool = False
@@ -136,9 +166,9 @@ def get_parser_for_file(file_path: str) -> Optional[BaseParser]:
     Returns:
         Parser instance if file can be parsed, None otherwise
     """
-    parsers = get_all_parsers()
+    _get_default_parsers()
     
-    for parser in parsers:
+    for parser in _route_parsers(Path(file_path).name):
         if parser.can_parse(file_path):
             return parser
     
@@ -183,6 +213,7 @@ __all__ = [
     'parse_file',
     'parse_directory',
     'get_parser_for_file',
+    'build_parser_router',
     'get_supported_file_types',
 ]
 
@@ -0,0 +1,8 @@
+# core/ast_parsers/__init__.py
+from .python_ast import PythonASTParser, parse_python_file, parse_python_files
+from .javascript_ast import JavaScriptASTParser, parse_javascript_file, parse_javascript_files
+
+__all__ = [
+    'PythonASTParser', 'parse_python_file', 'parse_python_files',
+    'JavaScriptASTParser', 'parse_javascript_file', 'parse_javascript_files'
+]
@@ -1,8 +1,8 @@
 """
 JavaScript/TypeScript AST Parser
 
-Extracts structural information from JavaScript and TypeScript files using tree-sitter.
-Falls back to regex-based parsing if tree-sitter is unavailable.
+Extracts structural information from JavaScript and TypeScript files using
+precompiled regex patterns.
 
 Detects:
 - Import/require statements (AI libraries, cloud SDKs)
@@ -20,30 +20,47 @@ Supports:
 Author: Scrooge Scanner Team
 """
 
+import os
 import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Try to import tree-sitter
-try:
-    from tree_sitter_languages import get_language, get_parser
-    TREE_SITTER_AVAILABLE = True
-except ImportError:
-    TREE_SITTER_AVAILABLE = False
-    logger.warning(
-        "tree-sitter-languages not installed. Using regex fallback. "
-        "Install with: pip install tree-sitter-languages"
-    )
+# Below this many files a worker pool costs more to start than it saves
+PARALLEL_MIN_FILES = 64
+
+# fork shares the parent's imported modules copy-on-write (no re-import per worker)
+_POOL_CONTEXT = multiprocessing.get_context(
+    "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+)
+
+# Extraction patterns, compiled once at import
+_JS_IMPORT_RE = re.compile(r"import\s+(?:(?:\{[^}]+\}|\*\s+as\s+\w+|\w+)(?:\s*,\s*(?:\{[^}]+\}|\w+))?\s+from\s+)?['\"]([^'\"]+)['\"]")
+_JS_REQUIRE_RE = re.compile(r"require\(['\"]([^'\"]+)['\"]\)")
+_JS_FUNC_RE = re.compile(r"(?:async\s+)?function\s+(\w+)\s*\([^)]*\)")
+_JS_ARROW_RE = re.compile(r"(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>")
+_JS_METHOD_RE = re.compile(r"(\w+)\s*:\s*(?:async\s+)?function\s*\([^)]*\)")
+_FETCH_RE = re.compile(r"fetch\s*\(['\"]([^'\"]+)['\"]")
+_AXIOS_RE = re.compile(r"axios\.(get|post|put|patch|delete)\s*\(['\"]([^'\"]+)['\"]")
+_OPENAI_RE = re.compile(r"(openai|client)\.(chat|completions?|embeddings?)\.(create|generate)")
+_ASYNC_FUNC_RE = re.compile(r'\basync\s+function\b')
+_AWAIT_RE = re.compile(r'\bawait\s+')
+
+_JS_EXTS = frozenset({'.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs'})
+
+
+def _substring_alternation(libraries: set) -> re.Pattern:
+    """Regex that finds any of the library names as a substring."""
+    return re.compile('|'.join(re.escape(lib) for lib in sorted(libraries)))
 
 
 class JavaScriptASTParser:
     """
-    Parser for JavaScript/TypeScript source files.
-    
-    Uses tree-sitter when available, falls back to regex-based parsing.
+    Parser for JavaScript/TypeScript source files (regex-based).
     """
     
     # AI/ML libraries for JavaScript
@@ -62,6 +79,9 @@ class JavaScriptASTParser:
     # HTTP client libraries
     HTTP_LIBRARIES = {'axios', 'node-fetch', 'got', 'superagent', 'request'}
     
+    _LLM_LIB_RE = _substring_alternation(LLM_LIBRARIES)
+    _CLOUD_LIB_RE = _substring_alternation(CLOUD_LIBRARIES)
+    
     def __init__(self, verbose: bool = False):
         """
         Initialize JavaScript AST parser.
@@ -71,20 +91,10 @@ class JavaScriptASTParser:
         """
         self.verbose = verbose
         self.logger = logging.getLogger(f"{__name__}.JavaScriptASTParser")
-        
-        if TREE_SITTER_AVAILABLE:
-            try:
-                self.parser = get_parser('javascript')
-                self.language = get_language('javascript')
-            except Exception as e:
-                self.logger.warning(f"Failed to load tree-sitter: {e}. Using regex fallback.")
-                self.parser = None
-        else:
-            self.parser = None
     
     def can_parse(self, file_path: str) -> bool:
         """Check if file is a JavaScript/TypeScript file."""
-        return file_path.endswith(('.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs'))
+        return os.path.splitext(file_path)[1] in _JS_EXTS
     
     def parse_file(self, file_path: str) -> Dict[str, Any]:
         """
@@ -103,29 +113,14 @@ class JavaScriptASTParser:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 source = f.read()
             
-            if self.parser:
-                return self._parse_with_tree_sitter(file_path, source)
-            else:
-                return self._parse_with_regex(file_path, source)
+            return self._parse_with_regex(file_path, source)
                 
         except Exception as e:
             self.logger.error(f"Failed to parse {file_path}: {e}")
             return {'file_path': file_path, 'error': str(e)}
     
-    def _parse_with_tree_sitter(self, file_path: str, source: str) -> Dict[str, Any]:
-        """Parse using tree-sitter (more accurate but requires library)."""
-        tree = self.parser.parse(bytes(source, 'utf8'))
-        
-        return {
-            'file_path': file_path,
-            'imports': self._extract_imports_ts(tree, source),
-            'functions': self._extract_functions_ts(tree, source),
-            'api_calls': self._extract_api_calls_ts(tree, source),
-            'async_patterns': self._extract_async_patterns_ts(tree, source),
-        }
-    
     def _parse_with_regex(self, file_path: str, source: str) -> Dict[str, Any]:
-        """Parse using regex patterns (fallback method)."""
+        """Parse using regex patterns."""
         return {
             'file_path': file_path,
             'imports': self._extract_imports_regex(source),
@@ -134,31 +129,22 @@ class JavaScriptASTParser:
             'async_patterns': self._extract_async_patterns_regex(source),
         }
     
-    # ========== Regex-based Extraction (Fallback) ==========
+    # ========== Regex-based Extraction ==========
     
     def _extract_imports_regex(self, source: str) -> List[Dict[str, Any]]:
         """Extract import statements using regex."""
         imports = []
         
         # Pattern 1: import ... from '...'
-        import_pattern = r"import\s+(?:(?:\{[^}]+\}|\*\s+as\s+\w+|\w+)(?:\s*,\s*(?:\{[^}]+\}|\w+))?\s+from\s+)?['\"]([^'\"]+)['\"]"
-        for match in re.finditer(import_pattern, source):
-            module = match.group(1)
-            imports.append({
-                'module': module,
-                'is_llm': any(lib in module for lib in self.LLM_LIBRARIES),
-                'is_cloud': any(lib in module for lib in self.CLOUD_LIBRARIES),
-            })
-        
         # Pattern 2: require('...')
-        require_pattern = r"require\(['\"]([^'\"]+)['\"]\)"
-        for match in re.finditer(require_pattern, source):
-            module = match.group(1)
-            imports.append({
-                'module': module,
-                'is_llm': any(lib in module for lib in self.LLM_LIBRARIES),
-                'is_cloud': any(lib in module for lib in self.CLOUD_LIBRARIES),
-            })
+        for pattern in (_JS_IMPORT_RE, _JS_REQUIRE_RE):
+            for match in pattern.finditer(source):
+                module = match.group(1)
+                imports.append({
+                    'module': module,
+                    'is_llm': self._LLM_LIB_RE.search(module) is not None,
+                    'is_cloud': self._CLOUD_LIB_RE.search(module) is not None,
+                })
         
         return imports
     
@@ -167,8 +153,7 @@ class JavaScriptASTParser:
         functions = []
         
         # Pattern 1: function name() {}
-        func_pattern = r"(?:async\s+)?function\s+(\w+)\s*\([^)]*\)"
-        for match in re.finditer(func_pattern, source):
+        for match in _JS_FUNC_RE.finditer(source):
             functions.append({
                 'name': match.group(1),
                 'is_async': 'async' in match.group(0),
@@ -176,8 +161,7 @@ class JavaScriptASTParser:
             })
         
         # Pattern 2: const name = () => {}
-        arrow_pattern = r"(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>"
-        for match in re.finditer(arrow_pattern, source):
+        for match in _JS_ARROW_RE.finditer(source):
             functions.append({
                 'name': match.group(1),
                 'is_async': 'async' in match.group(0),
@@ -185,8 +169,7 @@ class JavaScriptASTParser:
             })
         
         # Pattern 3: name: function() {} (object methods)
-        method_pattern = r"(\w+)\s*:\s*(?:async\s+)?function\s*\([^)]*\)"
-        for match in re.finditer(method_pattern, source):
+        for match in _JS_METHOD_RE.finditer(source):
             functions.append({
                 'name': match.group(1),
                 'is_async': 'async' in match.group(0),
@@ -200,8 +183,7 @@ class JavaScriptASTParser:
         api_calls = []
         
         # Pattern 1: fetch()
-        fetch_pattern = r"fetch\s*\(['\"]([^'\"]+)['\"]"
-        for match in re.finditer(fetch_pattern, source):
+        for match in _FETCH_RE.finditer(source):
             api_calls.append({
                 'type': 'http',
                 'target': 'fetch',
@@ -209,8 +191,7 @@ class JavaScriptASTParser:
             })
         
         # Pattern 2: axios.get/post/etc
-        axios_pattern = r"axios\.(get|post|put|patch|delete)\s*\(['\"]([^'\"]+)['\"]"
-        for match in re.finditer(axios_pattern, source):
+        for match in _AXIOS_RE.finditer(source):
             api_calls.append({
                 'type': 'http',
                 'target': f'axios.{match.group(1)}',
@@ -218,8 +199,7 @@ class JavaScriptASTParser:
             })
         
         # Pattern 3: OpenAI/LLM API calls
-        openai_pattern = r"(openai|client)\.(chat|completions?|embeddings?)\.(create|generate)"
-        for match in re.finditer(openai_pattern, source):
+        for match in _OPENAI_RE.finditer(source):
             api_calls.append({
                 'type': 'llm',
                 'target': match.group(0),
@@ -232,7 +212,7 @@ class JavaScriptASTParser:
         patterns = []
         
         # Count async functions
-        async_func_count = len(re.findall(r'\basync\s+function\b', source))
+        async_func_count = len(_ASYNC_FUNC_RE.findall(source))
         if async_func_count > 0:
             patterns.append({
                 'type': 'async_functions',
@@ -240,7 +220,7 @@ class JavaScriptASTParser:
             })
         
         # Count await expressions
-        await_count = len(re.findall(r'\bawait\s+', source))
+        await_count = len(_AWAIT_RE.findall(source))
         if await_count > 0:
             patterns.append({
                 'type': 'await_expressions',
@@ -255,25 +235,6 @@ class JavaScriptASTParser:
             })
         
         return patterns
-    
-    # ========== Tree-sitter based Extraction (More Accurate) ==========
-    
-    def _extract_imports_ts(self, tree, source: str) -> List[Dict[str, Any]]:
-        """Extract imports using tree-sitter (placeholder - requires full implementation)."""
-        # For now, fallback to regex
-        return self._extract_imports_regex(source)
-    
-    def _extract_functions_ts(self, tree, source: str) -> List[Dict[str, Any]]:
-        """Extract functions using tree-sitter."""
-        return self._extract_functions_regex(source)
-    
-    def _extract_api_calls_ts(self, tree, source: str) -> List[Dict[str, Any]]:
-        """Extract API calls using tree-sitter."""
-        return self._extract_api_calls_regex(source)
-    
-    def _extract_async_patterns_ts(self, tree, source: str) -> List[Dict[str, str]]:
-        """Extract async patterns using tree-sitter."""
-        return self._extract_async_patterns_regex(source)
 
 
 # Convenience function
@@ -290,3 +251,31 @@ def parse_javascript_file(file_path: str, verbose: bool = False) -> Dict[str, An
     """
     parser = JavaScriptASTParser(verbose=verbose)
     return parser.parse_file(file_path)
+
+
+def parse_javascript_files(file_paths: List[str], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Parse many JavaScript/TypeScript files, one result per path in input order.
+    
+    Large batches are spread over worker processes (parsing is CPU-bound, so
+    threads would serialize on the GIL). Falls back to in-process parsing if
+    a pool can't be started (e.g. AWS Lambda has no /dev/shm).
+    
+    Args:
+        file_paths: Paths to parse
+        workers: Worker processes (default: CPU count)
+        
+    Returns:
+        List of parse_file result dictionaries
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(file_paths) <= PARALLEL_MIN_FILES:
+        return [parse_javascript_file(path) for path in file_paths]
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as pool:
+            # Batches of paths per task amortize the IPC round trips
+            return list(pool.map(parse_javascript_file, file_paths, chunksize=32))
+    except Exception as e:
+        logger.warning(f"Parallel parsing unavailable ({e}), parsing in-process")
+        return [parse_javascript_file(path) for path in file_paths]
\ No newline at end of file
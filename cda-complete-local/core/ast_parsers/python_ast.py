@@ -1,8 +1,488 @@
-from typing import List, Dict, Any
-
-class PythonASTParser:
-    def parse_file(self, file_path: str, content: str) -> Dict[str, Any]:
-        return {"llm_calls": [], "functions": [], "confidence": "low"}
-    
-    def get_file_extensions(self) -> List[str]:
-        return [".py"]
+"""
+Python AST Parser
+
+Extracts structural information from Python source files using the built-in AST module:
+- Import statements (detect AI/cloud libraries)
+- Function/class definitions
+- API calls and network requests
+- Decorator usage
+- Async/await patterns
+
+This is an improved version extracted from structure_parser.py with better
+API call detection and cost-relevant pattern recognition.
+
+Author: Scrooge Scanner Team
+"""
+
+import ast
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set
+from pathlib import Path
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Below this many files a worker pool costs more to start than it saves
+PARALLEL_MIN_FILES = 64
+
+# fork shares the parent's imported modules copy-on-write (no re-import per worker)
+_POOL_CONTEXT = multiprocessing.get_context(
+    "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+)
+
+# Parser-produced nodes are never subclassed, so exact type checks (one hash
+# lookup / identity test) stand in for isinstance and its MRO walk
+_FUNC_TYPES = frozenset({ast.FunctionDef, ast.AsyncFunctionDef})
+_PY_EXTS = frozenset({'.py'})
+
+# Import classification keywords (substring match on the lowercased module)
+_LLM_IMPORT_RE = re.compile('|'.join(map(re.escape, ['openai', 'anthropic', 'langchain', 'cohere', 'transformers'])))
+_CLOUD_IMPORT_RE = re.compile('|'.join(map(re.escape, ['boto3', 'google.cloud', 'azure', 'aws'])))
+
+# --- Extraction records ---
+# A repo scan creates one of these per import/function/call; slotted instances
+# skip the per-object __dict__ (smaller, faster to build than dicts).
+# Use dataclasses.asdict() where plain dicts are needed (e.g. JSON output).
+
+@dataclass(slots=True)
+class ImportInfo:
+    """An import; `name` is set for `from module import name`."""
+    module: str
+    alias: Optional[str]
+    is_llm: bool
+    is_cloud: bool
+    name: Optional[str] = None
+
+
+@dataclass(slots=True)
+class FunctionInfo:
+    """A function definition with its argument and decorator names."""
+    name: str
+    args: List[str]
+    is_async: bool
+    decorators: List[str]
+    lineno: int
+
+
+@dataclass(slots=True)
+class ClassInfo:
+    """A class definition with its base names and method count."""
+    name: str
+    bases: List[str]
+    methods: int
+    lineno: int
+
+
+@dataclass(slots=True)
+class ApiCall:
+    """A cost-relevant call: type is 'llm', 'cloud' or 'http'."""
+    type: str
+    target: str
+    lineno: int
+
+
+@dataclass(slots=True)
+class AsyncPattern:
+    """async_function (with `name`), await, async_with or async_for."""
+    type: str
+    lineno: int
+    name: Optional[str] = None
+
+
+@dataclass(slots=True)
+class DecoratorInfo:
+    """A decorator applied to a function."""
+    decorator: str
+    function: str
+    lineno: int
+
+
+def _compile_lib_patterns(patterns_by_lib: Dict[str, List[str]], strip_dots: bool = False) -> tuple:
+    """(lib, regex) pairs, the regex matching any of the lib's lowercased call patterns."""
+    return tuple(
+        (
+            lib.replace('.', '') if strip_dots else lib,
+            re.compile('|'.join(re.escape(pattern.lower()) for pattern in patterns)),
+        )
+        for lib, patterns in patterns_by_lib.items()
+    )
+
+
+class PythonASTParser:
+    """
+    Parser for Python source files using AST.
+    
+    Focuses on cost-relevant patterns:
+    - LLM API calls (OpenAI, Anthropic, etc.)
+    - Cloud SDK usage (boto3, google-cloud)
+    - HTTP requests
+    - Async operations
+    """
+    
+    # API call patterns to detect
+    LLM_API_PATTERNS = {
+        'openai': ['ChatCompletion', 'Completion', 'Embedding', 'create'],
+        'anthropic': ['messages', 'completions', 'Message', 'Claude'],
+        'langchain': ['LLMChain', 'ChatOpenAI', 'OpenAI', 'Anthropic'],
+        'cohere': ['generate', 'embed', 'classify'],
+    }
+    
+    CLOUD_API_PATTERNS = {
+        'boto3': ['client', 'resource', 'invoke', 'put_object', 'get_object'],
+        'google.cloud': ['storage', 'pubsub', 'functions', 'run'],
+        'azure': ['BlobServiceClient', 'QueueClient', 'ServiceBusClient'],
+    }
+    
+    HTTP_METHODS = {'get', 'post', 'put', 'patch', 'delete', 'request'}
+    
+    # Compiled once at class load; _analyze_call runs for every ast.Call
+    _LLM_MATCHERS = _compile_lib_patterns(LLM_API_PATTERNS)
+    _CLOUD_MATCHERS = _compile_lib_patterns(CLOUD_API_PATTERNS, strip_dots=True)
+    _HTTP_RE = re.compile(r'(?:^|\.)(?:' + '|'.join(sorted(HTTP_METHODS)) + r')$')
+    
+    def __init__(self, verbose: bool = False):
+        """
+        Initialize Python AST parser.
+        
+        Args:
+            verbose: Enable verbose logging
+        """
+        self.verbose = verbose
+        self.logger = logging.getLogger(f"{__name__}.PythonASTParser")
+    
+    def can_parse(self, file_path: str) -> bool:
+        """Check if file is a Python source file."""
+        return os.path.splitext(file_path)[1] in _PY_EXTS
+    
+    def parse_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        Parse Python file and extract structural information.
+        
+        Args:
+            file_path: Path to Python file
+            
+        Returns:
+            Dictionary with extracted information:
+            - file_path: Original file path
+            - imports: List of ImportInfo
+            - functions: List of FunctionInfo
+            - classes: List of ClassInfo
+            - api_calls: List of ApiCall
+            - async_patterns: List of AsyncPattern
+            - decorators: List of DecoratorInfo
+            - error: Error message if parsing failed
+            
+            The lists are shared with the parse cache; treat them as read-only.
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return {'file_path': file_path, 'error': 'File not found'}
+        
+        # Unchanged files (same mtime and size) are parsed once per process
+        result = _cached_parse(os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+        return {**result, 'file_path': file_path}
+    
+    def _parse_uncached(self, file_path: str) -> Dict[str, Any]:
+        """Read, parse and collect one file (see parse_file)."""
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            source = data.decode('utf-8', errors='ignore')
+            
+            # Bytes let the parser honor a UTF-8 BOM and PEP 263 coding cookies
+            # (a decoded str with a BOM is a SyntaxError); undeclared non-UTF-8
+            # files fall back to the lossy text
+            try:
+                tree = ast.parse(data, filename=file_path)
+            except SyntaxError:
+                tree = ast.parse(source, filename=file_path)
+            
+            # One descent collects everything (was six ast.walk passes)
+            visitor = _CollectingVisitor(self, source)
+            visitor.collect(tree)
+            
+            result = {
+                'file_path': file_path,
+                'imports': visitor.imports,
+                'functions': visitor.functions,
+                'classes': visitor.classes,
+                'api_calls': visitor.api_calls,
+                'async_patterns': visitor.async_patterns,
+                'decorators': visitor.decorators,
+            }
+            
+            return result
+            
+        except SyntaxError as e:
+            self.logger.warning(f"Syntax error in {file_path}: {e}")
+            return {'file_path': file_path, 'error': f'Syntax error: {e}'}
+        except Exception as e:
+            self.logger.error(f"Failed to parse {file_path}: {e}")
+            return {'file_path': file_path, 'error': str(e)}
+    
+    def _analyze_call(self, node: ast.Call, source: str) -> Optional[ApiCall]:
+        """
+        Analyze a function call to determine if it's an API call.
+        
+        Returns an ApiCall (type 'llm', 'cloud' or 'http', the called
+        function/method and its line), or None for other calls.
+        """
+        target = self._get_call_target(node)
+        
+        if not target:
+            return None
+        
+        lowered = target.lower()
+        undotted = lowered.replace('.', '')
+        call_type = 'other'
+        
+        # Check for LLM API calls
+        if any(lib in lowered and pattern_re.search(lowered) for lib, pattern_re in self._LLM_MATCHERS):
+            call_type = 'llm'
+        
+        # Check for cloud API calls (library matched ignoring dots, e.g. google.cloud)
+        elif any(
+            lib in undotted and pattern_re.search(lowered)
+            for lib, pattern_re in self._CLOUD_MATCHERS
+        ):
+            call_type = 'cloud'
+        
+        # Check for HTTP calls
+        elif self._HTTP_RE.search(lowered):
+            call_type = 'http'
+        
+        # Only return if it's a cost-relevant call
+        if call_type != 'other':
+            return ApiCall(call_type, target, node.lineno)
+        
+        return None
+    
+    def _get_call_target(self, node: ast.Call) -> Optional[str]:
+        """Get the full name of the function being called."""
+        return self._get_name(node.func) or None
+    
+    def _get_decorator_name(self, decorator: ast.expr) -> str:
+        """Extract decorator name from AST node."""
+        decorator_type = type(decorator)
+        if decorator_type is ast.Name:
+            return decorator.id
+        elif decorator_type is ast.Attribute:
+            return self._get_name(decorator)
+        elif decorator_type is ast.Call:
+            return self._get_name(decorator.func)
+        return ''
+    
+    def _get_name(self, node: ast.expr) -> str:
+        """Get full name from AST node."""
+        node_type = type(node)
+        if node_type is ast.Name:
+            return node.id
+        elif node_type is ast.Attribute:
+            # Walk the chain once and join at the end (no per-level string rebuild)
+            parts = []
+            current = node
+            while type(current) is ast.Attribute:
+                parts.append(current.attr)
+                current = current.value
+            if type(current) is ast.Name:
+                parts.append(current.id)
+            return '.'.join(reversed(parts))
+        return ''
+    
+    def _classify_import(self, module: str) -> tuple:
+        """(is_llm, is_cloud) for a module name, lowercased once."""
+        lowered = module.lower()
+        return (
+            _LLM_IMPORT_RE.search(lowered) is not None,
+            _CLOUD_IMPORT_RE.search(lowered) is not None,
+        )
+    
+    def _is_llm_import(self, module: str) -> bool:
+        """Check if module is an LLM library."""
+        return _LLM_IMPORT_RE.search(module.lower()) is not None
+    
+    def _is_cloud_import(self, module: str) -> bool:
+        """Check if module is a cloud SDK."""
+        return _CLOUD_IMPORT_RE.search(module.lower()) is not None
+
+
+class _CollectingVisitor:
+    """
+    Single-pass collector behind PythonASTParser.parse_file.
+    
+    Fills imports, functions, classes, api_calls, async_patterns and
+    decorators in one tree descent (source order). Nodes are dispatched by
+    exact type through _HANDLERS; every other node is only descended into.
+    """
+    
+    def __init__(self, parser: 'PythonASTParser', source: str):
+        self.parser = parser
+        self.source = source
+        self.imports: List[ImportInfo] = []
+        self.functions: List[FunctionInfo] = []
+        self.classes: List[ClassInfo] = []
+        self.api_calls: List[ApiCall] = []
+        self.async_patterns: List[AsyncPattern] = []
+        self.decorators: List[DecoratorInfo] = []
+    
+    def collect(self, tree: ast.AST):
+        """Pre-order walk with an explicit stack (same order as NodeVisitor)."""
+        handlers = self._HANDLERS
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            handler = handlers.get(type(node))
+            if handler is not None:
+                handler(self, node)
+            children = list(ast.iter_child_nodes(node))
+            children.reverse()
+            stack.extend(children)
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            is_llm, is_cloud = self.parser._classify_import(alias.name)
+            self.imports.append(ImportInfo(
+                module=alias.name,
+                alias=alias.asname,
+                is_llm=is_llm,
+                is_cloud=is_cloud,
+            ))
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ''
+        is_llm, is_cloud = self.parser._classify_import(module)
+        for alias in node.names:
+            self.imports.append(ImportInfo(
+                module=module,
+                name=alias.name,
+                alias=alias.asname,
+                is_llm=is_llm,
+                is_cloud=is_cloud,
+            ))
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self._record_function(node, is_async=False)
+    
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        self._record_function(node, is_async=True)
+    
+    def _record_function(self, node, is_async: bool):
+        """
+        Function entry plus its decorators. Decorators like @app.route,
+        @celery.task indicate API endpoints or background jobs.
+        """
+        decorator_names = [self.parser._get_decorator_name(d) for d in node.decorator_list]
+        
+        self.functions.append(FunctionInfo(
+            name=node.name,
+            args=[arg.arg for arg in node.args.args],
+            is_async=is_async,
+            decorators=decorator_names,
+            lineno=node.lineno,
+        ))
+        
+        for decorator_name in decorator_names:
+            if decorator_name:
+                self.decorators.append(DecoratorInfo(decorator_name, node.name, node.lineno))
+        
+        # Async patterns can indicate concurrent API calls which affect cost scaling
+        if is_async:
+            self.async_patterns.append(AsyncPattern('async_function', node.lineno, name=node.name))
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        method_count = sum(
+            1 for n in node.body
+            if type(n) in _FUNC_TYPES
+        )
+        
+        self.classes.append(ClassInfo(
+            name=node.name,
+            bases=[self.parser._get_name(base) for base in node.bases],
+            methods=method_count,
+            lineno=node.lineno,
+        ))
+    
+    def visit_Call(self, node: ast.Call):
+        call_info = self.parser._analyze_call(node, self.source)
+        if call_info:
+            self.api_calls.append(call_info)
+    
+    def visit_Await(self, node: ast.Await):
+        self.async_patterns.append(AsyncPattern('await', node.lineno))
+    
+    def visit_AsyncWith(self, node: ast.AsyncWith):
+        self.async_patterns.append(AsyncPattern('async_with', node.lineno))
+    
+    def visit_AsyncFor(self, node: ast.AsyncFor):
+        self.async_patterns.append(AsyncPattern('async_for', node.lineno))
+
+
+_CollectingVisitor._HANDLERS = {
+    ast.Import: _CollectingVisitor.visit_Import,
+    ast.ImportFrom: _CollectingVisitor.visit_ImportFrom,
+    ast.FunctionDef: _CollectingVisitor.visit_FunctionDef,
+    ast.AsyncFunctionDef: _CollectingVisitor.visit_AsyncFunctionDef,
+    ast.ClassDef: _CollectingVisitor.visit_ClassDef,
+    ast.Call: _CollectingVisitor.visit_Call,
+    ast.Await: _CollectingVisitor.visit_Await,
+    ast.AsyncWith: _CollectingVisitor.visit_AsyncWith,
+    ast.AsyncFor: _CollectingVisitor.visit_AsyncFor,
+}
+
+_SHARED_PARSER = PythonASTParser()
+
+
+@lru_cache(maxsize=2048)
+def _cached_parse(abs_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """parse_file results memoized per file version; mtime_ns/size only key the cache."""
+    return _SHARED_PARSER._parse_uncached(abs_path)
+
+
+# Convenience function
+def parse_python_file(file_path: str, verbose: bool = False) -> Dict[str, Any]:
+    """
+    Convenience function to parse a Python file.
+    
+    Args:
+        file_path: Path to Python file
+        verbose: Enable verbose logging
+        
+    Returns:
+        Dictionary with parsed information
+    """
+    parser = PythonASTParser(verbose=verbose)
+    return parser.parse_file(file_path)
+
+
+def parse_python_files(file_paths: List[str], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Parse many Python files, one result per path in input order.
+    
+    Large batches are spread over worker processes (parsing is CPU-bound, so
+    threads would serialize on the GIL). Falls back to in-process parsing if
+    a pool can't be started (e.g. AWS Lambda has no /dev/shm).
+    
+    Args:
+        file_paths: Paths to parse
+        workers: Worker processes (default: CPU count)
+        
+    Returns:
+        List of parse_file result dictionaries
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(file_paths) <= PARALLEL_MIN_FILES:
+        return [parse_python_file(path) for path in file_paths]
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as pool:
+            # Batches of paths per task amortize the IPC round trips
+            return list(pool.map(parse_python_file, file_paths, chunksize=32))
+    except Exception as e:
+        logger.warning(f"Parallel parsing unavailable ({e}), parsing in-process")
+        return [parse_python_file(path) for path in file_paths]
\ No newline at end of file
@@ -0,0 +1,22 @@
+# core/fast_json.py
+
+import json
+
+# Try to import orjson (faster, compact output); stdlib json otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dumps(obj) -> str:
+    """
+    Compact JSON text for tool results handed back to the LLM: no spaces
+    after separators, non-ASCII kept as is, non-string dict keys allowed.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:  # orjson.JSONEncodeError: unsupported type, int > 64 bits
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
@@ -1,35 +1,114 @@
 import os
 import re
-import filetype # NEW IMPORT
+import stat
+from functools import lru_cache
+from pathlib import Path
+
+# Try to import numpy (vectorized token-run scan for large reads)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # --- CONFIGURABLE LIMITS ---
 MAX_LINES_DEFAULT = 500  # Default max lines to return for read_file
 MAX_FILE_SIZE_KB = 250   # Max KB for a file to be read fully
 REDACTION_PATTERNS = [
     re.compile(r'(AKIA|ASIA|AGIA|AIDA)[0-9A-Z]{16}'),  # AWS Access Key ID
-    re.compile(r'[0-9a-zA-Z/+]{40}={0,2}'),            # Potential AWS Secret Access Key (base64)
+    # Potential AWS Secret Access Key or other base64 secret (32-byte keys are 44 chars):
+    # a whole standalone run of 40+, so a longer key is never left half-visible
+    re.compile(r'(?<![0-9a-zA-Z/+])[0-9a-zA-Z/+]{40,}={0,2}(?![0-9a-zA-Z/+=])'),
     re.compile(r'(sk|pk|rk)_[0-9a-zA-Z]{32,64}'),      # Stripe, Public/Private/Refresh keys
     re.compile(r'oauth[2]?[a-zA-Z0-9_\-]{16,64}'),     # Generic OAuth tokens
-    re.compile(r'[a-f0-9]{32}'),                       # Generic MD5/API keys
-    re.compile(r'[a-f0-9]{40}'),                       # Generic SHA1 keys
-    re.compile(r'[a-f0-9]{64}'),                       # Generic SHA256 keys
+    # Hex keys as whole runs of 32+ (MD5, SHA1, SHA256, 48-char tokens, 128-char HMAC
+    # keys), so a longer hex blob is redacted in one piece rather than in chunks
+    re.compile(r'(?<![a-f0-9])[a-f0-9]{32,}(?![a-f0-9])'),
 ]
+# All patterns as one alternation, run only inside runs of token characters long
+# enough to hold a secret (every pattern above needs 20+ of them)
+_SECRET_RE = re.compile('|'.join(f'(?:{pattern.pattern})' for pattern in REDACTION_PATTERNS))
+_SECRET_CANDIDATE_RE = re.compile(r'[A-Za-z0-9_/+=\-]{20,}')
+_SECRET_MIN_RUN = 20
+# Above this size candidate runs are found with numpy instead of the regex engine
+REDACT_VECTOR_MIN_CHARS = 16384
+if NUMPY_AVAILABLE:
+    _SECRET_BYTES_RE = re.compile(_SECRET_RE.pattern.encode())
+    _TOKEN_BYTE = np.zeros(256, dtype=bool)
+    _TOKEN_BYTE[list(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_/+=-')] = True
+
+# Known text formats skip filetype.guess, which reads the file header from disk
+TEXT_EXTENSIONS = frozenset({
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs', '.go', '.rs', '.java', '.kt', '.rb', '.php',
+    '.c', '.h', '.cpp', '.hpp', '.cs', '.swift', '.scala', '.sh', '.bash', '.sql',
+    '.md', '.rst', '.txt', '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.env',
+    '.html', '.css', '.scss', '.xml', '.tf', '.hcl', '.lock',
+})
 
 # --- HELPER FUNCTIONS ---
 
+# filetype (~13ms of magic-number tables) is imported on first use; most reads
+# never get here because known text extensions skip detection
+_filetype = None
+
 def detect_binary_file(file_path: str) -> bool:
     """Detects if a file is binary using the filetype library."""
+    global _filetype
+    if _filetype is None:
+        import filetype
+        _filetype = filetype
     try:
-        kind = filetype.guess(file_path)
+        kind = _filetype.guess(file_path)
         return kind is not None # If filetype can guess, it's usually not plain text
     except Exception:
         return False # Default to not binary if guess fails
 
+@lru_cache(maxsize=1024)
+def _is_binary(abs_path: str, mtime_ns: int, size: int) -> bool:
+    """detect_binary_file memoized per file version (paginated reads hit the same file)."""
+    return detect_binary_file(abs_path)
+
+def is_within_root(path: str, root: str) -> bool:
+    """
+    True if `path` is `root` or inside it. Compared by path components after
+    resolving symlinks, so '/repo-old' is not inside '/repo' and a symlink
+    pointing out of the repo is rejected.
+    """
+    return Path(path).resolve().is_relative_to(_resolved_root(root))
+
+@lru_cache(maxsize=32)
+def _resolved_root(root: str) -> Path:
+    """The scan root is the same on every call, so it is resolved once per process."""
+    return Path(root).resolve()
+
 def redact_secrets(content: str) -> str:
     """Redacts known secret patterns from the content."""
-    for pattern in REDACTION_PATTERNS:
-        content = pattern.sub('[REDACTED]', content)
-    return content
+    if NUMPY_AVAILABLE and len(content) >= REDACT_VECTOR_MIN_CHARS:
+        return _redact_vectorized(content)
+    return _SECRET_CANDIDATE_RE.sub(lambda m: _SECRET_RE.sub('[REDACTED]', m.group()), content)
+
+def _redact_vectorized(content: str) -> str:
+    """
+    Same result as the regex path: token runs come from one numpy pass over the
+    UTF-8 bytes (non-ASCII bytes are never token bytes), then only runs long
+    enough to hold a secret go through the pattern alternation.
+    """
+    data = content.encode('utf-8', 'surrogatepass')
+    is_token = _TOKEN_BYTE[np.frombuffer(data, dtype=np.uint8)].view(np.int8)
+    edges = np.flatnonzero(np.diff(is_token, prepend=0, append=0))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = (ends - starts) >= _SECRET_MIN_RUN
+    
+    parts = []
+    prev = 0
+    for start, end in zip(starts[keep].tolist(), ends[keep].tolist()):
+        parts.append(data[prev:start])
+        parts.append(_SECRET_BYTES_RE.sub(b'[REDACTED]', data[start:end]))
+        prev = end
+    if not parts:
+        return content
+    parts.append(data[prev:])
+    return b''.join(parts).decode('utf-8', 'surrogatepass')
 
 # --- CORE LOGIC ---
 
@@ -41,54 +120,47 @@ def read_file_safe(file_path: str, root_path: str, start_line: int = 1, end_line
     abs_path = os.path.abspath(os.path.join(abs_root, file_path))
 
     # Security Check: Ensure file is within the project root
-    if not abs_path.startswith(abs_root):
+    if not is_within_root(abs_path, abs_root):
         return f"Error: Access denied. {file_path} is outside the project root."
 
-    if not os.path.exists(abs_path):
+    # One stat serves the existence, directory and size checks
+    try:
+        st = os.stat(abs_path)
+    except OSError:
         return f"Error: File {file_path} not found."
     
     # Check if it's a directory
-    if os.path.isdir(abs_path):
+    if stat.S_ISDIR(st.st_mode):
         return f"Error: {file_path} is a directory, not a file. Use list_directories instead."
 
     # Binary File Check
-    if detect_binary_file(abs_path):
+    ext = os.path.splitext(abs_path)[1].lower()
+    if ext not in TEXT_EXTENSIONS and _is_binary(abs_path, st.st_mtime_ns, st.st_size):
         return f"Error: {file_path} is a binary file and cannot be read."
 
     # File Size Check
-    file_size_kb = os.path.getsize(abs_path) / 1024
+    file_size_kb = st.st_size / 1024
     if file_size_kb > MAX_FILE_SIZE_KB:
         return f"Error: File {file_path} (size: {file_size_kb:.2f}KB) exceeds the maximum allowed size of {MAX_FILE_SIZE_KB}KB. Use 'read_file_safe' with start_line/end_line to read specific parts if absolutely necessary."
 
     try:
-        content_lines = []
-        current_line = 1
-        lines_read = 0
-        truncated_by_line_limit = False
-        
         # Validate inputs
         if start_line < 1: start_line = 1
         
-        with open(abs_path, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                if current_line < start_line:
-                    current_line += 1
-                    continue
-                
-                if end_line is not None and current_line > end_line:
-                    break
-
-                if lines_read >= MAX_LINES_DEFAULT:
-                    truncated_by_line_limit = True
-                    break
-
-                content_lines.append(line)
-                lines_read += 1
-                current_line += 1
-
-        # Join content and redact secrets
-        full_content = "".join(content_lines)
-        redacted_content = redact_secrets(full_content)
+        # The size check above bounds this read; splitting and slicing run in C
+        with open(abs_path, 'rb') as f:
+            lines = f.read(MAX_FILE_SIZE_KB * 1024 + 1).splitlines(keepends=True)
+        
+        stop = len(lines) if end_line is None else max(0, min(end_line, len(lines)))
+        window_end = min(stop, start_line - 1 + MAX_LINES_DEFAULT)
+        selected = lines[start_line - 1:window_end]
+        lines_read = len(selected)
+        truncated_by_line_limit = stop > window_end
+        current_line = min(start_line, len(lines) + 1) + lines_read
+
+        # Decoded once; newlines normalized as text-mode reads did
+        content = b"".join(selected).decode('utf-8', errors='replace')
+        redacted_content = redact_secrets(content.replace('\r\n', '\n').replace('\r', '\n'))
 
         # Append truncation message if needed
         if truncated_by_line_limit:
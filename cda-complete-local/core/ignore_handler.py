@@ -1,6 +1,143 @@
 import os
-import fnmatch
-from typing import List
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+# Project-level ignores shipped with the scanner
+SYSTEM_IGNORE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'system.ignore'
+)
+
+# gitignore wildcards and escapes; a pattern without any is an exact name or path
+_GLOB_CHARS = re.compile(r'[*?\[\\]')
+
+def _suffix(path: str) -> str:
+    """From the last dot on ('' if none), e.g. 'a.tar.log' -> '.log'."""
+    dot = path.rfind('.')
+    return path[dot:] if dot >= 0 else ''
+
+def _translate_segment(segment: str) -> str:
+    """Regex for one '/'-free piece of a gitignore pattern (`*` and `?` never match '/')."""
+    out = []
+    i, n = 0, len(segment)
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '\\' and i < n:
+            out.append(re.escape(segment[i]))
+            i += 1
+        elif c == '[':
+            j = i + 1 if i < n and segment[i] in '!^' else i
+            j = segment.find(']', j + 1 if j < n and segment[j] == ']' else j)
+            if j == -1:
+                out.append('\\[')
+                continue
+            body = segment[i:j].replace('\\', '\\\\')
+            body = re.sub(r'([&~|])', r'\\\1', body)
+            if body[:1] in ('!', '^'):
+                body = '^' + body[1:]
+            out.append(f'(?!/)[{body}]')
+            i = j + 1
+        else:
+            out.append(re.escape(c))
+    return ''.join(out)
+
+def _parse_rule(line: str) -> Optional[tuple]:
+    """
+    One .gitignore line as (path, regex, negated, dir_only, anchored), where
+    `path` is the pattern without `!`, slashes at either end, or None if the
+    line can't match anything.
+    """
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    anchored = '/' in line  # a slash anywhere but the end anchors to the root
+    segments = [seg for seg in line.split('/') if seg]
+    if not segments:
+        return None
+
+    parts = [] if anchored else ['(?:.*/)?']
+    for i, seg in enumerate(segments):
+        last = i == len(segments) - 1
+        if seg == '**':
+            if i == 0:
+                parts.append('.*' if last else '(?:.*/)?')
+            elif last:
+                parts.append('/.*')
+            else:
+                parts.append('(?:/.*)?')
+            continue
+        if i > 0 and not (i == 1 and segments[0] == '**'):
+            parts.append('/')
+        parts.append(_translate_segment(seg))
+
+    return '/'.join(segments), ''.join(parts) + r'\Z', negated, dir_only, anchored
+
+class _RuleSet:
+    """
+    Ordered .gitignore rules for one kind of path (files or directories),
+    matched against a root-relative path with git semantics: `*`/`?` stop
+    at '/', `**` spans directories, a pattern with a '/' is anchored at the
+    root (otherwise it matches at any depth), and the last matching rule
+    wins, so `!pattern` re-includes.
+
+    Without negations (the usual case) any match ignores, so exact names,
+    exact paths and `*.ext` suffixes become set lookups and only the rest go
+    through one compiled alternation. With negations every rule goes into
+    one alternation in reverse order: the first alternative that matches is
+    the last rule in the file, and its group number says if it negates.
+    """
+    __slots__ = ('literal_names', 'literal_paths', 'ext_patterns', 'glob_patterns', '_glob_re', '_ordered_re', '_negated')
+
+    def __init__(self, rules: List[tuple]):
+        self.literal_names = set()   # 'node_modules'
+        self.literal_paths = set()   # '/docs/build' stored as 'docs/build'
+        self.ext_patterns = set()    # '*.log' stored as '.log'
+        self.glob_patterns = []      # regexes of everything else
+        self._glob_re = None
+        self._ordered_re = None
+        self._negated = []
+
+        rules = list(dict.fromkeys(rules))  # dedupe, keep order
+        if any(rule[2] for rule in rules):
+            ordered = rules[::-1]
+            self._ordered_re = re.compile('|'.join(f'({rule[1]})' for rule in ordered))
+            self._negated = [rule[2] for rule in ordered]
+            return
+
+        for path, regex, _, _, anchored in rules:
+            if not _GLOB_CHARS.search(path):
+                (self.literal_paths if anchored else self.literal_names).add(path)
+            elif not anchored and path.startswith('*.') and _suffix(path) == path[1:] and not _GLOB_CHARS.search(path, 2):
+                self.ext_patterns.add(path[1:])
+            else:
+                self.glob_patterns.append(regex)
+
+        if self.glob_patterns:
+            self._glob_re = re.compile('|'.join(f'(?:{regex})' for regex in self.glob_patterns))
+
+    def __bool__(self) -> bool:
+        return bool(self._ordered_re or self.literal_names or self.literal_paths or self.ext_patterns or self._glob_re)
+
+    def match(self, name: str, rel_path: str) -> bool:
+        """True if the rules ignore `rel_path` (whose last component is `name`)."""
+        if os.sep != '/':
+            rel_path = rel_path.replace(os.sep, '/')
+        if self._ordered_re is not None:
+            m = self._ordered_re.match(rel_path)
+            return m is not None and not self._negated[m.lastindex - 1]
+        if name in self.literal_names or rel_path in self.literal_paths:
+            return True
+        if self.ext_patterns and _suffix(name) in self.ext_patterns:
+            return True
+        glob_re = self._glob_re
+        return glob_re is not None and glob_re.match(rel_path) is not None
 
 class IgnoreHandler:
     # --- AGGRESSIVE IGNORE LISTS (Fortune 500 Robustness) ---
@@ -30,31 +167,28 @@ class IgnoreHandler:
     def __init__(self, root_path: str):
         self.root_path = os.path.abspath(root_path)
         self.ignore_patterns = self._load_ignore_patterns()
+        self._dir_cache = {}  # rel dir -> everything inside it is ignored (see _dir_excluded)
+
+        # Compiled once so each check is a few set lookups plus at most one
+        # regex match, however many patterns the ignore files contain.
+        # Directory-only rules (`foo/`) never match files, so files get the rest.
+        self._dir_set = frozenset(self.DEFAULT_DIR_IGNORE)
+        # splitext only yields the last extension, so compound suffixes
+        # ('.min.js', '.js.map') are matched with one endswith over a tuple
+        self._ext_set = frozenset(e for e in self.DEFAULT_FILE_EXT_IGNORE if e.count('.') == 1)
+        self._compound_exts = tuple(e for e in self.DEFAULT_FILE_EXT_IGNORE if e.count('.') > 1)
+        rules = [rule for rule in map(_parse_rule, self.ignore_patterns) if rule is not None]
+        self._file_rules = _RuleSet([rule for rule in rules if not rule[3]])
+        self._dir_rules = _RuleSet(rules)
 
     def _load_ignore_patterns(self) -> List[str]:
-        patterns = []
-        
-        # 1. Load System Ignores (explicit project-level ignores)
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        system_ignore_path = os.path.join(base_dir, 'config', 'system.ignore')
-        
-        if os.path.exists(system_ignore_path):
-            with open(system_ignore_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        patterns.append(line)
-
-        # 2. Load Project .gitignore (if exists)
+        # System ignores first, then the project .gitignore; parsed once per
+        # (root, file mtimes) and shared by every handler on the same root
         gitignore_path = os.path.join(self.root_path, '.gitignore')
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        patterns.append(line)
-                        
-        return patterns
+        return list(_load_patterns_for_root(
+            self.root_path, SYSTEM_IGNORE_PATH,
+            _mtime_ns(SYSTEM_IGNORE_PATH), _mtime_ns(gitignore_path),
+        ))
 
     def is_ignored(self, file_path: str) -> bool:
         """
@@ -63,26 +197,124 @@ class IgnoreHandler:
         """
         abs_file_path = os.path.abspath(os.path.join(self.root_path, file_path))
         rel_path = os.path.relpath(abs_file_path, self.root_path)
-        
-        # 1. Check Default Blacklisted Directories
-        for ignore_dir in self.DEFAULT_DIR_IGNORE:
-            # Check if rel_path starts with or contains the blacklisted dir
-            if rel_path == ignore_dir or rel_path.startswith(ignore_dir + os.sep) or f"{os.sep}{ignore_dir}{os.sep}" in rel_path:
-                return True
+        name = rel_path.rpartition(os.sep)[2]
+
+        if self._default_match(rel_path):
+            return True
+        # Only probe the filesystem when directory-only rules change the answer
+        ignored = self._file_rules.match(name, rel_path)
+        if ignored != self._dir_rules.match(name, rel_path):
+            ignored = not ignored if os.path.isdir(abs_file_path) else ignored
+        return ignored
+
+    def is_ignored_rel(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        is_ignored for a path the caller already has relative to the root
+        (normalized, os.sep separated), e.g. while walking the tree. Skips the
+        abspath/relpath work and the isdir probe.
+        """
+        if self._default_match(rel_path):
+            return True
+        rules = self._dir_rules if is_dir else self._file_rules
+        return rules.match(rel_path.rpartition(os.sep)[2], rel_path)
+
+    def _default_match(self, rel_path: str) -> bool:
+        """Default blacklists, plus anything inside an ignored directory."""
+        # 1. Check Default Blacklisted Directories (rel_path is or starts with
+        # one) and directories ignored by rules: git never re-includes their contents
+        parent, _, name = rel_path.rpartition(os.sep)
+        if rel_path.split(os.sep, 1)[0] in self._dir_set or self._dir_excluded(parent or '.'):
+            return True
 
         # 2. Check Default Blacklisted File Extensions
-        ext = os.path.splitext(rel_path)[1].lower()
-        if ext in self.DEFAULT_FILE_EXT_IGNORE:
+        return self._default_ext_match(name)
+
+    def _default_ext_match(self, name: str) -> bool:
+        """Default blacklisted extensions, simple ('.png') or compound ('.min.js')."""
+        name = name.lower()
+        return os.path.splitext(name)[1] in self._ext_set or name.endswith(self._compound_exts)
+
+    def _dir_excluded(self, rel_dir: str) -> bool:
+        """
+        Whether everything inside `rel_dir` is ignored: a blacklisted directory
+        is one of its components, or it or a parent is ignored by the rules
+        (cached per directory).
+        """
+        cached = self._dir_cache.get(rel_dir)
+        if cached is None:
+            parent, _, name = rel_dir.rpartition(os.sep)
+            cached = rel_dir != '.' and (
+                not self._dir_set.isdisjoint(rel_dir.split(os.sep))
+                or self._dir_excluded(parent or '.')
+                or self._dir_rules.match(name, rel_dir)
+            )
+            self._dir_cache[rel_dir] = cached
+        return cached
+
+    def is_ignored_file(self, dir_path: str, name: str, rel_dir: Optional[str] = None) -> bool:
+        """
+        Same answer as is_ignored(os.path.join(dir_path, name)) for a regular
+        file found while walking `dir_path`. The directory checks run once per
+        directory, and directory-only rules (`foo/`) are skipped since they
+        can never match a file. Walkers that track `dir_path` relative to the
+        root pass it as `rel_dir` ('' or '.' for the root).
+        """
+        rel_dir = os.path.relpath(dir_path, self.root_path) if rel_dir is None else (rel_dir or '.')
+
+        # 1. Inside an ignored directory (or a file named like a blacklisted dir at the root)
+        if self._dir_excluded(rel_dir):
+            return True
+        if rel_dir == '.' and name in self._dir_set:
+            return True
+
+        # 2. Default blacklisted file extensions
+        if self._default_ext_match(name):
             return True
 
-        # 3. Check loaded .gitignore / system.ignore patterns
-        name = os.path.basename(file_path) # Use base name for fnmatch
-        for pattern in self.ignore_patterns:
-            if pattern.endswith('/'): # Directory pattern
-                if os.path.isdir(abs_file_path) and (fnmatch.fnmatch(name, pattern[:-1]) or fnmatch.fnmatch(rel_path, pattern[:-1])):
-                    return True
-            else: # File pattern
-                if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern):
-                    return True
-                
-        return False
+        # 3. Loaded .gitignore / system.ignore rules
+        if not self._file_rules:
+            return False
+        rel_path = name if rel_dir == '.' else os.path.join(rel_dir, name)
+        return self._file_rules.match(name, rel_path)
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _read_patterns(path: str) -> List[str]:
+    patterns = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    patterns.append(line)
+    return patterns
+
+@lru_cache(maxsize=64)
+def _load_patterns_for_root(root: str, system_ignore_path: str, system_mtime: Optional[int],
+                            gitignore_mtime: Optional[int]) -> tuple:
+    """
+    Patterns from system.ignore then `root`/.gitignore. The mtimes are only
+    part of the cache key, so editing either file invalidates the entry.
+    """
+    return tuple(_read_patterns(system_ignore_path) + _read_patterns(os.path.join(root, '.gitignore')))
+
+@lru_cache(maxsize=16)
+def _cached_handler(root_path: str, signature: tuple) -> IgnoreHandler:
+    return IgnoreHandler(root_path)
+
+def get_ignore_handler(root_path: str) -> IgnoreHandler:
+    """
+    Shared IgnoreHandler for `root_path`. The ignore files are only re-read
+    when .gitignore or system.ignore change (keyed on their mtimes), so
+    repeated list/grep calls on the same repo reuse the parsed patterns.
+    """
+    root_path = os.path.abspath(root_path)
+    signature = (
+        _mtime_ns(os.path.join(root_path, '.gitignore')),
+        _mtime_ns(SYSTEM_IGNORE_PATH),
+    )
+    return _cached_handler(root_path, signature)
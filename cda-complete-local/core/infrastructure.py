@@ -1,6 +1,6 @@
 # core/infrastructure.py
 import os
-import boto3
+from threading import Lock
 from typing import Any
 
 # "AWS" or "LOCAL"
@@ -8,15 +8,20 @@ MODE = os.environ.get("SCROOGE_ENV", "AWS")
 
 class InfrastructureProvider:
     _instance = None
+    _lock = Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(InfrastructureProvider, cls).__new__(cls)
-            cls._instance._init_resources()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(InfrastructureProvider, cls).__new__(cls)
+                    instance._init_resources()
+                    cls._instance = instance
         return cls._instance
 
     def _init_resources(self):
         self.mode = MODE
+        self._table_cache: dict[str, Any] = {}  # table name -> Table wrapper
         if self.mode == "LOCAL":
             from core.local_adapter import LocalDataManager, MockS3, MockSQS
             self._db_manager = LocalDataManager()
@@ -25,15 +30,19 @@ class InfrastructureProvider:
             # DynamoDB resource wrapper
             self.dynamodb = self._LocalDynamoResource(self._db_manager)
         else:
-            # AWS Mode
+            # AWS Mode (boto3 is only imported here; LOCAL runs never load it)
+            import boto3
             region = os.environ.get("AWS_REGION", "ap-south-1")
             self.dynamodb = boto3.resource('dynamodb', region_name=region)
             self.s3 = boto3.client('s3', region_name=region)
             self.sqs = boto3.client('sqs', region_name=region)
 
     def get_table(self, table_name: str):
-        """Returns a Table object (boto3 or mock)."""
-        return self.dynamodb.Table(table_name)
+        """Returns a Table object (boto3 or mock), created once per table name."""
+        table = self._table_cache.get(table_name)
+        if table is None:
+            table = self._table_cache.setdefault(table_name, self.dynamodb.Table(table_name))
+        return table
 
     def get_s3_client(self):
         return self.s3
@@ -47,5 +56,12 @@ class InfrastructureProvider:
         def Table(self, name):
             return self.manager.get_table(name)
 
-# Singleton Accessor
-infra = InfrastructureProvider()
+# Singleton Accessor (built on first use, not at import)
+def get_infra() -> InfrastructureProvider:
+    return InfrastructureProvider()
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from core.infrastructure import infra` working for existing callers
+    if name == "infra":
+        return get_infra()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
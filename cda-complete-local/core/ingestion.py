@@ -13,13 +13,22 @@ Author: Scrooge Scanner Team
 """
 import os
 import json
-from pathlib import Path
+import heapq
+import dataclasses
 from typing import Dict, List, Any, Optional
 import logging
 
+# Try to import orjson (much faster on the large report), but make it optional
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import parsers
 from core.parsers import (
     get_all_parsers,
+    build_parser_router,
     DockerfileParser,
     ServerlessParser,
     DockerComposeParser,
@@ -32,8 +41,8 @@ from core.parsers import (
 from core.token_analyzer import TokenAnalyzer
 
 # Import AST parsers
-from core.ast_parsers.python_ast import PythonASTParser
-from core.ast_parsers.javascript_ast import JavaScriptASTParser
+from core.ast_parsers.python_ast import PythonASTParser, parse_python_files
+from core.ast_parsers.javascript_ast import JavaScriptASTParser, parse_javascript_files
 
 # Import existing pattern detector
 from core.pattern_detector import PatternDetector
@@ -54,6 +63,9 @@ IGNORED_EXTENSIONS = {
     '.min.js', '.min.css',  # Minified files
 }
 
+# Multi-dot entries above never equal a file's last suffix; matched with endswith
+_COMPOUND_EXTENSIONS = tuple(ext for ext in IGNORED_EXTENSIONS if ext.count('.') > 1)
+
 # Directories to ignore during scanning
 IGNORED_DIRS = {
     '__pycache__', '.git', '.svn', '.hg', '.bzr',
@@ -69,6 +81,12 @@ IGNORED_DIRS = {
 # Maximum file size to analyze (10 MB)
 MAX_FILE_SIZE = 10 * 1024 * 1024
 
+# Worker processes for AST parsing (0 = one per CPU, 1 = parse in-process)
+AST_WORKERS = int(os.environ.get("SCROOGE_AST_WORKERS", "0"))
+
+# Worker processes for the pattern sweep (0 = one per CPU, 1 = sweep in-process)
+SWEEP_WORKERS = int(os.environ.get("SCROOGE_SWEEP_WORKERS", "0"))
+
 def run_ingestion(repo_path: str, verbose: bool = False) -> Dict[str, Any]:
     """
     Main ingestion orchestrator.
@@ -107,21 +125,16 @@ def run_ingestion(repo_path: str, verbose: bool = False) -> Dict[str, Any]:
         logger.info("Phase 1/5: Scanning file system...")
     manifest, structure_tree = _scan_filesystem(repo_path, verbose)
     
-    # Phase 2: Configuration Parsing
+    # Phases 2 + 4: Configuration Parsing and AST Analysis (one manifest pass)
     if verbose:
-        logger.info("Phase 2/5: Parsing configuration files...")
-    parsed_configs = _parse_configs(repo_path, manifest, verbose)
+        logger.info("Phase 2/5 + 4/5: Parsing configuration files and source code AST...")
+    parsed_configs, ast_analysis = _fused_pass(repo_path, manifest, verbose)
     
     # Phase 3: Token Analysis
     if verbose:
         logger.info("Phase 3/5: Analyzing token usage...")
     token_analysis = _analyze_tokens(repo_path, verbose)
     
-    # Phase 4: AST Analysis
-    if verbose:
-        logger.info("Phase 4/5: Parsing source code AST...")
-    ast_analysis = _parse_ast(repo_path, manifest, verbose)
-    
     # Phase 5: Pattern Detection
     if verbose:
         logger.info("Phase 5/5: Running pattern detection...")
@@ -144,6 +157,39 @@ def run_ingestion(repo_path: str, verbose: bool = False) -> Dict[str, Any]:
         'sweep_report': sweep_report,
     }
 
+def _scan_iter(dir_path: str, rel_dir: str):
+    """
+    Yield (DirEntry, rel_path) for every non-directory under `dir_path`, in
+    os.walk order (a directory's files, then each subdirectory in turn).
+    Ignored directories are pruned by name and symlinked directories are not
+    followed, without any extra stat calls.
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if entry.name not in IGNORED_DIRS and not entry.is_symlink():
+                subdirs.append(entry)
+        else:
+            yield entry, os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+
+    for entry in subdirs:
+        yield from _scan_iter(entry.path, os.path.join(rel_dir, entry.name) if rel_dir else entry.name)
+
+def _suffix(name: str) -> str:
+    """Path(name).suffix without building a Path: '' for dotfiles and trailing dots."""
+    dot = name.rfind('.')
+    return name[dot:] if 0 < dot < len(name) - 1 else ''
+
 def _scan_filesystem(repo_path: str, verbose: bool) -> tuple[List[Dict], str]:
     """
     Phase 1: Scan file system and build manifest.
@@ -153,42 +199,37 @@ def _scan_filesystem(repo_path: str, verbose: bool) -> tuple[List[Dict], str]:
     """
     manifest = []
     
-    for root, dirs, files in os.walk(repo_path):
-        # Filter out ignored directories
-        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+    for entry, rel_path in _scan_iter(repo_path, ''):
+        file = entry.name
+        
+        # Skip ignored extensions (before stat, so they cost no syscall)
+        lower_name = file.lower()
+        ext = _suffix(lower_name)
+        if ext in IGNORED_EXTENSIONS or lower_name.endswith(_COMPOUND_EXTENSIONS):
+            continue
         
-        for file in files:
-            file_path = os.path.join(root, file)
-            rel_path = os.path.relpath(file_path, repo_path)
+        # Get file info
+        try:
+            size = entry.stat().st_size
             
-            # Get file info
-            try:
-                stat = os.stat(file_path)
-                size = stat.st_size
-                
-                # Skip large files
-                if size > MAX_FILE_SIZE:
-                    if verbose:
-                        logger.debug(f"Skipping large file: {rel_path} ({size} bytes)")
-                    continue
-                
-                # Skip ignored extensions
-                ext = Path(file).suffix.lower()
-                if ext in IGNORED_EXTENSIONS:
-                    continue
-                
-                manifest.append({
-                    'path': rel_path,
-                    'name': file,
-                    'ext': ext,
-                    'size': size,
-                    'dir': os.path.dirname(rel_path),
-                })
-                
-            except (OSError, PermissionError) as e:
+            # Skip large files
+            if size > MAX_FILE_SIZE:
                 if verbose:
-                    logger.warning(f"Cannot access file {rel_path}: {e}")
+                    logger.debug(f"Skipping large file: {rel_path} ({size} bytes)")
                 continue
+            
+            manifest.append({
+                'path': rel_path,
+                'name': file,
+                'ext': ext,
+                'size': size,
+                'dir': os.path.dirname(rel_path),
+            })
+            
+        except (OSError, PermissionError) as e:
+            if verbose:
+                logger.warning(f"Cannot access file {rel_path}: {e}")
+            continue
     
     # Build structure tree (simplified version)
     structure_tree = _build_structure_tree(manifest)
@@ -206,43 +247,62 @@ def _build_structure_tree(manifest: List[Dict]) -> str:
         if dir_path:
             dirs.add(dir_path)
     
-    # Sort directories
-    sorted_dirs = sorted(dirs)
+    # First 50 directories in sorted order (no need to sort the rest)
+    sorted_dirs = heapq.nsmallest(50, dirs)
     
     # Build tree (simplified - just list directories)
     tree_lines = ["Repository Structure:"]
-    for dir_path in sorted_dirs[:50]:  # Limit to first 50 directories
+    for dir_path in sorted_dirs:  # Limit to first 50 directories
         depth = dir_path.count(os.sep)
         indent = "  " * depth
         dir_name = os.path.basename(dir_path) or dir_path
         tree_lines.append(f"{indent}📁 {dir_name}/")
     
-    if len(sorted_dirs) > 50:
-        tree_lines.append(f"  ... and {len(sorted_dirs) - 50} more directories")
+    if len(dirs) > 50:
+        tree_lines.append(f"  ... and {len(dirs) - 50} more directories")
     
     return "\n".join(tree_lines)
 
-def _parse_configs(
+def _fused_pass(
     repo_path: str,
     manifest: List[Dict],
     verbose: bool
-) -> List[Dict[str, Any]]:
+) -> tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
     """
-    Phase 2: Parse configuration files.
+    Phases 2 and 4: parse configuration files and source code AST in one
+    walk over the manifest.
+    
+    Each file is routed by name to the config parser or AST parser that
+    handles it (the two sets never overlap), so it is opened once, by the
+    parser that needs it, instead of being offered to every parser in turn.
     
     Returns:
-        List of parsed configuration objects
+        Tuple of (parsed_configs, ast_analysis)
     """
-    # FIXED: Remove verbose parameter since get_all_parsers() doesn't accept it
-    parsers = get_all_parsers()
+    route_config = build_parser_router([parser_cls(verbose=verbose) for parser_cls in get_all_parsers()])
+    python_parser = PythonASTParser(verbose=verbose)
+    js_parser = JavaScriptASTParser(verbose=verbose)
+    
     parsed_configs = []
+    py_paths = []
+    js_paths = []
     
     for file_item in manifest:
         file_path = os.path.join(repo_path, file_item['path'])
         
-        # Try each parser
-        for parser in parsers:
+        # Source files go to the AST batches below
+        if python_parser.can_parse(file_path):
+            py_paths.append(file_path)
+            continue
+        if js_parser.can_parse(file_path):
+            js_paths.append(file_path)
+            continue
+        
+        # First config parser that claims the file parses it
+        for parser in route_config(file_item['name']):
             try:
+                if not parser.can_parse(file_path):
+                    continue
                 result = parser.safe_parse(file_path)
                 if result:
                     parsed_configs.append(result.dict())
@@ -255,7 +315,38 @@ def _parse_configs(
     if verbose:
         logger.info(f"Parsed {len(parsed_configs)} configuration files")
     
-    return parsed_configs
+    return parsed_configs, _parse_ast(py_paths, js_paths, verbose)
+
+def _parse_ast(
+    py_paths: List[str],
+    js_paths: List[str],
+    verbose: bool
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Parse source code with AST, each batch spread across worker processes.
+    
+    Returns:
+        Dictionary with separate lists for Python and JavaScript analyses
+    """
+    try:
+        workers = AST_WORKERS or None
+        python_results = [r for r in parse_python_files(py_paths, workers=workers) if 'error' not in r]
+        javascript_results = [r for r in parse_javascript_files(js_paths, workers=workers) if 'error' not in r]
+        
+        if verbose:
+            logger.info(
+                f"Parsed {len(python_results)} Python files, "
+                f"{len(javascript_results)} JavaScript files"
+            )
+        
+        return {
+            'python': python_results,
+            'javascript': javascript_results,
+        }
+    except Exception as e:
+        if verbose:
+            logger.warning(f"AST analysis failed: {e}")
+        return {'python': [], 'javascript': [], 'error': str(e)}
 
 def _analyze_tokens(repo_path: str, verbose: bool) -> Dict[str, Any]:
     """
@@ -290,59 +381,6 @@ def _analyze_tokens(repo_path: str, verbose: bool) -> Dict[str, Any]:
             'error': str(e)
         }
 
-def _parse_ast(
-    repo_path: str,
-    manifest: List[Dict],
-    verbose: bool
-) -> Dict[str, List[Dict[str, Any]]]:
-    """
-    Phase 4: Parse source code with AST.
-    
-    Returns:
-        Dictionary with separate lists for Python and JavaScript analyses
-    """
-    try:
-        python_parser = PythonASTParser(verbose=verbose)
-        js_parser = JavaScriptASTParser(verbose=verbose)
-        
-        python_results = []
-        javascript_results = []
-        
-        for file_item in manifest:
-            file_path = os.path.join(repo_path, file_item['path'])
-            
-            try:
-                # Parse Python files
-                if python_parser.can_parse(file_path):
-                    result = python_parser.parse_file(file_path)
-                    if 'error' not in result:
-                        python_results.append(result)
-                
-                # Parse JavaScript/TypeScript files
-                elif js_parser.can_parse(file_path):
-                    result = js_parser.parse_file(file_path)
-                    if 'error' not in result:
-                        javascript_results.append(result)
-            except Exception as e:
-                if verbose:
-                    logger.debug(f"AST parsing failed for {file_path}: {e}")
-                continue
-        
-        if verbose:
-            logger.info(
-                f"Parsed {len(python_results)} Python files, "
-                f"{len(javascript_results)} JavaScript files"
-            )
-        
-        return {
-            'python': python_results,
-            'javascript': javascript_results,
-        }
-    except Exception as e:
-        if verbose:
-            logger.warning(f"AST analysis failed: {e}")
-        return {'python': [], 'javascript': [], 'error': str(e)}
-
 def _run_pattern_detection(repo_path: str, verbose: bool) -> Dict[str, Any]:
     """
     Phase 5: Run pattern-based detection.
@@ -353,8 +391,8 @@ def _run_pattern_detection(repo_path: str, verbose: bool) -> Dict[str, Any]:
     try:
         detector = PatternDetector(verbose=verbose)
         
-        # Run detection
-        report = detector.sweep_repository(repo_path)
+        # Run detection (large repos are swept by worker processes)
+        report = detector.sweep_repository(repo_path, workers=SWEEP_WORKERS or None)
         
         # Count total hits
         total_hits = sum(len(matches) for matches in report.values())
@@ -497,6 +535,62 @@ def create_ingestion_summary(ingestion_result: Dict[str, Any]) -> str:
     
     return "\n".join(lines)
 
+def _json_default(obj: Any) -> Any:
+    """AST records are slotted dataclasses; everything else falls back to str."""
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    return str(obj)
+
+# Dicts this many levels deep are written key by key, and the lists in them
+# element by element (manifest entries, sweep matches, per-file AST results)
+_REPORT_STREAM_DEPTH = 2
+
+def _dumps_report_value(value: Any) -> bytes:
+    return orjson.dumps(
+        value,
+        default=_json_default,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+
+def _stream_json(f, value: Any, level: int) -> None:
+    """
+    Write `value` as indented JSON, serializing one piece at a time so only
+    the largest single entry is ever held as bytes. Same output as dumping
+    the whole value with OPT_INDENT_2.
+    """
+    pad = b'\n' + b'  ' * level
+    if isinstance(value, dict) and value and level < _REPORT_STREAM_DEPTH:
+        f.write(b'{')
+        for i, (key, item) in enumerate(value.items()):
+            f.write((b',' if i else b'') + pad + b'  ' + orjson.dumps(key if isinstance(key, str) else str(key)) + b': ')
+            _stream_json(f, item, level + 1)
+        f.write(pad + b'}')
+    elif isinstance(value, list) and value and level <= _REPORT_STREAM_DEPTH:
+        f.write(b'[')
+        for i, item in enumerate(value):
+            f.write((b',' if i else b'') + pad + b'  ')
+            f.write(_dumps_report_value(item).replace(b'\n', pad + b'  '))
+        f.write(pad + b']')
+    else:
+        # Nested lines shift right by this level (JSON strings never hold raw newlines)
+        f.write(_dumps_report_value(value).replace(b'\n', pad))
+
+def _write_report(result: Dict[str, Any], output_path: str) -> None:
+    """
+    Indented JSON report, streamed to disk piece by piece. orjson serializes
+    dataclasses and numpy natively; stdlib json.dump streams on its own.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            with open(output_path, 'wb') as f:
+                _stream_json(f, result, 0)
+            return
+        except TypeError:  # orjson.JSONEncodeError: int > 64 bits, nesting too deep
+            pass  # rewritten below
+
+    with open(output_path, 'w') as f:
+        json.dump(result, f, indent=2, default=_json_default)
+
 # Convenience function for command-line usage
 def main():
     """Command-line entry point for testing."""
@@ -522,8 +616,7 @@ def main():
     
     # Optionally save to file
     output_path = os.path.join(repo_path, 'ingestion_report.json')
-    with open(output_path, 'w') as f:
-        json.dump(result, f, indent=2, default=str)
+    _write_report(result, output_path)
     
     print(f"\n💾 Full report saved to: {output_path}")
 
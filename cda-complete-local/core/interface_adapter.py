@@ -2,8 +2,16 @@
 import os
 import sys
 import json
+import threading
 import importlib.util
 
+# Try to import orjson (faster serialization), but make it optional
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Ensure we can find sibling modules if running from docker/interface
 current_dir = os.path.dirname(os.path.abspath(__file__))
 # cda-complete-local root
@@ -11,13 +19,50 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from core.infrastructure import infra
+from core.infrastructure import get_infra
 
 MODE = os.environ.get("SCROOGE_ENV", "AWS")
 
 FETCHER_NAME = os.environ.get("FETCHER_LAMBDA_NAME", "scrooge-stack-FetcherFunction")
 SCANNER_NAME = os.environ.get("SCANNER_LAMBDA_NAME", "scrooge-stack-ScroogeScannerFunction")
 
+# fetcher_entrypoint, loaded once on the first LOCAL mode fetcher call
+_fetcher_module = None
+_fetcher_lock = threading.Lock()
+
+def _load_fetcher():
+    """Import fetcher_entrypoint.py from the project root, once per process."""
+    global _fetcher_module
+    with _fetcher_lock:
+        if _fetcher_module is None:
+            fetcher_path = os.path.join(project_root, "fetcher_entrypoint.py")
+            print(f"📂 [LocalMode] Loading Fetcher from: {fetcher_path}")
+            
+            # Import dynamically to avoid top-level import issues
+            spec = importlib.util.spec_from_file_location("fetcher", fetcher_path)
+            fetcher = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(fetcher)
+            _fetcher_module = fetcher
+        return _fetcher_module
+
+def _dumps_payload(payload: dict):
+    """Lambda payload as bytes (orjson) or str; boto3 accepts either."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:  # orjson.JSONEncodeError: unsupported type, int > 64 bits
+            pass
+    return json.dumps(payload)
+
+def _loads_payload(raw: bytes):
+    """Decode a Lambda response; stdlib for anything orjson rejects (NaN, huge ints)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw.decode("utf-8"))
+
 def invoke_backend(function_name: str, payload: dict) -> dict:
     """
     Universal backend invoker.
@@ -32,9 +77,9 @@ def invoke_backend(function_name: str, payload: dict) -> dict:
             response = lambda_client.invoke(
                 FunctionName=function_name,
                 InvocationType='RequestResponse',
-                Payload=json.dumps(payload)
+                Payload=_dumps_payload(payload)
             )
-            return json.loads(response['Payload'].read().decode("utf-8"))
+            return _loads_payload(response['Payload'].read())
         except Exception as e:
             return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
 
@@ -45,16 +90,8 @@ def invoke_backend(function_name: str, payload: dict) -> dict:
         # 1. FETCHER ACTIONS (Synchronous usually)
         if function_name == FETCHER_NAME:
             try:
-                fetcher_path = os.path.join(project_root, "fetcher_entrypoint.py")
-                print(f"📂 [LocalMode] Loading Fetcher from: {fetcher_path}")
-                
-                # Import dynamically to avoid top-level import issues
-                spec = importlib.util.spec_from_file_location("fetcher", fetcher_path)
-                fetcher = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(fetcher)
-                
-                # Execute handler directly
-                return fetcher.lambda_handler(payload, None)
+                # Execute handler directly (module imported on first use only)
+                return _load_fetcher().lambda_handler(payload, None)
             except Exception as e:
                 import traceback
                 traceback.print_exc()
@@ -76,7 +113,7 @@ def invoke_backend(function_name: str, payload: dict) -> dict:
                     return {"statusCode": 400, "body": json.dumps({"error": "Missing scan_id"})}
                 
                 try:
-                    scan_table = infra.get_table("ScroogeScanState")
+                    scan_table = get_infra().get_table("ScroogeScanState")
                     scan_table.update_item(
                         Key={"scan_id": scan_id},
                         UpdateExpression="SET #status = :s, pending_answer = :a",
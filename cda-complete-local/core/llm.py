@@ -1,9 +1,10 @@
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
+from functools import lru_cache
 
 def get_llm(temperature: float = 0):
     """
     Returns the configured LLM instance based on .env settings.
+    Instances are shared per (model, key, temperature); env changes still apply.
     """
     # Default to 1.5-flash if env var is missing, otherwise use the one in .env
     model_name = os.getenv("LLM_MODEL", "gemini-2.0-flash-lite")
@@ -13,6 +14,18 @@ def get_llm(temperature: float = 0):
         print("❌ [LLM] GOOGLE_API_KEY is missing!")
         raise ValueError("GOOGLE_API_KEY not found in environment variables. Please check your .env file.")
 
+    return _build_llm(model_name, api_key, temperature)
+
+@lru_cache(maxsize=8)
+def _build_llm(model_name: str, api_key: str, temperature: float):
+    """
+    Builds the client once per process. The underlying HTTP client is
+    thread-safe, and bind_tools/with_structured_output return new wrappers,
+    so concurrent specialist phases can share one instance.
+    """
+    # Imported here so importing core.llm doesn't pay for the Google client stack
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     masked_key = api_key[:4] + "..." + api_key[-4:] if len(api_key) > 8 else "****"
     print(f"🔌 [LLM] Connecting to {model_name} with key {masked_key}")
 
@@ -21,4 +34,4 @@ def get_llm(temperature: float = 0):
         temperature=temperature,
         api_key=api_key,
         request_timeout=60  # Add timeout to prevent infinite hanging
-    )
\ No newline at end of file
+    )
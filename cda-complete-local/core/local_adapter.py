@@ -176,12 +176,16 @@ class MockTable:
             return {"Item": self._row_to_dict(row)}
         return {}
 
-    def scan(self, FilterExpression=None, ExpressionAttributeNames=None, ExpressionAttributeValues=None, Limit=None, ExclusiveStartKey=None, Select=None, ProjectionExpression=None):
+    def scan(self, FilterExpression=None, ExpressionAttributeNames=None, ExpressionAttributeValues=None, Limit=None, ExclusiveStartKey=None, Select=None, ProjectionExpression=None, Segment=None, TotalSegments=None):
         """Mimics basic DynamoDB scan. Ignores complex filters for now."""
         cursor = self.conn.cursor()
         
         query = f"SELECT * FROM {self.table_name}"
         
+        # Parallel scan: split rows across segments by rowid
+        if TotalSegments and Segment is not None:
+            query += f" WHERE rowid % {int(TotalSegments)} = {int(Segment)}"
+        
         # Very basic filtering support for specific common patterns
         # This is NOT a full DynamoDB expression parser
         
@@ -1,5 +1,6 @@
 # core/parsers/__init__.py
 from typing import List
+from .base_parser import build_parser_router
 from .dockerfile_parser import DockerfileParser
 from .docker_compose_parser import DockerComposeParser
 from .requirements_parser import RequirementsParser
@@ -9,7 +10,8 @@ from .terraform_parser import TerraformParser
 
 __all__ = [
     'DockerfileParser', 'DockerComposeParser', 'RequirementsParser',
-    'PackageJsonParser', 'ServerlessParser', 'TerraformParser'
+    'PackageJsonParser', 'ServerlessParser', 'TerraformParser',
+    'build_parser_router'
 ]
 
 def get_all_parsers() -> List:
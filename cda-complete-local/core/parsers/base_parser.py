@@ -8,10 +8,12 @@ Author: Scrooge Scanner Team
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Sequence
 from pydantic import BaseModel, Field
 from pathlib import Path
+import fnmatch
 import logging
+import re
 
 # Configure module logger
 logger = logging.getLogger(__name__)
@@ -69,6 +71,12 @@ class BaseParser(ABC):
                 pass
     """
     
+    # Lowercase basenames ('package.json'), '*.ext' suffixes or other fnmatch
+    # globs covering every file name can_parse accepts. Lets callers route a
+    # file to its candidate parsers without asking each one; can_parse still
+    # has the final say. Empty means the parser may accept any file.
+    MATCHES: tuple[str, ...] = ()
+    
     def __init__(self, verbose: bool = False):
         """
         Initialize parser.
@@ -208,6 +216,44 @@ class BaseParser(ABC):
         return None
 
 
+def build_parser_router(parsers: Sequence[BaseParser]) -> Callable[[str], List[BaseParser]]:
+    """
+    Build a name -> candidate parsers lookup from each parser's MATCHES.
+    
+    A file is then only offered to the parsers that could claim it (in the
+    given order) instead of every parser in turn.
+    
+    Args:
+        parsers: Parser instances, in dispatch order
+        
+    Returns:
+        Function mapping a file name to its candidate parsers
+    """
+    by_name: Dict[str, List[int]] = {}
+    by_ext: Dict[str, List[int]] = {}
+    globs = []  # (parser index, compiled pattern) for everything else
+    
+    for i, parser in enumerate(parsers):
+        for pattern in parser.MATCHES or ('*',):
+            if not any(c in pattern for c in '*?['):
+                by_name.setdefault(pattern, []).append(i)
+            elif pattern.startswith('*.') and not any(c in pattern[2:] for c in '*?[.'):
+                by_ext.setdefault(pattern[1:], []).append(i)
+            else:
+                globs.append((i, re.compile(fnmatch.translate(pattern))))
+    
+    def route(name: str) -> List[BaseParser]:
+        lower = name.lower()
+        hits = set(by_name.get(lower, ()))
+        dot = lower.rfind('.')
+        if dot >= 0:
+            hits.update(by_ext.get(lower[dot:], ()))
+        hits.update(i for i, regex in globs if regex.match(lower))
+        return [parsers[i] for i in sorted(hits)]
+    
+    return route
+
+
 class ParserRegistry:
     """
     Registry for managing multiple parsers.
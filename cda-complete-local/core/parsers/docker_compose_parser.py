@@ -34,6 +34,8 @@ class DockerComposeParser(BaseParser):
     Extracts service-level configurations that affect infrastructure costs.
     """
     
+    MATCHES = ('*docker-compose*.yml', '*docker-compose*.yaml')
+    
     def __init__(self, verbose: bool = False):
         super().__init__(verbose)
         self.logger = logging.getLogger(f"{__name__}.DockerComposeParser")
@@ -32,6 +32,8 @@ class DockerfileParser(BaseParser):
     - Base image memory estimation
     """
     
+    MATCHES = ('*dockerfile*',)
+    
     # Base image to memory mapping (conservative estimates in MB)
     BASE_IMAGE_MEMORY_MAP = {
         'alpine': 64,
@@ -33,6 +33,8 @@ class PackageJsonParser(BaseParser):
     Identifies cost-relevant libraries and deployment configurations.
     """
     
+    MATCHES = ('package.json',)
+    
     # AI/ML libraries for Node.js
     AI_KEYWORDS = {
         'openai', '@anthropic-ai', 'langchain', '@langchain',
@@ -33,6 +33,9 @@ class RequirementsParser(BaseParser):
     Identifies cost-relevant libraries and frameworks.
     """
     
+    # Any .txt: files under a requirements/ directory qualify by location
+    MATCHES = ('*.txt',)
+    
     # AI/ML libraries that indicate LLM/AI costs
     AI_KEYWORDS = {
         'openai', 'anthropic', 'langchain', 'llamaindex', 'llama-index',
@@ -38,6 +38,8 @@ class ServerlessParser(BaseParser):
     Extracts function-level cost parameters and provider settings.
     """
     
+    MATCHES = ('serverless.yml', 'serverless.yaml')
+    
     # Default values per provider
     PROVIDER_DEFAULTS = {
         'aws': {
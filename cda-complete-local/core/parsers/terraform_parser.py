@@ -38,6 +38,8 @@ class TerraformParser(BaseParser):
     Note: Full HCL parsing would require a proper HCL parser library.
     """
     
+    MATCHES = ('*.tf',)
+    
     # Common cloud resource types and their cost relevance
     COMPUTE_RESOURCES = [
         'aws_lambda_function', 'aws_ecs_task_definition', 'aws_ecs_service',
@@ -1,16 +1,357 @@
-from typing import List, Dict, Any
-
-class PatternDetector:
-    """
-    TEMPORARY STUB - Detects LLM/API patterns in code.
-    Full implementation: regex patterns + heuristics.
-    """
-    
-    def __init__(self):
-        self.patterns = []
-    
-    def detect_patterns(self, content: str) -> List[Dict[str, Any]]:
-        return []
-    
-    def analyze_file(self, file_path: str, content: str) -> Dict[str, Any]:
-        return {"patterns": [], "confidence": "low"}
+"""
+Pattern Detector Module
+
+Sweeps a repository for LLM / cloud usage patterns (the keyword regexes in
+core.seed_knowledge, or any list of the same shape).
+
+Matching strategy:
+- All patterns are compiled into ONE Hyperscan database, so every file is
+  matched in a single linear pass whatever the number of patterns
+- Without hyperscan (or if it rejects a pattern) one combined bytes regex
+  finds candidate lines instead
+- Candidate lines are confirmed per pattern with Python re, so both engines
+  report exactly the same (pattern, line) hits
+- Large repositories are swept by worker processes, in chunks of files
+
+Author: Scrooge Scanner Team
+"""
+
+import os
+import re
+import mmap
+import logging
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple
+
+from core.seed_knowledge import DEFAULT_PATTERNS
+from core.ignore_handler import get_ignore_handler
+
+logger = logging.getLogger(__name__)
+
+# Try to import hyperscan (multi-pattern DFA engine), but make it optional
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Binary check: a NUL byte in the head of the file (the git/grep heuristic)
+BINARY_SNIFF_BYTES = 8192
+
+# Files larger than this are not swept (10 MB, same limit as ingestion)
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
+# From this size files are mmapped (zero-copy view of the page cache)
+# instead of read into a bytes buffer
+MMAP_MIN_BYTES = 256 * 1024
+
+# Matched lines are trimmed to this many characters in reports
+SNIPPET_CHARS = 150
+
+# Files per worker task, and below how many files a pool isn't worth starting
+SWEEP_CHUNK_FILES = 256
+PARALLEL_MIN_FILES = 2 * SWEEP_CHUNK_FILES
+
+# fork shares the parent's imported modules copy-on-write (no re-import per worker)
+_POOL_CONTEXT = multiprocessing.get_context(
+    "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+)
+
+# Patterns are compiled case-insensitive anyway; (?i) is only legal up front
+_LEADING_IGNORECASE = re.compile(r'^\(\?i\)')
+
+_CONFIDENCE_RANK = {'low': 0, 'medium': 1, 'high': 2}
+
+
+@contextmanager
+def _mapped(path: str, size: int):
+    """File contents as bytes, or as a read-only mmap from MMAP_MIN_BYTES."""
+    with open(path, 'rb') as f:
+        if size < MMAP_MIN_BYTES:
+            yield f.read()
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
+
+
+class PatternDetector:
+    """
+    Detects LLM/API patterns in code.
+
+    Patterns are dicts with at least 'keyword' and 'regex' (plus optional
+    'category', 'confidence', 'description'). Patterns that don't compile
+    are skipped with a warning.
+    """
+
+    def __init__(self, patterns: Optional[List[Dict[str, Any]]] = None, verbose: bool = False):
+        """
+        Initialize detector and compile the pattern engines once.
+
+        Args:
+            patterns: Pattern definitions (default: core.seed_knowledge.DEFAULT_PATTERNS)
+            verbose: Enable verbose logging
+        """
+        self.verbose = verbose
+        self.patterns = []
+        self._compiled = []  # bytes regex per entry of self.patterns
+
+        for pattern in (DEFAULT_PATTERNS if patterns is None else patterns):
+            expression = _LEADING_IGNORECASE.sub('', pattern.get('regex', ''))
+            try:
+                compiled = re.compile(expression.encode('utf-8'), re.IGNORECASE)
+            except (re.error, UnicodeEncodeError) as e:
+                logger.warning(f"Skipping invalid pattern {pattern.get('keyword')}: {e}")
+                continue
+            self.patterns.append(pattern)
+            self._compiled.append(compiled)
+
+        self._hs_db = self._build_hyperscan_db()
+        self._combined = None
+        if self._hs_db is None and self._compiled:
+            self._combined = re.compile(
+                b'|'.join(b'(?:' + c.pattern + b')' for c in self._compiled),
+                re.IGNORECASE | re.MULTILINE
+            )
+
+    def _build_hyperscan_db(self):
+        """One Hyperscan database for all patterns, or None to use re."""
+        if not HYPERSCAN_AVAILABLE or not self._compiled:
+            return None
+
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[c.pattern for c in self._compiled],
+                ids=list(range(len(self._compiled))),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE] * len(self._compiled)
+            )
+            return db
+        except hyperscan.error as e:
+            if self.verbose:
+                logger.debug(f"Hyperscan rejected the patterns ({e}), using re")
+            return None
+
+    def scan_bytes(self, data: bytes) -> List[Tuple[int, int, str]]:
+        """
+        Match every pattern against a file's contents in one pass.
+
+        Args:
+            data: Raw file bytes (or any bytes-like buffer, e.g. an mmap)
+
+        Returns:
+            List of (pattern index, 1-based line number, snippet), one per
+            matching (pattern, line), ordered by line
+        """
+        if not data or not self._compiled:
+            return []
+
+        if self._hs_db is not None:
+            return self._scan_hyperscan(data)
+        return self._scan_re(data)
+
+    def _scan_hyperscan(self, data: bytes) -> List[Tuple[int, int, str]]:
+        """Hyperscan pass, then confirm each (pattern, line) candidate with re."""
+        hits = []
+        self._hs_db.scan(data, match_event_handler=lambda pid, start, end, flags, ctx: hits.append((end, pid)))
+        if not hits:
+            return []
+        hits.sort()
+
+        results = []
+        seen = set()  # (pattern, line start) - a match reports every end offset
+        lineno, cursor = 1, 0
+        for end, pid in hits:
+            pos = max(end - 1, 0)
+            line_start = data.rfind(b'\n', 0, pos) + 1
+            if (pid, line_start) in seen:
+                continue
+            seen.add((pid, line_start))
+
+            lineno += data[cursor:line_start].count(b'\n')
+            cursor = line_start
+            line = self._line_at(data, line_start)
+            if self._compiled[pid].search(line):
+                results.append((pid, lineno, self._snippet(line)))
+
+        results.sort(key=lambda r: (r[1], r[0]))
+        return results
+
+    def _scan_re(self, data: bytes) -> List[Tuple[int, int, str]]:
+        """
+        Jump from candidate line to candidate line with the combined regex.
+        Each search resumes at the next line start, so a match can't hide one
+        on the following line.
+        """
+        results = []
+        size = len(data)
+        pos, lineno, cursor = 0, 1, 0
+        while pos < size:
+            m = self._combined.search(data, pos)
+            if m is None:
+                break
+
+            line_start = data.rfind(b'\n', 0, m.start()) + 1
+            line = self._line_at(data, line_start)
+            pos = line_start + len(line) + 1
+
+            lineno += data[cursor:line_start].count(b'\n')
+            cursor = line_start
+            for pid, compiled in enumerate(self._compiled):
+                if compiled.search(line):
+                    results.append((pid, lineno, self._snippet(line)))
+        return results
+
+    @staticmethod
+    def _line_at(data: bytes, line_start: int) -> bytes:
+        """The line beginning at `line_start`, without its newline."""
+        line_end = data.find(b'\n', line_start)
+        return data[line_start:] if line_end == -1 else data[line_start:line_end]
+
+    @staticmethod
+    def _snippet(line: bytes) -> str:
+        return line.decode('utf-8', errors='replace').strip()[:SNIPPET_CHARS]
+
+    def detect_patterns(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Detect patterns in a string of source code.
+
+        Returns:
+            One dict per matching (pattern, line) with keyword, category,
+            confidence, lineno and snippet
+        """
+        detections = []
+        for pid, lineno, snippet in self.scan_bytes(content.encode('utf-8', errors='surrogatepass')):
+            pattern = self.patterns[pid]
+            detections.append({
+                'keyword': pattern.get('keyword'),
+                'category': pattern.get('category', 'unknown'),
+                'confidence': pattern.get('confidence', 'low'),
+                'lineno': lineno,
+                'snippet': snippet,
+            })
+        return detections
+
+    def analyze_file(self, file_path: str, content: str) -> Dict[str, Any]:
+        """
+        Detect patterns in one file's content.
+
+        Returns:
+            Dictionary with the detections and the highest confidence among them
+        """
+        detections = self.detect_patterns(content)
+        confidence = max(
+            (d['confidence'] for d in detections),
+            key=lambda c: _CONFIDENCE_RANK.get(c, 0),
+            default='low'
+        )
+        return {"file_path": file_path, "patterns": detections, "confidence": confidence}
+
+    def _iter_repository(self, repo_path: str):
+        """Yield the path (relative to `repo_path`) of every non-ignored file."""
+        ignore_handler = get_ignore_handler(repo_path)
+        for dir_path, dirs, files in os.walk(repo_path):
+            # One relpath per directory; entries below it just join onto it
+            rel_dir = os.path.relpath(dir_path, repo_path)
+            prefix = '' if rel_dir == '.' else rel_dir + os.sep
+            dirs[:] = [d for d in dirs if not ignore_handler.is_ignored_rel(prefix + d, True)]
+            for name in files:
+                if not ignore_handler.is_ignored_file(dir_path, name, rel_dir):
+                    yield prefix + name
+
+    def sweep_files(self, file_paths: List[str], repo_path: str = '') -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Sweep the given text files (binary and oversized files are skipped).
+
+        Args:
+            file_paths: Paths relative to `repo_path`, as reported in the matches
+            repo_path: Root the paths are relative to (default: working directory)
+
+        Returns:
+            Dictionary mapping pattern keyword to its matches
+            ({'file', 'lineno', 'snippet'}), for keywords with at least one match
+        """
+        report: Dict[str, List[Dict[str, Any]]] = {}
+
+        for rel_path in file_paths:
+            full_path = os.path.join(repo_path, rel_path)
+            try:
+                size = os.path.getsize(full_path)
+                if size > MAX_FILE_SIZE:
+                    continue
+                with _mapped(full_path, size) as data:
+                    if b'\0' in data[:BINARY_SNIFF_BYTES]:
+                        continue
+                    hits = self.scan_bytes(data)
+            except (OSError, ValueError) as e:  # ValueError: file emptied before mmap
+                if self.verbose:
+                    logger.debug(f"Cannot read {rel_path}: {e}")
+                continue
+
+            for pid, lineno, snippet in hits:
+                report.setdefault(self.patterns[pid].get('keyword'), []).append(
+                    {'file': rel_path, 'lineno': lineno, 'snippet': snippet}
+                )
+
+        return report
+
+    def sweep_repository(self, repo_path: str, workers: Optional[int] = 1) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Sweep every non-ignored text file in the repository.
+
+        Large repositories are split into chunks of SWEEP_CHUNK_FILES files
+        swept by worker processes (regex matching is CPU-bound, so threads
+        would serialize on the GIL). Falls back to sweeping in-process if a
+        pool can't be started (e.g. AWS Lambda has no /dev/shm).
+
+        Args:
+            repo_path: Path to repository root
+            workers: Worker processes (default: sweep in-process; None: CPU count)
+
+        Returns:
+            Dictionary mapping pattern keyword to its matches
+            ({'file', 'lineno', 'snippet'}), for keywords with at least one match
+        """
+        file_paths = list(self._iter_repository(repo_path))
+        workers = workers or os.cpu_count() or 1
+
+        report = None
+        if workers > 1 and len(file_paths) > PARALLEL_MIN_FILES:
+            chunks = [file_paths[i:i + SWEEP_CHUNK_FILES] for i in range(0, len(file_paths), SWEEP_CHUNK_FILES)]
+            try:
+                # Each worker compiles its own detector once (a Hyperscan
+                # database can't be pickled), then only paths and hits cross
+                with ProcessPoolExecutor(
+                    max_workers=workers, mp_context=_POOL_CONTEXT,
+                    initializer=_init_sweep_worker, initargs=(self.patterns, self.verbose)
+                ) as pool:
+                    merged = defaultdict(list)
+                    for part in pool.map(_sweep_chunk, chunks, [repo_path] * len(chunks), chunksize=1):
+                        for keyword, matches in part.items():
+                            merged[keyword].extend(matches)
+                    report = dict(merged)
+            except Exception as e:
+                logger.warning(f"Parallel sweep unavailable ({e}), sweeping in-process")
+
+        if report is None:
+            report = self.sweep_files(file_paths, repo_path)
+
+        if self.verbose:
+            logger.info(f"Swept {len(file_paths)} files for {len(self.patterns)} patterns")
+
+        return report
+
+
+# --- Worker process state (see PatternDetector.sweep_repository) ---
+_worker_detector: Optional[PatternDetector] = None
+
+
+def _init_sweep_worker(patterns: List[Dict[str, Any]], verbose: bool) -> None:
+    global _worker_detector
+    _worker_detector = PatternDetector(patterns, verbose=verbose)
+
+
+def _sweep_chunk(file_paths: List[str], repo_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    return _worker_detector.sweep_files(file_paths, repo_path)
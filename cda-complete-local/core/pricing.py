@@ -1,9 +1,11 @@
 # core/pricing.py
 
 import os
-from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
 from threading import Lock
-from core.infrastructure import infra
+from core.infrastructure import get_infra
 
 AWS_REGION = os.environ.get("AWS_REGION", "ap-south-1")
 
@@ -26,7 +28,7 @@ def _load_pricing_from_kb():
             return _PRICING_CACHE
         
         try:
-            pricing_table = infra.get_table('ScroogePricingKB')
+            pricing_table = get_infra().get_table('ScroogePricingKB')
             
             response = pricing_table.scan()
             items = response.get('Items', [])
@@ -80,7 +82,8 @@ def _get_fallback_pricing():
         }
     }
 
-def fuzzy_match_metric(metric: str) -> Optional[dict]:
+@lru_cache(maxsize=512)
+def fuzzy_match_metric(metric: str) -> Optional[Mapping]:
     """
     Public API for fuzzy matching pricing entries.
     Used by reporter and other modules.
@@ -90,33 +93,45 @@ def fuzzy_match_metric(metric: str) -> Optional[dict]:
     - "openai-tokens" → exact match
     - "gpt-4 tokens" → matches "gpt-4-tokens"
     - "tokens" → matches generic "tokens"
+    
+    Memoized per raw metric (the LLM re-asks the same names across turns), so
+    the entry comes back as a read-only view shared by every caller.
+    Call reload_pricing() rather than editing the KB cache in place.
     """
     pricing_cache = _load_pricing_from_kb()
     
     # Normalize input
     normalized = metric.lower().replace(" ", "-").replace("_", "-")
     
-    # 1. Exact match
-    if normalized in pricing_cache:
-        return pricing_cache[normalized]
+    # 1. Exact KB key
+    data = pricing_cache.get(normalized)
     
     # 2. Check if any key contains the metric (e.g., "gpt-4" in "gpt-4-tokens")
-    for key, data in pricing_cache.items():
-        if normalized in key:
-            return data
+    if data is None:
+        data = next((d for key, d in pricing_cache.items() if normalized in key), None)
     
     # 3. Check if metric contains any key (e.g., "openai" matches "openai-tokens")
-    for key, data in pricing_cache.items():
-        if key in normalized:
-            return data
+    if data is None:
+        data = next((d for key, d in pricing_cache.items() if key in normalized), None)
     
     # 4. Fallback to generic category
-    generic_keys = ['tokens', 'gb-month', 'invocations', 'hours']
-    for generic in generic_keys:
-        if generic in normalized and generic in pricing_cache:
-            return pricing_cache[generic]
+    if data is None:
+        generic_keys = ['tokens', 'gb-month', 'invocations', 'hours']
+        for generic in generic_keys:
+            if generic in normalized and generic in pricing_cache:
+                data = pricing_cache[generic]
+                break
     
-    return None
+    return MappingProxyType(data) if data is not None else None
+
+def reload_pricing():
+    """Drops the loaded KB and every memoized lookup; the next call re-reads the KB."""
+    global _PRICING_CACHE, _CACHE_LOADED, _PRICING_DB
+    with _CACHE_LOCK:
+        _PRICING_CACHE = {}
+        _CACHE_LOADED = False
+        _PRICING_DB = None
+        fuzzy_match_metric.cache_clear()
 
 def get_standard_price(category: str, metric: str) -> float:
     """
@@ -137,22 +152,21 @@ def check_if_price_exists(metric: str) -> bool:
     result = fuzzy_match_metric(metric)
     return result is not None and result['price_per_unit'] > 0.0
 
-def get_price_details(metric: str) -> Optional[dict]:
+def get_price_details(metric: str) -> Optional[Mapping]:
     """Returns full pricing details including provider, confidence, etc."""
     return fuzzy_match_metric(metric)
 
-def calculate_line_item_cost(item: dict) -> float:
+def resolve_unit_rate(item: dict) -> float:
     """
-    Calculates Monthly Cost using KB pricing.
-    SIMPLIFIED: All prices are now per single unit, so just multiply.
+    Returns the per-unit price for a line item (user rate first, then KB).
+    0.0 when the volume is zero or no pricing is known.
     """
-    volume = item.get("estimated_volume", 0)
-    if volume == 0:
+    if item.get("estimated_volume", 0) == 0:
         return 0.0
 
     # 1. User-provided rate (highest priority)
     if item.get("user_rate", 0) > 0:
-        return volume * item["user_rate"]
+        return item["user_rate"]
 
     # 2. KB pricing
     metric = item.get("metric", "units")
@@ -166,14 +180,23 @@ def calculate_line_item_cost(item: dict) -> float:
         result = fuzzy_match_metric(metric)
     
     if result:
-        # SIMPLIFIED: Just multiply volume by price_per_unit
-        # No more division by 1000 since all prices are per single unit
-        return volume * result['price_per_unit']
+        return result['price_per_unit']
     
     # 3. Zero if unknown
     print(f"⚠️ Cannot calculate cost for {name} ({metric}) - no pricing data")
     return 0.0
 
+def calculate_line_item_cost(item: dict) -> float:
+    """
+    Calculates Monthly Cost using KB pricing.
+    SIMPLIFIED: All prices are now per single unit, so just multiply.
+    """
+    volume = item.get("estimated_volume", 0)
+    if volume == 0:
+        return 0.0
+
+    return volume * resolve_unit_rate(item)
+
 # Lazy-loaded backward compatibility
 _PRICING_DB = None
 
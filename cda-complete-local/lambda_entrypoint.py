@@ -15,6 +15,8 @@ import re
 import urllib.request
 from botocore.exceptions import ClientError
 from core.infrastructure import infra
+from agent.checkpointer import flush_checkpoints
+from agent.nodes.reporter import wait_for_report_writes
 
 # Environment Variables
 MOUNT_PATH = os.environ.get("MOUNT_PATH", "/tmp")
@@ -166,6 +168,7 @@ def sync_db_to_s3(scan_id: str, repo_name: str, max_retries=3):
 
 def finalize_report(repo_dir: str, scan_id: str, repo_name: str):
     """Uploads cost report to S3."""
+    wait_for_report_writes()
     report_path = os.path.join(repo_dir, "cost_analysis", "cost_elements.json")
     
     if not os.path.exists(report_path):
@@ -303,6 +306,7 @@ def handle_scan(event_body: Dict[str, Any]) -> Dict[str, Any]:
         print(f"🆕 Starting fresh scan for {repo_name}")
     
     conn = sqlite3.connect("/tmp/checkpoints.sqlite", check_same_thread=False)
+    app = None
     
     try:
         # CRITICAL: Replace ask_human BEFORE importing graph
@@ -335,7 +339,8 @@ def handle_scan(event_body: Dict[str, Any]) -> Dict[str, Any]:
             "regex_findings": "",
             "search_plan": [],
             "final_report": {},
-            "fuzzy_parse_count": 0
+            "fuzzy_parse_count": 0,
+            "consecutive_non_tool": 0
         }
         
         memory = SqliteSaver(conn)
@@ -346,6 +351,7 @@ def handle_scan(event_body: Dict[str, Any]) -> Dict[str, Any]:
             # Check timeout
             if time.time() - start_time > max_runtime:
                 print("⏰ Approaching Lambda timeout - saving state and exiting")
+                flush_checkpoints(app)
                 sync_db_to_s3(scan_id, repo_name)
                 update_scan_status(
                     scan_id, 
@@ -396,6 +402,7 @@ def handle_scan(event_body: Dict[str, Any]) -> Dict[str, Any]:
         
     finally:
         os.chdir("/tmp")
+        flush_checkpoints(app)
         conn.close()
         sync_db_to_s3(scan_id, repo_name)
         
@@ -446,6 +453,7 @@ def handle_resume(event_body: Dict[str, Any]) -> Dict[str, Any]:
     
     sync_db_from_s3(scan_id, repo_name)
     conn = sqlite3.connect("/tmp/checkpoints.sqlite", check_same_thread=False)
+    app = None
     
     try:
         # CRITICAL: Replace ask_human BEFORE importing graph
@@ -521,6 +529,7 @@ def handle_resume(event_body: Dict[str, Any]) -> Dict[str, Any]:
         
     finally:
         os.chdir("/tmp")
+        flush_checkpoints(app)
         conn.close()
         sync_db_to_s3(scan_id, repo_name)
 
@@ -25,6 +25,8 @@ os.environ["SCROOGE_ENV"] = "LOCAL"
 from core.infrastructure import infra
 from schemas.analysis_models import InvestigationLedger
 from agent.tools.specialist_tools import HumanInputNeeded
+from agent.checkpointer import flush_checkpoints
+from agent.nodes.reporter import wait_for_report_writes
 
 # --- Configuration ---
 # We rely on infrastructure.py to set up the DB and paths
@@ -116,6 +118,7 @@ class LocalRunner:
         
         # Initialize LangGraph with persistent SQLite
         conn = sqlite3.connect(checkpoint_db, check_same_thread=False)
+        app = None
         
         try:
             # Save CWD
@@ -129,6 +132,7 @@ class LocalRunner:
                 from agent.tools.search import set_broker
                 from agent.graph import build_graph
                 from langchain_core.messages import ToolMessage, HumanMessage
+                from langgraph.types import Command
                 
                 memory = SqliteSaver(conn)
                 app = build_graph(checkpointer=memory)
@@ -157,7 +161,8 @@ class LocalRunner:
                         "regex_findings": "",
                         "search_plan": [],
                         "final_report": {},
-                        "fuzzy_parse_count": 0
+                        "fuzzy_parse_count": 0,
+                        "consecutive_non_tool": 0
                     }
                 else:
                     # Resume Logic
@@ -169,26 +174,40 @@ class LocalRunner:
                     last_message = snapshot.values.get("messages", [])[-1]
                     
                     # Inject Answer
-                    if hasattr(last_message, "tool_calls") and last_message.tool_calls:
+                    if snapshot.interrupts:
+                         # Paused inside ask_human: the answer becomes its tool result.
+                         # Parallel phases can each be waiting on a question, so answer
+                         # the one that was shown by id; the others pause again below.
+                         initial_state = Command(resume={snapshot.interrupts[0].id: resume_answer})
+                    elif hasattr(last_message, "tool_calls") and last_message.tool_calls:
                          # Try to find the tool call ID
                          tool_call_id = last_message.tool_calls[0]['id']
                          answer_msg = ToolMessage(content=f"User Answer: {resume_answer}", tool_call_id=tool_call_id)
                          app.update_state(config, {"messages": [answer_msg]}, as_node="tools")
                     else:
                          app.update_state(config, {"messages": [HumanMessage(content=f"Answer: {resume_answer}")]})
-                    
-                    initial_state = None # Continue from state
 
                 # Execution Loop
                 iterator = app.stream(initial_state, config=config, stream_mode="values")
                 
                 for step in iterator:
+                    # ask_human paused the graph (state is already checkpointed)
+                    if "__interrupt__" in step:
+                        continue
                     messages = step.get("messages", [])
                     if messages:
                         last = messages[-1]
                         content = getattr(last, 'content', '')
                         self.update_scan_status(scan_id, "RUNNING", str(content)[:60], repo_name=repo_name)
                 
+                # One question per pause; each resume answers it and re-surfaces the rest
+                pending = app.get_state(config).interrupts
+                if pending:
+                    question = pending[0].value.get("question", "")
+                    status_msg = "Waiting for input" if len(pending) == 1 else f"Waiting for input (1 of {len(pending)} questions)"
+                    self.update_scan_status(scan_id, "PAUSED", status_msg, current_question=question, repo_name=repo_name)
+                    return
+                
                 # Completion
                 self.finalize_report(repo_dir, scan_id, repo_name)
                 self.update_scan_status(scan_id, "COMPLETED", "Analysis Complete", repo_name=repo_name)
@@ -210,9 +229,11 @@ class LocalRunner:
                 os.chdir(old_cwd)
                 
         finally:
+            flush_checkpoints(app)
             conn.close()
 
     def finalize_report(self, repo_dir, scan_id, repo_name):
+        wait_for_report_writes()
         src = os.path.join(repo_dir, "cost_analysis", "cost_elements.json")
         if os.path.exists(src):
             dest = os.path.join(DATA_DIR, "results", repo_name, scan_id, "report.json")
@@ -12,6 +12,7 @@ load_dotenv()
 
 from core.ingestion import run_ingestion
 from agent.graph import build_graph
+from agent.nodes.reporter import wait_for_report_writes
 
 # --- NEW IMPORTS FOR BROKER ---
 from core.task_broker import TaskBroker
@@ -172,6 +173,7 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        wait_for_report_writes()
         os.chdir(original_cwd)
 
     if 'final_state' in locals() and final_state.get("final_report"):
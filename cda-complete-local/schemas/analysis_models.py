@@ -1,7 +1,7 @@
 # schemas/analysis_models.py
 
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, Any, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 class InvestigationLedger(BaseModel):
     """
@@ -11,62 +11,76 @@ class InvestigationLedger(BaseModel):
     This replaces the chat history as the primary source of truth for
     cross-agent collaboration.
     """
+    # Assigned lists are validated into tuples too, so no field stays mutable
+    model_config = ConfigDict(validate_assignment=True)
+
     # --- PHASE 1: ARCHITECT (Infra & Ops) ---
     primary_code_dir: str = Field(".", description="Detected root of source code (e.g., src/ or app/)")
     
     # NEW: Helps identifying the tech stack early to prevent wrong searches
     project_framework: str = Field("Unknown", description="Detected Framework: AWS CDK, Django, Flask, Next.js, etc.")
-    key_config_files: List[str] = Field(default_factory=list, description="Critical configs found: cdk.json, serverless.yml")
+    key_config_files: Tuple[str, ...] = Field(default_factory=tuple, description="Critical configs found: cdk.json, serverless.yml")
 
-    compute_assets: List[str] = Field(
-        default_factory=list,
+    compute_assets: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Found compute definitions: Dockerfiles, K8s manifests, Lambda functions, EC2 configs"
     )
 
-    storage_assets: List[str] = Field(
-        default_factory=list,
+    storage_assets: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Found storage definitions: S3 buckets, RDS instances, DynamoDB tables, PVCs"
     )
 
-    ci_cd_pipelines: List[str] = Field(
-        default_factory=list,
+    ci_cd_pipelines: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Found automation: GitHub Actions, CircleCI, Jenkins, scheduled cron jobs"
     )
 
     # --- PHASE 2: INTELLIGENCE (AI & Data) ---
-    llm_chains: List[str] = Field(
-        default_factory=list,
+    llm_chains: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Confirmed LLM call chains (Entry -> Wrapper -> Prompt -> API)"
     )
 
-    vector_dbs: List[str] = Field(
-        default_factory=list,
+    vector_dbs: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Found Vector DB usages: Pinecone, Chroma, Qdrant, Milvus"
     )
 
-    third_party_compute: List[str] = Field(
-        default_factory=list,
+    third_party_compute: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Found heavy client-side compute: Scrapers (Selenium/Playwright), Data Pipelines"
     )
 
     # --- PHASE 3: INTEGRATOR (SaaS & Humans) ---
-    saas_services: List[str] = Field(
-        default_factory=list,
+    saas_services: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Found external paid APIs: Stripe, Twilio, SendGrid, Auth0"
     )
 
-    hitl_patterns: List[str] = Field(
-        default_factory=list,
+    hitl_patterns: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Found Human-in-the-Loop patterns: Approval steps, manual triggers, review queues"
     )
 
     # --- SHARED STATE & OPTIMIZATION ---
-    searched_paths: List[str] = Field(
-        default_factory=list,
+    searched_paths: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="List of directories or files already deeply audited to avoid redundant searching"
     )
 
-    notes: List[str] = Field(
-        default_factory=list,
+    notes: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="High-level notes, warnings, or hypothesis passed between agents"
-    )
\ No newline at end of file
+    )
+
+    # JSON of the last dump; see AgentState.ledger_json()
+    _json_cache: Optional[str] = PrivateAttr(default=None)
+
+    def __setattr__(self, name, value):
+        # Reassigning a field marks the cached dump dirty. The collections are
+        # tuples, so there are no in-place edits to miss: writers reassign
+        # (`ledger.notes = (*ledger.notes, note)`)
+        if not name.startswith("_"):
+            self._json_cache = None
+        super().__setattr__(name, value)
\ No newline at end of file
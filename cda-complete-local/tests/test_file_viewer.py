@@ -0,0 +1,32 @@
+import pytest
+
+from core import file_viewer
+
+# Secrets the redaction must keep hiding, whatever else the patterns narrow
+SECRETS = {
+    "aws_secret": "wJalrXUtnFEMI/K7MDENG/bPxRfiCYEXAMPLEKEY",
+    "base64_32_bytes": "q3Zk9Lm2VbXr8TsYp1NwHc6JdF0aGeU4iKoP7lRtSx0=",
+    "lowercase_token": "k3j5h7g9f2d4s6a8q1w3e5r7t9y2u4i6o8p0zxcv",
+    "lowercase_letters": "thequickbrownfoxjumpsoverthelazydogagain",
+    "hex_48": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822c",
+    "hex_128": "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855" * 2,
+}
+
+
+@pytest.fixture(params=[False, True], ids=["regex", "vectorized"])
+def redact(request):
+    if request.param and not file_viewer.NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    # Padding pushes the content over the numpy threshold on the vectorized run
+    pad = "x = 1\n" * (file_viewer.REDACT_VECTOR_MIN_CHARS // 6 + 1) if request.param else ""
+    return lambda text: file_viewer.redact_secrets(pad + text)[len(pad):]
+
+
+@pytest.mark.parametrize("secret", SECRETS.values(), ids=SECRETS.keys())
+def test_secret_is_fully_redacted(redact, secret):
+    assert redact(f'KEY = "{secret}"\n') == 'KEY = "[REDACTED]"\n'
+
+
+def test_short_tokens_are_kept(redact):
+    line = "import os.path as p  # short_identifier_here a1b2c3\n"
+    assert redact(line) == line
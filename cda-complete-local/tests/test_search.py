@@ -0,0 +1,84 @@
+import io
+import os
+import re
+
+import pytest
+
+from agent.tools import search
+
+# Lines the byte-level engines used to miss: multi-byte UTF-8 under `.` and
+# \w, characters IGNORECASE folds onto ASCII, CRLF line ends under `$`,
+# lone CR line breaks, and anchors that only work on a single line
+FIXTURE = {
+    "accents.py": 'x = "aéb"\nnaïve_key = 1\nplain = "ab"\n',
+    "folds.txt": "DIſK usage\nKelvin: 300K\n",
+    "crlf.py": "import boto3\r\nclient = boto3.client('s3')\r\n",
+    "latin1.txt": b"caf\xe9 = 'a\xe9b'\n",
+    "lone_cr.txt": b"x = 1\rclient = boto3\rdisk = 2\n",
+}
+
+PATTERNS = [r"a.b", r"na\w+ve", "disk", r"300k", r"boto3$", r"caf\W", r"\s+$", r"\Aclient"]
+
+
+def _reference(root, patterns):
+    """The decoded line-by-line scan every engine has to agree with."""
+    expected = {p: set() for p in patterns}
+    for name in FIXTURE:
+        with open(os.path.join(root, name), "rb") as raw:
+            text = io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+            for lineno, line in enumerate(text, 1):
+                for p in patterns:
+                    if re.search(p, line, re.IGNORECASE):
+                        expected[p].add((name, lineno))
+    return expected
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for name, content in FIXTURE.items():
+        data = content if isinstance(content, bytes) else content.encode("utf-8")
+        (tmp_path / name).write_bytes(data)
+    return str(tmp_path)
+
+
+def _grep(root, patterns):
+    data = search.execute_safe_grep(patterns, root)
+    return {
+        r["pattern"]: {(m["file"], m["lineno"]) for m in r["matches"]}
+        for r in data["results"]
+    }
+
+
+@pytest.mark.skipif(not search.HYPERSCAN_AVAILABLE, reason="hyperscan not installed")
+def test_hyperscan_matches_non_ascii_lines(repo):
+    expected = _reference(repo, PATTERNS)
+    assert _grep(repo, PATTERNS) == expected
+    assert ("accents.py", 1) in expected[r"a.b"]
+    assert ("accents.py", 2) in expected[r"na\w+ve"]
+
+
+@pytest.mark.skipif(not search.HYPERSCAN_AVAILABLE, reason="hyperscan not installed")
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_hyperscan_single_pattern(repo, pattern):
+    assert _grep(repo, [pattern]) == _reference(repo, [pattern])
+
+
+@pytest.fixture
+def no_hyperscan(monkeypatch):
+    monkeypatch.setattr(search, "HYPERSCAN_AVAILABLE", False)
+
+
+def test_bytes_regex_matches_non_ascii_lines(repo, no_hyperscan):
+    assert _grep(repo, PATTERNS) == _reference(repo, PATTERNS)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_bytes_regex_single_pattern(repo, no_hyperscan, pattern):
+    assert _grep(repo, [pattern]) == _reference(repo, [pattern])
+
+
+def test_tool_output_notes_truncated_patterns(tmp_path):
+    (tmp_path / "many.py").write_text("".join(f"key_{i} = {i}\n" for i in range(5)))
+    out = search.format_grep_results(search.execute_safe_grep(["key_", "key_4"], str(tmp_path), max_per_pattern=4))
+    assert "Pattern 'key_': showing the first 4 matches (truncated, more exist)" in out
+    assert "Pattern 'key_4'" not in out